@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import os
 import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import List
 
@@ -9,20 +11,50 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from app.startup_profile import StartupProfiler, rss_mb
+from app.timing import TimingMiddleware
+
+# Warn when create_app() takes longer than this (Render port detection, autoscaler)
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # Resume polling of feeds registered before a restart; with --workers N
+    # exactly one worker wins FEED_SCHEDULER_LOCK and runs the loop
+    try:
+        from app.services import jobs  # lazy import
+
+        jobs.start_scheduler()
+    except Exception as exc:  # noqa: BLE001
+        print(f"[main] feed scheduler not started: {exc}")
+    yield
+
+
 # ===== App factory =====
 def create_app() -> FastAPI:
     """
     ASGI app-factory used by uvicorn with `--factory`.
 
     Keeps startup FAST so Render can detect the open port immediately.
-    Any heavy RAG/model initialization should be lazy (see vectorstore.get_vectorstore()).
+    Any heavy RAG/model initialization should be lazy (see vectorstore.get_collection()):
+    routers only import chromadb / scikit-learn / feedparser on first use.
+    Set STARTUP_PROFILE=1 to record per-module import time and RSS
+    (served at /api/health/startup).
     """
+    t_start = time.perf_counter()
+    profiler = None
+    if os.getenv("STARTUP_PROFILE", "false").lower() in {"1", "true", "yes", "on"}:
+        profiler = StartupProfiler()
+        profiler.start()
+
     app = FastAPI(
         title="SocialMediaRAG",
         version=os.getenv("APP_VERSION", "0.1.0"),
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        lifespan=_lifespan,
     )
 
     # --- CORS ---
@@ -40,11 +72,16 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # --- Per-route latency histograms (+ slow-request profiles when PROFILE_SLOW_MS > 0) ---
+    # Added last so it wraps everything, CORS included; served at /api/metrics
+    app.add_middleware(TimingMiddleware)
+
     # --- Include API routers under /api ---
     api_prefix = os.getenv("API_PREFIX", "/api")
 
     # Import routers defensively so a missing optional module doesn't crash startup
     def _maybe_include(module_path: str, router_name: str = "router") -> None:
+        t0, rss0 = time.perf_counter(), (rss_mb() if profiler else 0.0)
         try:
             module = __import__(module_path, fromlist=[router_name])
             router = getattr(module, router_name)
@@ -52,6 +89,8 @@ def create_app() -> FastAPI:
         except Exception as e:  # noqa: BLE001
             # Log to stdout; the app should still boot
             print(f"[main] Skipping router '{module_path}': {e}")
+        if profiler:
+            profiler.step(module_path, t0, rss0)
 
     # Core/basic routes (add or remove as your project has them)
     _maybe_include("app.routes.health")   # /api/health
@@ -60,6 +99,7 @@ def create_app() -> FastAPI:
     _maybe_include("app.routes.search")   # /api/search
     _maybe_include("app.routes.ingest")   # /api/ingest/*
     _maybe_include("app.routes.trends")   # /api/trends/*
+    _maybe_include("app.routes.metrics")  # /api/metrics (Prometheus)
 
     # --- Static UI ---
     # We copy Vite's dist → backend/app/static at build time.
@@ -74,19 +114,48 @@ def create_app() -> FastAPI:
     else:
         print(f"[main] Static directory not found: {static_dir} (API only mode)")
 
+    # --- SHARED_INDEX: map the published index; this worker republishes after its own ingests ---
+    shared = os.getenv("SHARED_INDEX", "off").lower() in {"1", "true", "yes", "on"}
+    if shared:
+        def _map_shared() -> None:
+            try:
+                from app.services import shared_index  # lazy import (numpy)
+
+                shared_index.start()
+                shared_index.current()
+            except Exception as exc:  # noqa: BLE001
+                print(f"[main] shared index start failed: {exc}")
+
+        threading.Thread(target=_map_shared, daemon=True).start()
+
     # --- Optional non-blocking warmup of RAG in a background thread ---
     if os.getenv("RAG_EAGER_INIT", "false").lower() in {"1", "true", "yes", "on"}:
         def _warmup() -> None:
             try:
                 print("[main] RAG eager warm-up started")
-                from app.services.vectorstore import get_vectorstore  # lazy import
-                _ = get_vectorstore()
+                from app.services.rag import get_rag  # lazy import
+                from app.services.snapshot import restore_on_startup
+                from app.services.vectorstore import get_collection, get_query_encoder
+
+                if not shared:
+                    get_rag()  # with SHARED_INDEX the mapped lexical index replaces the per-process one
+                get_collection()
+                restore_on_startup()  # SNAPSHOT_RESTORE: bulk-load stored vectors, no re-embedding
+                get_query_encoder().encode("warm-up")  # loads the embedding model
                 print("[main] RAG eager warm-up complete")
             except Exception as exc:  # noqa: BLE001
                 print(f"[main] RAG eager warm-up failed: {exc}")
 
         threading.Thread(target=_warmup, daemon=True).start()
 
+    elapsed_ms = (time.perf_counter() - t_start) * 1000
+    if profiler:
+        profiler.stop()
+        app.state.startup_profile = profiler.report()
+        print(f"[main] startup profile: {app.state.startup_profile}")
+    if elapsed_ms > STARTUP_BUDGET_MS:
+        print(f"[main] create_app took {elapsed_ms:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)")
+
     return app
 
 
@@ -0,0 +1,10 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+class FeedIngestRequest(BaseModel):
+    feeds: List[str] = []
+    workers: Optional[int] = Field(None, ge=1)  # capped at INGEST_WORKERS by ingest_feeds
+    batch_size: Optional[int] = Field(None, ge=1, le=10000)
+    force: bool = False
+    wait: bool = False
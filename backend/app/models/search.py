@@ -0,0 +1,8 @@
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+class SearchBatchRequest(BaseModel):
+    queries: List[str] = []
+    k: int = Field(10, ge=1, le=50)
+    filters: Dict[str, Any] = {}  # same names as the GET /search filter params
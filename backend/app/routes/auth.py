@@ -3,12 +3,14 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..db import Base, engine, SessionLocal
 from ..models import User
 from ..schemas import LoginIn, Token, UserCreate, UserOut
 from ..security import hash_password, verify_password, make_token
 from ..deps.auth_deps import get_current_user
+from .auth_deps import run_password_hashing
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -17,7 +19,7 @@ Base.metadata.create_all(bind=engine)
 
 
 def get_db():
-    """Yield a DB session per request."""
+    """Yield a DB session per request (connections come from the engine's pool)."""
     db = SessionLocal()
     try:
         yield db
@@ -25,34 +27,44 @@ def get_db():
         db.close()
 
 
+def _user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+
+def _save(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+
+
+# Handlers are async: DB calls go to the request threadpool, hashing to its own
+# bounded pool, so a sign-up burst never holds request threads while hashing.
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
-def signup(body: UserCreate, db: Session = Depends(get_db)):
+async def signup(body: UserCreate, db: Session = Depends(get_db)):
     """
     Create a new user and return a JWT.
     """
-    existing = db.query(User).filter(User.email == body.email).first()
+    existing = await run_in_threadpool(_user_by_email, db, body.email)
     if existing:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
 
     user = User(
         email=body.email,
         name=body.name,
-        password_hash=hash_password(body.password),
+        password_hash=await run_password_hashing(hash_password, body.password),
     )
-    db.add(user)
-    db.commit()
+    await run_in_threadpool(_save, db, user)
 
     token = make_token(sub=user.email)
     return Token(access_token=token)
 
 
 @router.post("/login", response_model=Token)
-def login(body: LoginIn, db: Session = Depends(get_db)):
+async def login(body: LoginIn, db: Session = Depends(get_db)):
     """
     Verify credentials and return a JWT.
     """
-    user = db.query(User).filter(User.email == body.email).first()
-    if not user or not verify_password(body.password, user.password_hash):
+    user = await run_in_threadpool(_user_by_email, db, body.email)
+    if not user or not await run_password_hashing(verify_password, body.password, user.password_hash):
         # Obfuscate which part failed
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
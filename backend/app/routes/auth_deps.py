@@ -1,5 +1,10 @@
 # backend/app/routes/auth_deps.py
+import asyncio
+import hashlib
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional, Callable
 
@@ -7,6 +12,8 @@ import jwt  # provided by the PyJWT package
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.services.cache import LRUTTLCache
+
 # -------------------------
 # Config (env-driven)
 # -------------------------
@@ -16,6 +23,12 @@ JWT_ACCESS_TTL_MIN = int(os.getenv("JWT_ACCESS_TTL_MIN", "60"))  # 60 min defaul
 JWT_ISS = os.getenv("JWT_ISS", "socialmediarag")           # optional; set to your service name
 JWT_AUD = os.getenv("JWT_AUD")                             # optional; if set, token must include this aud
 
+# Verified tokens, keyed by SHA-256 digest; each entry expires at its token's exp (0 = off)
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+# Password hashing runs in its own pool so sign-in bursts can't starve the request threadpool
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+AUTH_HASH_MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", "32"))  # beyond this → 503 + Retry-After
+
 # Single instance of HTTP Bearer auth (no auto 403; we return proper 401 + WWW-Authenticate)
 bearer = HTTPBearer(auto_error=False)
 
@@ -65,6 +78,55 @@ def decode_token(token: str) -> Dict[str, Any]:
     )
 
 
+_verified: Optional[LRUTTLCache] = (
+    LRUTTLCache(max_entries=AUTH_TOKEN_CACHE_SIZE, ttl=0, sizer=lambda _: 0) if AUTH_TOKEN_CACHE_SIZE > 0 else None
+)
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    decode_token() behind the verified-token cache. Only tokens that passed
+    full verification are cached, and never past their exp, so a hit is
+    exactly as valid as a fresh decode. Returns a copy callers may modify.
+    """
+    if _verified is None:
+        return decode_token(token)
+    key = hashlib.sha256(token.encode("utf-8")).digest()  # raw tokens never sit in memory
+    payload = _verified.get(key)
+    if payload is None:
+        payload = decode_token(token)
+        remaining = payload.get("exp", 0) - time.time() if isinstance(payload.get("exp"), (int, float)) else 0
+        if remaining > 0:  # tokens without exp are re-verified every time
+            _verified.put(key, payload, ttl=remaining)
+    return dict(payload)
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    return _verified.stats() if _verified is not None else {"enabled": False}
+
+
+_hash_pool = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="auth-hash")
+_hash_slots = threading.BoundedSemaphore(AUTH_HASH_WORKERS + AUTH_HASH_MAX_PENDING)
+
+
+async def run_password_hashing(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Await a password hash / verify in the dedicated pool. At most
+    AUTH_HASH_WORKERS run at once; when AUTH_HASH_MAX_PENDING more are
+    already waiting, fail fast with 503 instead of queueing without bound.
+    """
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.wrap_future(_hash_pool.submit(fn, *args))
+    finally:
+        _hash_slots.release()
+
+
 # -------------------------
 # FastAPI dependencies
 # -------------------------
@@ -85,7 +147,7 @@ async def current_user(
 
     token = credentials.credentials
     try:
-        payload = decode_token(token)
+        payload = verify_token(token)
         return payload  # You can map this to a user model/db lookup if needed.
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -126,5 +188,7 @@ __all__ = [
     "current_user",
     "create_access_token",
     "decode_token",
+    "verify_token",
+    "run_password_hashing",
     "require_scope",
 ]
@@ -1,7 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 router = APIRouter()
 
 @router.get("/health")
 def health():
     return {"ok": True, "service": "backend", "status": "healthy"}
+
+@router.get("/health/startup")
+def startup_profile(request: Request):
+    """Import-time / RSS report from create_app() when STARTUP_PROFILE=1."""
+    profile = getattr(request.app.state, "startup_profile", None)
+    return profile or {"enabled": False, "hint": "set STARTUP_PROFILE=1"}
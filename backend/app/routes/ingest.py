@@ -1,56 +1,195 @@
 # backend/app/routes/ingest.py
 from __future__ import annotations
 
-from typing import List, Dict, Any
-from datetime import datetime
+import os
+import queue
+from typing import List, Dict, Any, Iterator, Optional
 
-import feedparser
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from app.services.vectorstore import add_documents
+from app.models.ingest import FeedIngestRequest
+from app.routes.streaming import stream, wants_sse
+from app.services import jobs
+from app.services.bulk import BULK_QUEUE_BATCHES, BulkIngest
+from app.services.snapshot import iter_snapshot
+from app.services.feeds import INGEST_BATCH_SIZE, INGEST_WORKERS, ingest_feeds
+from app.services.vectorstore import backfill_timestamps, embed_cache_stats, preprocess_stats
 
 router = APIRouter(tags=["ingest"])
 
+# Idle streams send {"type": "ping"} this often so proxies don't cut them
+INGEST_STREAM_HEARTBEAT_S = float(os.getenv("INGEST_STREAM_HEARTBEAT_S", "15"))
+
 
 @router.post("/ingest/rss")
-def ingest_rss(body: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+def ingest_rss(body: FeedIngestRequest) -> Dict[str, Any]:
     """
     Body:
     {
-      "feeds": ["https://hnrss.org/frontpage", "https://www.theverge.com/rss/index.xml"]
+      "feeds": ["https://hnrss.org/frontpage", "https://www.theverge.com/rss/index.xml"],
+      "workers": 8,          # optional, concurrent fetches (capped at INGEST_WORKERS)
+      "batch_size": 256,     # optional, items per upsert
+      "force": false,        # optional, ignore ETag/Last-Modified and refetch everything
+      "wait": false          # optional, run inline and return the full result (old behaviour)
     }
+    By default the work is queued and a job id is returned right away;
+    poll GET /ingest/jobs/{job_id} for progress. Invalid workers/batch_size get a 422.
     """
-    feeds: List[str] = list(body.get("feeds") or [])
-    by_feed: Dict[str, int] = {}
-    total = 0
-
-    for feed_url in feeds:
-        parsed = feedparser.parse(feed_url)
-        items: List[Dict[str, Any]] = []
-        for e in parsed.entries:
-            title = (getattr(e, "title", "") or "").strip()
-            link = (getattr(e, "link", "") or "").strip()
-            summary = (getattr(e, "summary", "") or "").strip()
-            content = summary or title
-
-            if not content:
+    feeds = body.feeds
+    workers = body.workers or INGEST_WORKERS
+    batch_size = body.batch_size or INGEST_BATCH_SIZE
+    conditional = not body.force
+
+    if body.wait:
+        result = ingest_feeds(feeds, workers=workers, batch_size=batch_size, conditional=conditional)
+        return {"ok": True, **result, "embed_cache": embed_cache_stats(), "preprocess": preprocess_stats()}
+
+    job_id = jobs.submit_feeds(feeds, batch_size=batch_size, workers=workers, conditional=conditional)
+    return {"ok": True, "job_id": job_id, "status_url": f"/api/ingest/jobs/{job_id}"}
+
+
+@router.post("/ingest/rss/stream")
+def ingest_rss_stream(request: Request, body: FeedIngestRequest,
+                      format: Optional[str] = Query(None, pattern="^(ndjson|sse)$")):
+    """
+    Same body as /ingest/rss, but the job's progress is streamed back (NDJSON,
+    or SSE when asked for): "queued", "started", a "feed" event per fetched
+    feed, a "batch" event per upsert, then "done" with the final job snapshot.
+    The job is an ordinary one, so it also shows up under /ingest/jobs and
+    keeps running if the client disconnects.
+    """
+    events: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+
+    def done(job: Dict[str, Any]) -> None:
+        events.put({"type": "done", **(jobs.get_job(job["id"]) or {})})
+        events.put(None)
+
+    job_id = jobs.submit_feeds(
+        body.feeds,
+        batch_size=body.batch_size or INGEST_BATCH_SIZE,
+        workers=body.workers or INGEST_WORKERS,
+        conditional=not body.force,
+        on_done=done,
+        on_event=events.put,
+    )
+
+    def gen() -> Iterator[Dict[str, Any]]:
+        yield {"type": "queued", "job_id": job_id, "status_url": f"/api/ingest/jobs/{job_id}"}
+        while True:
+            try:
+                event = events.get(timeout=INGEST_STREAM_HEARTBEAT_S)
+            except queue.Empty:
+                yield {"type": "ping"}
                 continue
+            if event is None:
+                return
+            yield event
+
+    return stream(gen(), wants_sse(request, format))
+
+
+@router.post("/ingest/bulk")
+async def ingest_bulk(request: Request,
+                      batch_size: int = Query(INGEST_BATCH_SIZE, ge=1, le=10000),
+                      queue_batches: int = Query(BULK_QUEUE_BATCHES, ge=1, le=64)) -> Dict[str, Any]:
+    """
+    Body: JSONL, one add_documents item per line ({"text", "id"?, "url"?, "source"?, ...}),
+    optionally gzip-compressed (detected from the bytes, no header needed):
+
+        curl -T posts.jsonl.gz -X POST localhost:8000/api/ingest/bulk
+
+    The body is parsed as it uploads; while embedding is `queue_batches`
+    batches behind, reading stops, so the client is throttled by TCP rather
+    than the server buffering. Returns counts, bad lines and records_per_s.
+    """
+    bulk = BulkIngest(batch_size=batch_size, queue_batches=queue_batches)
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(bulk.feed, chunk)  # blocks (off the loop) when the queue is full
+        result = await run_in_threadpool(bulk.close)
+    except RuntimeError as exc:  # writer failed
+        await run_in_threadpool(bulk.abort)
+        raise HTTPException(status_code=500, detail={"error": str(exc), **bulk.result()})
+    except BaseException:  # client went away
+        await run_in_threadpool(bulk.abort)
+        raise
+    print(f"[ingest] bulk: {result['records']} records, {result['added']} upserted, "
+          f"{result['bad_lines']} bad lines in {result['elapsed_s']}s ({result['records_per_s']}/s)")
+    return {"ok": True, **result, "embed_cache": embed_cache_stats(), "preprocess": preprocess_stats()}
+
+
+@router.get("/ingest/snapshot")
+def download_snapshot(dtype: str = Query("float32", pattern="^(float32|float16)$")):
+    """
+    Stream a binary snapshot of the collection (see services/snapshot.py), e.g.
+    before a deploy; restore it with SNAPSHOT_RESTORE + RAG_EAGER_INIT or
+    `python -m app.services.snapshot restore`.
+    """
+    return StreamingResponse(
+        iter_snapshot(dtype),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="collection-{dtype}.snap"'},
+    )
+
+
+@router.post("/ingest/index/publish")
+def publish_shared_index() -> Dict[str, Any]:
+    """
+    Export the collection as a new shared memory-mapped index version now,
+    instead of waiting for the post-ingest debounce (SHARED_INDEX=on).
+    Every worker switches to it within SHARED_INDEX_POLL_S.
+    """
+    from app.services import shared_index  # lazy import
+
+    if not shared_index.SHARED_INDEX:
+        raise HTTPException(status_code=409, detail="SHARED_INDEX is off")
+    try:
+        manifest = shared_index.publish()
+    except Exception as exc:  # noqa: BLE001
+        # embedded Chroma only sees another worker's latest writes once they are flushed
+        raise HTTPException(status_code=503, detail=f"publish failed in this worker: {exc}") from exc
+    return {"ok": True, "manifest": manifest}
+
+
+@router.get("/ingest/jobs")
+def list_ingest_jobs(limit: int = Query(20, ge=1, le=200)) -> Dict[str, Any]:
+    return {"jobs": jobs.list_jobs(limit)}
+
+
+@router.get("/ingest/jobs/{job_id}")
+def ingest_job(job_id: str) -> Dict[str, Any]:
+    """Per-feed progress and throughput for one job."""
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return {**job, "embed_cache": embed_cache_stats(), "preprocess": preprocess_stats()}
+
+
+@router.get("/ingest/feeds")
+def list_feeds() -> Dict[str, Any]:
+    return {"feeds": jobs.registered_feeds()}
+
+
+@router.post("/ingest/feeds")
+def register_feeds(body: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    """
+    Body: {"feeds": [...], "interval_s": 900}
+    Registered feeds are re-polled on a jittered schedule, backing off on failures.
+    """
+    feeds: List[str] = list(body.get("feeds") or [])
+    return {"ok": True, "feeds": jobs.register_feeds(feeds, body.get("interval_s"))}
+
+
+@router.delete("/ingest/feeds")
+def unregister_feeds(body: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    """Body: {"feeds": [...]}"""
+    return {"ok": True, "removed": jobs.unregister_feeds(list(body.get("feeds") or []))}
+
 
-            items.append(
-                {
-                    "id": link or None,
-                    "url": link or None,
-                    "source": "rss",
-                    "feed": feed_url,
-                    "title": title,
-                    "text": content,
-                    "published": getattr(e, "published", None),
-                    "ingested_at": datetime.utcnow().isoformat() + "Z",
-                }
-            )
-
-        added = add_documents(items)
-        by_feed[feed_url] = added
-        total += added
-
-    return {"ok": True, "added": total, "by_feed": by_feed}
+@router.post("/ingest/backfill-timestamps")
+def backfill() -> Dict[str, Any]:
+    """Give docs ingested before numeric timestamps existed their published_ts / ingested_ts."""
+    return {"ok": True, "updated": backfill_timestamps()}
@@ -0,0 +1,71 @@
+# backend/app/routes/metrics.py
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services import metrics
+from app.services.outbound import OUTBOUND
+
+router = APIRouter(tags=["metrics"])
+
+
+def _numeric(prefix: str, what: str, stats: Dict[str, Any],
+             labels: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str, Dict[str, Any], float]]:
+    return [(f"{prefix}_{field}", f"{what} {field}.", labels or {}, value)
+            for field, value in stats.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+
+def _runtime_gauges() -> List[Tuple[str, str, Dict[str, Any], float]]:
+    """Counters the services already keep, read at scrape time. Never builds anything lazy."""
+    from app.services import rag, vectorstore
+    from app.startup_profile import rss_mb
+
+    out: List[Tuple[str, str, Dict[str, Any], float]] = [
+        ("process_resident_memory_mb", "Resident set size.", {}, rss_mb()),
+        ("ingest_generation", "Writes to the collection since start.", {}, vectorstore.generation()),
+    ]
+    for source, m in OUTBOUND.metrics()["sources"].items():
+        out += _numeric("outbound", "Outbound client", m, {"source": source})
+    caches = {"outbound_cache": OUTBOUND.cache.stats()}
+    if vectorstore._embed_cache is not None:
+        caches["embed_cache"] = vectorstore.embed_cache_stats()
+    if vectorstore._query_encoder is not None:
+        qe = vectorstore.query_encoder_stats()
+        caches["query_embed_cache"] = qe.pop("cache")
+        out += _numeric("query_encoder", "Query encoder", qe)
+    search = sys.modules.get("app.routes.search")
+    if search is not None:
+        caches["search_cache"] = search._results.stats()
+    auth = sys.modules.get("app.routes.auth_deps")
+    if auth is not None and auth._verified is not None:
+        caches["auth_token_cache"] = auth.token_cache_stats()
+    for name, stats in caches.items():
+        out += _numeric(name, name.replace("_", " ").capitalize(), stats)
+    if rag._rag is not None:
+        s = rag._rag.stats()
+        out += [("tinyrag_docs", "Docs in the lexical index.", {}, s["docs"]),
+                ("tinyrag_terms", "Distinct terms in the lexical index.", {}, s["terms"])]
+    topics = sys.modules.get("app.services.topics")
+    if topics is not None:
+        out += _numeric("topics_updater", "Topic updater", topics.stats())
+    snapshot = sys.modules.get("app.services.snapshot")
+    if snapshot is not None and snapshot.last_restore:
+        out += _numeric("snapshot_restore", "Startup snapshot restore", snapshot.last_restore)
+    shared = sys.modules.get("app.services.shared_index")
+    if shared is not None and shared._current is not None:
+        out += _numeric("shared_index", "Shared mapped index", shared.stats())
+    return out
+
+
+metrics.register_collector(_runtime_gauges)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """Request latency histograms, hot-path spans and service counters (Prometheus text format)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
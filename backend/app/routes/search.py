@@ -1,22 +1,229 @@
 # backend/app/routes/search.py
 from __future__ import annotations
 
-from typing import Dict, Any
-from fastapi import APIRouter, Query
+import json
+import os
+import time
+from concurrent.futures import TimeoutError as FuturesTimeout, as_completed
+from typing import Dict, Any, Iterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from app.services.vectorstore import search as vs_search
+from app.models.search import SearchBatchRequest
+from app.routes.streaming import stream, wants_sse
+from app.services import federated, hybrid
+from app.services.cache import LRUTTLCache
+from app.services.metrics import span
+from app.services.vectorstore import (
+    build_where, generation, query_encoder_stats, search as vs_search, search_many, to_epoch,
+)
 
 router = APIRouter(tags=["search"])
 
+# Result cache for repeated queries; entries die on TTL or on the next ingest
+SEARCH_BATCH_MAX = int(os.getenv("SEARCH_BATCH_MAX", "100"))
+
+_results = LRUTTLCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "60")),
+)
+
+
+def _normalize(q: str) -> str:
+    return " ".join(q.split()).casefold()
+
+
+def _csv(raw: Any) -> Optional[List[str]]:
+    if raw is None:
+        return None
+    values = raw if isinstance(raw, list) else str(raw).split(",")
+    return [str(v).strip() for v in values if str(v).strip()] or None
+
+
+def _where(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Metadata filters -> Chroma `where`; times are epoch seconds or ISO-8601/RFC-822 dates."""
+    bounds: Dict[str, Optional[float]] = {}
+    for name in ("published_after", "published_before", "ingested_after", "ingested_before"):
+        raw = filters.get(name)
+        if raw in (None, ""):
+            continue
+        bounds[name] = to_epoch(raw)
+        if bounds[name] is None:
+            raise HTTPException(status_code=422, detail=f"{name}: expected epoch seconds or an ISO-8601 date")
+    return build_where(sources=_csv(filters.get("source")), feeds=_csv(filters.get("feed")), **bounds)
+
+
+def _where_key(where: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(where, sort_keys=True) if where else ""
+
+
+def _search_params(
+        q: str = Query(..., min_length=1, description="Search query"),
+        k: int = Query(10, ge=1, le=50),
+        mode: str = Query("vector", pattern="^(vector|hybrid)$",
+                          description="vector, or hybrid (vector + lexical, rank-fused)"),
+        w_vector: Optional[float] = Query(None, ge=0, description="hybrid fusion weight"),
+        w_lexical: Optional[float] = Query(None, ge=0, description="hybrid fusion weight"),
+        sources: Optional[str] = Query(None, description="comma-separated social sources to fan out to "
+                                       "(reddit,youtube,twitter); default SOCIAL_SOURCES (none)"),
+        social_limit: int = Query(5, ge=1, le=25),
+        source: Optional[str] = Query(None, description="only ingested docs with these "
+                                      "comma-separated metadata sources (e.g. rss)"),
+        feed: Optional[str] = Query(None, description="only docs from these comma-separated feed URLs"),
+        published_after: Optional[str] = Query(None, description="epoch seconds or ISO-8601"),
+        published_before: Optional[str] = Query(None, description="epoch seconds or ISO-8601"),
+        ingested_after: Optional[str] = Query(None, description="epoch seconds or ISO-8601"),
+        ingested_before: Optional[str] = Query(None, description="epoch seconds or ISO-8601")) -> Dict[str, Any]:
+    """Query parameters shared by /search and /search/stream."""
+    # filters are pushed into the Chroma query, so k stays full after filtering
+    where = _where({"source": source, "feed": feed,
+                    "published_after": published_after, "published_before": published_before,
+                    "ingested_after": ingested_after, "ingested_before": ingested_before})
+    weights = {n: w for n, w in (("vector", w_vector), ("lexical", w_lexical)) if w is not None}
+    return {
+        "q": q, "k": k, "mode": mode, "weights": weights, "where": where, "social_limit": social_limit,
+        "sources": None if sources is None else [s.strip() for s in sources.split(",") if s.strip()],
+        "key": (_normalize(q), k, mode, tuple(sorted(weights.items())), _where_key(where)),
+    }
+
 
 @router.get("/search")
-def search(q: str = Query(..., min_length=1, description="Search query"),
-           k: int = Query(10, ge=1, le=50)) -> Dict[str, Any]:
-    results = vs_search(q, k=k)
+def search(p: Dict[str, Any] = Depends(_search_params)) -> Dict[str, Any]:
+    q, k, where = p["q"], p["k"], p["where"]
+    # social fan-out runs while we search locally
+    social = federated.submit(q, limit=p["social_limit"], sources=p["sources"])
+
+    gen = generation()
+    payload = _results.get(p["key"], gen)
+    if payload is None:
+        with span("search.local", mode=p["mode"]):
+            if p["mode"] == "hybrid":
+                res = hybrid.hybrid_search(q, k=k, weights=p["weights"], where=where)
+                payload = {"rag": res["results"], "retrievers": res["retrievers"]}
+                cacheable = not res["degraded"]  # don't pin a partial answer
+            else:
+                payload = {"rag": vs_search(q, k=k, where=where)}
+                cacheable = True
+        if cacheable:
+            _results.put(p["key"], payload, gen)
+    with span("search.social_wait"):
+        fed = federated.gather(social)
     return {
         "query": q,
-        "rag": results,       # vector results from your ingested docs
-        "sources": {},        # keep shape compatible with your UI
-        "count": len(results)
+        **payload,            # "rag": vector/hybrid results from your ingested docs
+        "sources": fed["results"],
+        "source_timings": fed["timings"],
+        "count": len(payload["rag"])
     }
 
+
+def _search_events(p: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Events in completion order: "start"; "retriever" per hybrid retriever;
+    "rag" once local results are final; "source" per social source; "done".
+    """
+    t0 = time.perf_counter()
+    q, k, where = p["q"], p["k"], p["where"]
+    social = federated.submit(q, limit=p["social_limit"], sources=p["sources"])
+    yield {"type": "start", "query": q, "k": k, "mode": p["mode"], "sources": list(social["futures"])}
+
+    gen = generation()
+    payload = _results.get(p["key"], gen)
+    cached = payload is not None
+    local = None
+    if payload is None and p["mode"] == "hybrid":
+        local = hybrid.submit(q, k=k, weights=p["weights"], where=where)
+    elif payload is None:
+        payload = {"rag": vs_search(q, k=k, where=where)}
+        _results.put(p["key"], payload, gen)
+    if payload is not None:
+        yield {"type": "rag", "results": payload["rag"], "count": len(payload["rag"]), "cached": cached,
+               **({"retrievers": payload["retrievers"]} if "retrievers" in payload else {}),
+               "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+    pending = {fut: ("source", name) for name, fut in social["futures"].items()}
+    if local is not None:
+        pending.update({fut: ("retriever", name) for name, fut in local["futures"].items()})
+    deadline = max([social["deadline"]] + ([local["deadline"]] if local else []))
+    timings: Dict[str, Dict[str, Any]] = {}
+    try:
+        for fut in as_completed(list(pending), timeout=max(0.0, deadline - time.monotonic())):
+            kind, name = pending.pop(fut)
+            if kind == "source":
+                out = federated.outcome(fut)
+                items = out.pop("items", [])
+                timings[name] = out
+                yield {"type": "source", "name": name, **out, "results": items}
+            else:
+                yield {"type": "retriever", "name": name, **hybrid.outcome(fut)}
+            if local is not None and not any(kind == "retriever" for kind, _ in pending.values()):
+                res = hybrid.fuse(local)
+                if not res["degraded"]:
+                    _results.put(p["key"], {"rag": res["results"], "retrievers": res["retrievers"]}, gen)
+                yield {"type": "rag", "results": res["results"], "count": len(res["results"]),
+                       "retrievers": res["retrievers"], "ms": round((time.perf_counter() - t0) * 1000, 1)}
+                local = None
+    except FuturesTimeout:
+        pass
+
+    # anything still pending ran past its deadline
+    if local is not None:
+        res = hybrid.fuse(local)
+        yield {"type": "rag", "results": res["results"], "count": len(res["results"]),
+               "retrievers": res["retrievers"], "ms": round((time.perf_counter() - t0) * 1000, 1)}
+    for fut, (kind, name) in pending.items():
+        if kind == "source":
+            timings[name] = federated.outcome(fut)
+            timings[name].pop("items", None)
+            yield {"type": "source", "name": name, **timings[name], "results": []}
+    yield {"type": "done", "source_timings": timings, "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+
+@router.get("/search/stream")
+def search_stream(request: Request, p: Dict[str, Any] = Depends(_search_params),
+                  format: Optional[str] = Query(None, pattern="^(ndjson|sse)$",
+                                                description="default: SSE if Accept asks for it, else NDJSON")):
+    """
+    Same parameters as /search, streamed: local results are sent as soon as
+    they are ready and each social source as it answers, so a slow source
+    no longer holds back the rest. See _search_events for the event types.
+    """
+    return stream(_search_events(p), wants_sse(request, format))
+
+
+@router.post("/search/batch")
+def search_batch(body: SearchBatchRequest) -> Dict[str, Any]:
+    """
+    Body: {"queries": ["rag basics", "fastapi"], "k": 10,
+           "filters": {"source": "rss", "published_after": "2025-01-01"}}   # filters optional
+    Vector results for every query, embedded in one model pass and fetched
+    with one Chroma query. Shares the result cache with GET /search.
+    """
+    queries: List[str] = [q for q in body.queries if q.strip()]
+    k = body.k
+    if len(queries) > SEARCH_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"at most {SEARCH_BATCH_MAX} queries per batch")
+    where = _where(body.filters)
+
+    gen = generation()
+    keys = [(_normalize(q), k, "vector", (), _where_key(where)) for q in queries]
+    payloads = [_results.get(key, gen) for key in keys]
+    missing = [i for i, p in enumerate(payloads) if p is None]
+    if missing:
+        fresh = search_many([queries[i] for i in missing], k=k, where=where)
+        for i, results in zip(missing, fresh):
+            payloads[i] = {"rag": results}
+            _results.put(keys[i], payloads[i], gen)
+
+    return {
+        "results": [
+            {"query": q, "rag": p["rag"], "count": len(p["rag"])}
+            for q, p in zip(queries, payloads)
+        ],
+        "cached": len(queries) - len(missing),
+    }
+
+
+@router.get("/search/cache")
+def search_cache_stats() -> Dict[str, Any]:
+    """Result-cache and query-encoder counters for tuning SEARCH_CACHE_* / QUERY_* settings."""
+    return {"generation": generation(), **_results.stats(), "query_encoder": query_encoder_stats()}
@@ -0,0 +1,31 @@
+# backend/app/routes/social.py
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Query
+
+from app.services.federated import ADAPTERS, SOCIAL_SOURCES, federated_search
+from app.services.outbound import OUTBOUND
+
+router = APIRouter(prefix="/social", tags=["social"])
+
+
+@router.get("/search")
+def social_search(q: str = Query(..., min_length=1),
+                  limit: int = Query(5, ge=1, le=25),
+                  sources: Optional[str] = Query(None, description="comma-separated; default SOCIAL_SOURCES, "
+                                                 "or every source when that is empty")) -> Dict[str, Any]:
+    """Social sources only (no local index)."""
+    if sources is None:
+        wanted = SOCIAL_SOURCES or list(ADAPTERS)
+    else:
+        wanted = [s.strip() for s in sources.split(",") if s.strip()]
+    res = federated_search(q, limit=limit, sources=wanted)
+    return {"query": q, "sources": res["results"], "source_timings": res["timings"]}
+
+
+@router.get("/metrics")
+def social_metrics() -> Dict[str, Any]:
+    """Outbound cache / coalescing / rate-limit counters per source."""
+    return OUTBOUND.metrics()
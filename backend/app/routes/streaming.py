@@ -0,0 +1,38 @@
+# backend/app/routes/streaming.py
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+# Shared by the streaming endpoints; not a router itself.
+
+NDJSON = "application/x-ndjson"
+SSE = "text/event-stream"
+
+
+def wants_sse(request: Request, fmt: Optional[str]) -> bool:
+    """`format=sse|ndjson` wins; otherwise an EventSource-style Accept header picks SSE."""
+    if fmt:
+        return fmt.lower() == "sse"
+    return SSE in request.headers.get("accept", "")
+
+
+def _encode(events: Iterable[Dict[str, Any]], sse: bool) -> Iterator[str]:
+    for event in events:
+        data = json.dumps(event, default=str)
+        if sse:
+            yield f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+        else:
+            yield data + "\n"
+
+
+def stream(events: Iterable[Dict[str, Any]], sse: bool) -> StreamingResponse:
+    """
+    Send each event as soon as it is produced: one JSON object per line, or
+    `event: <type>` / `data: <json>` frames for SSE. Every event has a "type".
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # no proxy buffering
+    return StreamingResponse(_encode(events, sse), media_type=SSE if sse else NDJSON, headers=headers)
@@ -1,32 +1,50 @@
+import time
+
 from fastapi import APIRouter, Query
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import MiniBatchKMeans
-from ..services.vectorstore import _collection
+
+from ..services.metrics import span
+from ..services.vectorstore import on_ingest
 
 router = APIRouter()
 
+
+def _observe(ids, docs, metas):
+    from ..services import topics  # lazy: scikit-learn loads on first ingest/trends call
+
+    topics.observe(ids, docs, metas)
+
+
+# Keep the topic model current as documents are ingested
+on_ingest(_observe)
+
+
 @router.get("/trends")
-def trends(k: int = Query(8, ge=2, le=20)):
-    res = _collection.get(include=["documents","metadatas","ids"], limit=500)
-    docs = res.get("documents") or []
-    if not docs:
-        return {"topics": [], "keywords": []}
-
-    tfidf = TfidfVectorizer(max_features=2000, ngram_range=(1,2), stop_words="english")
-    X = tfidf.fit_transform(docs)
-
-    n_clusters = min(k, max(2, X.shape[0]//20))
-    km = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init="auto")
-    labels = km.fit_predict(X)
-
-    terms = tfidf.get_feature_names_out()
-    topic_keywords = []
-    for c in range(n_clusters):
-        center = km.cluster_centers_[c]
-        top_idx = center.argsort()[-6:][::-1]
-        topic_keywords.append({"topic": c, "keywords": [terms[i] for i in top_idx]})
-
-    counts = [int((labels==c).sum()) for c in range(n_clusters)]
-    topics = [{"topic": i, "count": counts[i]} for i in range(n_clusters)]
-    topics.sort(key=lambda t: t["count"], reverse=True)
-    return {"topics": topics[:k], "keywords": topic_keywords}
+def trends(k: int = Query(8, ge=2, le=20),
+           mode: str = Query("text", pattern="^(text|embeddings)$",
+                             description="text (streaming TF-IDF model) or embeddings (clusters stored vectors)")):
+    """
+    Serve the latest background topic snapshot; no model work on the request path.
+
+    `k` is how many of the model's TOPICS_CLUSTERS clusters to return, largest
+    first. Until the background model has clusters (fewer docs than
+    TOPICS_CLUSTERS, or still seeding), a one-off batch clustering of up to
+    500 docs answers instead, and there `k` is the cluster count, as before.
+    """
+    from ..services import topics  # lazy import
+
+    with span("trends.snapshot", mode=mode):
+        snap = topics.embedding_snapshot() if mode == "embeddings" else topics.snapshot()
+    warming_up = not snap["topics"]
+    if warming_up:
+        with span("trends.batch_fallback"):
+            snap = topics.cluster_batch(k)
+    top = snap["topics"][:k]
+    wanted = {t["topic"] for t in top}
+    updated = snap["updated_at"]
+    return {
+        "topics": top,
+        "keywords": [kw for kw in snap["keywords"] if kw["topic"] in wanted],
+        "docs_covered": snap["docs"],
+        "snapshot_age_s": round(time.time() - updated, 1) if updated else None,
+        "mode": "batch" if warming_up else mode,
+    }
@@ -0,0 +1,284 @@
+# backend/app/services/bulk.py
+"""
+Streaming bulk ingest of JSONL (optionally gzip-compressed) records.
+
+Bytes are fed in chunks as they arrive; lines are parsed on the feeding
+thread and grouped into fixed-size batches, which a single writer thread
+upserts through `add` (vectorstore.add_documents). The queue between the two
+is bounded, so when embedding falls behind, `feed` blocks and the caller
+stops reading input: memory stays flat whatever the file size.
+
+CLI (from backend/):
+    python -m app.services.bulk posts.jsonl.gz
+    zcat posts.jsonl.gz | python -m app.services.bulk -
+    python -m app.services.bulk posts.jsonl --url http://localhost:8000   # stream to a running server
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.services.feeds import INGEST_BATCH_SIZE
+
+# Batches waiting for the writer; parsing blocks once this many are queued
+BULK_QUEUE_BATCHES = int(os.getenv("BULK_QUEUE_BATCHES", "4"))
+# Longer lines are skipped (counted as bad) instead of buffered without limit
+BULK_MAX_LINE_BYTES = int(os.getenv("BULK_MAX_LINE_BYTES", str(1 << 20)))
+BULK_READ_CHUNK = 1 << 20
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_MAX_ERRORS_KEPT = 5
+
+
+class BulkIngest:
+    """
+    One bulk load. Call `feed(chunk)` with raw (or gzip) bytes as they arrive,
+    then `close()` for the final stats. Gzip is detected from the magic bytes;
+    concatenated gzip members are fine. Records are add_documents items
+    ({text, id?, url?, source?, ...}); within a batch the last record per id wins.
+    """
+
+    def __init__(self, add: Optional[Callable[[List[Dict[str, Any]]], int]] = None,
+                 batch_size: int = INGEST_BATCH_SIZE, queue_batches: int = BULK_QUEUE_BATCHES,
+                 max_line_bytes: int = BULK_MAX_LINE_BYTES,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        if add is None:
+            from app.services.vectorstore import add_documents  # lazy import
+
+            add = add_documents
+        self.add = add
+        self.batch_size = max(1, batch_size)
+        self.max_line_bytes = max_line_bytes
+        self.progress = progress
+        self._queue: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=max(1, queue_batches))
+        self._batch: Dict[str, Dict[str, Any]] = {}
+        self._pending = b""
+        self._skipping = False  # inside an over-long line
+        self._inflate = None
+        self._head = b""  # first bytes, until gzip can be sniffed
+        self._sniffed = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.t0 = time.perf_counter()
+        self.stats: Dict[str, Any] = {
+            "bytes_in": 0, "lines": 0, "records": 0, "bad_lines": 0, "errors": [],
+            "batches": 0, "written": 0, "added": 0, "gzip": False, "blocked_s": 0.0, "embed_s": 0.0,
+        }
+        self._writer = threading.Thread(target=self._write_loop, name="bulk-ingest-writer", daemon=True)
+        self._writer.start()
+
+    # ----- writer side -----
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error is not None:
+                continue  # drain so a blocked feed() wakes up and sees the error
+            t0 = time.perf_counter()
+            try:
+                n = self.add(batch)
+            except Exception as exc:  # noqa: BLE001
+                self._error = exc
+                continue
+            self.stats["embed_s"] += time.perf_counter() - t0
+            self.stats["batches"] += 1
+            self.stats["written"] += len(batch)
+            self.stats["added"] += n
+            if self.progress is not None:
+                self.progress({"type": "batch", "added": n, "written": self.stats["written"],
+                               "records_per_s": self._rate()})
+
+    # ----- parsing side -----
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"bulk ingest aborted: {self._error}") from self._error
+
+    def _bad(self, lineno: int, reason: str) -> None:
+        self.stats["bad_lines"] += 1
+        if len(self.stats["errors"]) < _MAX_ERRORS_KEPT:
+            self.stats["errors"].append({"line": lineno, "error": reason})
+
+    def _decompress(self, chunk: bytes) -> Iterable[bytes]:
+        if not self._sniffed:
+            self._head += chunk
+            if len(self._head) < 2 and not self._closed:
+                return  # not enough bytes to tell gzip from plain yet
+            chunk, self._head = self._head, b""
+            self._sniffed = True
+            if chunk[:2] == _GZIP_MAGIC:
+                self.stats["gzip"] = True
+                self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._inflate is None:
+            yield chunk
+            return
+        data = chunk
+        while data:
+            # bounded output per step: a small compressed chunk can't balloon in memory
+            out = self._inflate.decompress(data, BULK_READ_CHUNK)
+            if out:
+                yield out
+            if self._inflate.eof:
+                data = self._inflate.unused_data  # next gzip member
+                self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if data else self._inflate
+            else:
+                data = self._inflate.unconsumed_tail
+
+    def _line(self, raw: bytes) -> None:
+        self.stats["lines"] += 1
+        if len(raw) > self.max_line_bytes:
+            self._bad(self.stats["lines"], f"line longer than {self.max_line_bytes} bytes")
+            return
+        raw = raw.strip()
+        if not raw:
+            return
+        try:
+            rec = json.loads(raw)
+        except ValueError as exc:
+            self._bad(self.stats["lines"], f"invalid JSON: {exc}")
+            return
+        if not isinstance(rec, dict) or not str(rec.get("text") or "").strip():
+            self._bad(self.stats["lines"], "expected an object with non-empty 'text'")
+            return
+        self.stats["records"] += 1
+        self._batch[str(rec.get("id") or rec.get("url") or rec["text"])] = rec
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._batch:
+            return
+        batch = list(self._batch.values())
+        self._batch = {}
+        t0 = time.perf_counter()
+        self._queue.put(batch)  # blocks while the writer is BULK_QUEUE_BATCHES behind
+        self.stats["blocked_s"] += time.perf_counter() - t0
+        self._check()
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse `chunk`; may block until the writer has room (that is the backpressure)."""
+        self._check()
+        self.stats["bytes_in"] += len(chunk)
+        for data in self._decompress(chunk):
+            start = 0
+            while True:
+                nl = data.find(b"\n", start)
+                if nl < 0:
+                    break
+                if self._skipping:
+                    self._skipping = False
+                else:
+                    self._line(self._pending + data[start:nl])
+                self._pending = b""
+                start = nl + 1
+            if not self._skipping:
+                self._pending += data[start:]
+                if len(self._pending) > self.max_line_bytes:
+                    self.stats["lines"] += 1
+                    self._bad(self.stats["lines"], f"line longer than {self.max_line_bytes} bytes")
+                    self._pending = b""
+                    self._skipping = True
+
+    def close(self) -> Dict[str, Any]:
+        """Flush the tail, wait for the writer and return the stats."""
+        self._closed = True
+        try:
+            if not self._sniffed:
+                for data in self._decompress(b""):
+                    self._pending += data
+            if self._inflate is not None and not self._inflate.eof:
+                self._bad(self.stats["lines"] + 1, "truncated gzip stream")
+            if self._pending and not self._skipping:
+                self._line(self._pending)
+            self._pending = b""
+            self._flush()
+        finally:
+            self._queue.put(None)
+            self._writer.join()
+        self._check()
+        return self.result()
+
+    def abort(self, reason: str = "aborted") -> None:
+        """Stop after the batch being written; queued batches are dropped."""
+        if self._error is None:
+            self._error = RuntimeError(reason)
+        self._queue.put(None)
+        self._writer.join()
+
+    def _rate(self) -> float:
+        """Records through add() per second (parsing alone runs ahead by the queue)."""
+        elapsed = time.perf_counter() - self.t0
+        return round(self.stats["written"] / elapsed, 1) if elapsed > 0 else 0.0
+
+    def result(self) -> Dict[str, Any]:
+        out = dict(self.stats, errors=list(self.stats["errors"]))
+        out["elapsed_s"] = round(time.perf_counter() - self.t0, 3)
+        out["records_per_s"] = self._rate()
+        out["blocked_s"] = round(out["blocked_s"], 3)
+        out["embed_s"] = round(out["embed_s"], 3)
+        return out
+
+
+def ingest_stream(chunks: Iterable[bytes], **kwargs: Any) -> Dict[str, Any]:
+    """Run a whole BulkIngest over an iterable of byte chunks (file, stdin, generator)."""
+    bulk = BulkIngest(**kwargs)
+    try:
+        for chunk in chunks:
+            bulk.feed(chunk)
+    except BaseException:
+        bulk.abort()
+        raise
+    return bulk.close()
+
+
+def _read_chunks(f, size: int = BULK_READ_CHUNK) -> Iterable[bytes]:
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def main() -> None:
+    import argparse
+    import sys
+
+    ap = argparse.ArgumentParser(description="Bulk-load JSONL / JSONL.gz records ({text, id?, url?, ...}).")
+    ap.add_argument("path", help="input file, or - for stdin")
+    ap.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    ap.add_argument("--queue-batches", type=int, default=BULK_QUEUE_BATCHES)
+    ap.add_argument("--url", help="POST the file to <url>/api/ingest/bulk instead of writing the local store")
+    args = ap.parse_args()
+
+    f = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        if args.url:
+            import requests
+
+            # a generator body is sent chunked, so the file is streamed rather than read into memory
+            r = requests.post(f"{args.url.rstrip('/')}/api/ingest/bulk", params={"batch_size": args.batch_size},
+                              data=_read_chunks(f), timeout=None)
+            r.raise_for_status()
+            result = r.json()
+        else:
+            def report(event: Dict[str, Any]) -> None:
+                print(f"\r[bulk] {event['written']} records, {event['records_per_s']}/s", end="", file=sys.stderr)
+
+            result = ingest_stream(_read_chunks(f), batch_size=args.batch_size,
+                                   queue_batches=args.queue_batches, progress=report)
+            print(file=sys.stderr)
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
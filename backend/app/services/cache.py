@@ -0,0 +1,90 @@
+# backend/app/services/cache.py
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def _approx_size(value: Any) -> int:
+    """Rough payload size in bytes (JSON-encoded length)."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class LRUTTLCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL and an optional generation tag.
+
+    An entry stored under generation `g` is only returned to readers passing the
+    same `g`, so bumping a counter elsewhere (e.g. on ingest) invalidates everything
+    cached before it without touching the cache. Pass ttl=0 to disable expiry.
+    `sizer` estimates an entry's bytes for stats (default: JSON length).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0,
+                 sizer: Callable[[Any], int] = _approx_size):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.sizer = sizer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._data: "OrderedDict[Hashable, Tuple[int, float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, generation: int = 0) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                gen, expires, value, _ = entry
+                if gen == generation and (not expires or expires > now):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any, generation: int = 0, ttl: Optional[float] = None) -> None:
+        """`ttl` overrides the cache-wide TTL for this entry (e.g. a token's remaining lifetime)."""
+        ttl = self.ttl if ttl is None else ttl
+        size = self.sizer(value)
+        expires = time.monotonic() + ttl if ttl else 0.0
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (generation, expires, value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "approx_bytes": self._bytes,
+            }
@@ -0,0 +1,122 @@
+# backend/app/services/embed_cache.py
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+# SQLite's bound-parameter limit is 999 on older builds
+_CHUNK = 500
+
+
+class EmbeddingCache:
+    """
+    Persistent (SQLite) cache of embeddings keyed by model name + text hash.
+
+    `embed(texts, fn)` returns one float32 vector per text, calling `fn` only for
+    texts not seen before under the same model. Size is bounded by `max_entries`;
+    least recently used rows are evicted first.
+    """
+
+    def __init__(self, path: str, model: str, max_entries: int = 200_000):
+        self.path = path
+        self.model = model
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, vec BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings(last_used)")
+        self._db.commit()
+
+    def _key(self, text: str) -> str:
+        h = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return f"{self.model}:{h}"
+
+    def _load(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i:i + _CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = self._db.execute(f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", chunk)
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            now = time.time()
+            self._db.executemany("UPDATE embeddings SET last_used=? WHERE key=?", [(now, k) for k in found])
+        return found
+
+    def _store(self, pairs: Dict[str, np.ndarray]) -> None:
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings(key, vec, last_used) VALUES (?, ?, ?)",
+            [(k, v.tobytes(), now) for k, v in pairs.items()],
+        )
+        (count,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > self.max_entries:
+            # evict down to 90% so we don't pay this on every batch
+            drop = count - int(self.max_entries * 0.9)
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN"
+                " (SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (drop,),
+            )
+            self.evictions += drop
+
+    def embed(self, texts: List[str], fn: Callable[[List[str]], Sequence[Sequence[float]]]) -> List[np.ndarray]:
+        keys = [self._key(t) for t in texts]
+        with self._lock:
+            found = self._load(list(set(keys)))
+            self._db.commit()
+        # embed each distinct missing text once, without holding the lock: inference
+        # must not serialize other batches or block their cache hits
+        todo: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in todo:
+                todo[key] = text
+        if todo:
+            vecs = fn(list(todo.values()))
+            fresh = {k: np.asarray(v, dtype=np.float32) for k, v in zip(todo, vecs)}
+            with self._lock:
+                self._store(fresh)
+                self._db.commit()
+            found.update(fresh)
+        hits = sum(1 for k in keys if k not in todo)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return [found[k] for k in keys]
+
+    def put(self, texts: List[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors computed elsewhere (e.g. restored from a snapshot)."""
+        with self._lock:
+            self._store({self._key(t): np.asarray(v, dtype=np.float32) for t, v in zip(texts, vectors)})
+            self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            (size,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        total = self.hits + self.misses
+        return {
+            "model": self.model,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,221 @@
+# backend/app/services/embeddings.py
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+# "sentence-transformers" (PyTorch), "onnx" (int8-quantized ONNX Runtime), "onnx-fp32",
+# or "hashing" (offline stand-in with no model download; benchmarks and local dev only)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "sentence-transformers").lower()
+# ONNX Runtime intra-op threads (0 = let onnxruntime pick, usually one per core)
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+EMBED_MAX_TOKENS = int(os.getenv("EMBED_MAX_TOKENS", "256"))
+# Directory holding model.onnx + tokenizer.json; defaults to Chroma's MiniLM download
+EMBED_ONNX_DIR = os.getenv("EMBED_ONNX_DIR", "")
+
+BACKENDS = ("sentence-transformers", "onnx", "onnx-fp32", "hashing")
+HASHING_DIM = int(os.getenv("EMBED_HASHING_DIM", "384"))
+
+
+def _default_onnx_dir(model_name: str) -> str:
+    if model_name.split("/")[-1] != "all-MiniLM-L6-v2":
+        raise ValueError(f"EMBED_ONNX_DIR must point at an ONNX export of {model_name!r}")
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+    # Chroma ships (and caches) an ONNX export of the same model we use by default
+    ef = ONNXMiniLM_L6_V2()
+    ef._download_model_if_not_exists()
+    return os.path.join(ef.DOWNLOAD_PATH, ef.EXTRACTED_FOLDER_NAME)
+
+
+ONNX_EXTRA_HINT = ("EMBED_BACKEND=onnx needs the `onnx` extra (onnxruntime, tokenizers, onnx): "
+                   "poetry install -E onnx, or pip install onnxruntime tokenizers onnx")
+
+
+def quantize(src: str, dst: str) -> str:
+    """Write a dynamically int8-quantized copy of `src` (weights int8, activations fp32)."""
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic  # needs the `onnx` package
+    except ImportError as exc:
+        raise ImportError(f"{ONNX_EXTRA_HINT} ({exc})") from exc
+
+    tmp = dst + ".tmp"
+    quantize_dynamic(src, tmp, weight_type=QuantType.QInt8)
+    os.replace(tmp, dst)
+    return dst
+
+
+class OnnxEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Mean-pooled, L2-normalised sentence embeddings from an ONNX transformer
+    export, run on ONNX Runtime's CPU provider.
+
+    With quantized=True the int8 model (`model_int8.onnx`) is used, built from
+    `model.onnx` on first use if it isn't shipped alongside it. Texts are sorted
+    by length and padded per batch, so short queries don't pay for 256 tokens.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = True, threads: int = EMBED_THREADS,
+                 batch_size: int = EMBED_BATCH_SIZE, max_tokens: int = EMBED_MAX_TOKENS):
+        self.model_dir = model_dir
+        self.quantized = quantized
+        self.threads = threads
+        self.batch_size = max(1, batch_size)
+        self.max_tokens = max_tokens
+        self._session = None
+        self._tokenizer = None
+        self._inputs: List[str] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def name() -> str:
+        return "socialmediarag_onnx"
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"model_dir": self.model_dir, "quantized": self.quantized, "threads": self.threads,
+                "batch_size": self.batch_size, "max_tokens": self.max_tokens}
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "OnnxEmbeddingFunction":
+        return OnnxEmbeddingFunction(**config)
+
+    def model_path(self) -> str:
+        fp32 = os.path.join(self.model_dir, "model.onnx")
+        if not self.quantized:
+            return fp32
+        int8 = os.path.join(self.model_dir, "model_int8.onnx")
+        if not os.path.exists(int8):
+            print(f"[embeddings] quantizing {fp32} -> {int8}")
+            quantize(fp32, int8)
+        return int8
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                return
+            try:
+                import onnxruntime as ort
+                from tokenizers import Tokenizer
+            except ImportError as exc:
+                raise ImportError(f"{ONNX_EXTRA_HINT} ({exc})") from exc
+
+            tok = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+            tok.enable_truncation(max_length=self.max_tokens)
+            tok.no_padding()  # padded per batch in _forward
+
+            so = ort.SessionOptions()
+            so.log_severity_level = 3
+            so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            so.inter_op_num_threads = 1
+            if self.threads > 0:
+                so.intra_op_num_threads = self.threads
+            session = ort.InferenceSession(self.model_path(), sess_options=so,
+                                           providers=["CPUExecutionProvider"])
+            self._inputs = [i.name for i in session.get_inputs()]
+            self._tokenizer = tok
+            self._session = session
+
+    def _forward(self, encoded: list) -> np.ndarray:
+        width = max(len(e.ids) for e in encoded)
+        ids = np.zeros((len(encoded), width), dtype=np.int64)
+        mask = np.zeros((len(encoded), width), dtype=np.int64)
+        for row, e in enumerate(encoded):
+            ids[row, :len(e.ids)] = e.ids
+            mask[row, :len(e.ids)] = 1
+        feed = {"input_ids": ids, "attention_mask": mask, "token_type_ids": np.zeros_like(ids)}
+        out = self._session.run(None, {k: v for k, v in feed.items() if k in self._inputs})[0]
+        if out.ndim == 3:  # token states -> mean over real tokens
+            m = mask[..., None].astype(np.float32)
+            out = (out * m).sum(1) / np.clip(m.sum(1), 1e-9, None)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return (out / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        if self._session is None:
+            self._load()
+        texts = list(input)
+        if not texts:
+            return []
+        encoded = self._tokenizer.encode_batch(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(encoded[i].ids))
+        out = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            vecs = self._forward([encoded[i] for i in rows])
+            if out.shape[1] == 0:
+                out = np.empty((len(texts), vecs.shape[1]), dtype=np.float32)
+            out[rows] = vecs
+        return list(out)
+
+
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Signed feature hashing of word unigrams and bigrams into `dim` buckets,
+    L2-normalised. Deterministic and dependency-free: texts sharing words end
+    up close, which is enough to exercise indexing and search paths offline.
+    Not a semantic model.
+    """
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+
+    @staticmethod
+    def name() -> str:
+        return "socialmediarag_hashing"
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"dim": self.dim}
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(**config)
+
+    def _vector(self, text: str) -> np.ndarray:
+        v = np.zeros(self.dim, dtype=np.float32)
+        words = text.lower().split()
+        for feat in words + [a + " " + b for a, b in zip(words, words[1:])]:
+            h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest(), "little")
+            v[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        n = float(np.linalg.norm(v))
+        if n == 0:
+            v[0] = 1.0  # empty text still needs a valid unit vector
+            return v
+        return v / n
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return [self._vector(t) for t in input]
+
+
+def backend_key(model_name: str, backend: Optional[str] = None) -> str:
+    """Model id for the embedding cache; quantized vectors must not mix with fp32 ones."""
+    backend = (backend or EMBED_BACKEND).lower()
+    if backend == "sentence-transformers":
+        return model_name  # keeps caches written before backends were pluggable
+    return f"{model_name}@{'onnx-int8' if backend == 'onnx' else backend}"
+
+
+def make_embedding_function(model_name: str, backend: Optional[str] = None,
+                            threads: Optional[int] = None, batch_size: Optional[int] = None):
+    """Embedding function for `model_name` on the configured backend (EMBED_BACKEND)."""
+    backend = (backend or EMBED_BACKEND).lower()
+    if backend == "sentence-transformers":
+        from chromadb.utils import embedding_functions
+
+        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+    if backend in {"onnx", "onnx-fp32"}:
+        return OnnxEmbeddingFunction(
+            EMBED_ONNX_DIR or _default_onnx_dir(model_name),
+            quantized=backend == "onnx",
+            threads=EMBED_THREADS if threads is None else threads,
+            batch_size=batch_size or EMBED_BATCH_SIZE,
+        )
+    if backend == "hashing":
+        return HashingEmbeddingFunction()
+    raise ValueError(f"unknown EMBED_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
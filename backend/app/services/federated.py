@@ -0,0 +1,96 @@
+# backend/app/services/federated.py
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.services.metrics import span
+from app.services.reddit import fetch_reddit
+from app.services.twitter import search_twitter
+from app.services.youtube import fetch_youtube
+
+SOCIAL_DEADLINE_MS = float(os.getenv("SOCIAL_DEADLINE_MS", "3000"))
+# Sources /api/search fans out to when the request doesn't name any; empty (the default)
+# keeps plain searches local, so only callers passing ?sources=... wait on the network
+SOCIAL_SOURCES = [s.strip() for s in os.getenv("SOCIAL_SOURCES", "").split(",") if s.strip()]
+
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("SOCIAL_WORKERS", "16")), thread_name_prefix="social")
+
+
+def _twitter(q: str, limit: int, timeout: float) -> List[Dict[str, Any]]:
+    return list(search_twitter(q, max_results=limit).get("items") or [])
+
+
+# Every adapter is called as fn(query, limit, timeout) and raises on failure
+ADAPTERS: Dict[str, Callable[[str, int, float], List[Dict[str, Any]]]] = {
+    "reddit": fetch_reddit,
+    "youtube": fetch_youtube,
+    "twitter": _twitter,
+}
+
+
+def _describe(exc: Exception) -> str:
+    # never echo request URLs: they can carry API keys
+    resp = getattr(exc, "response", None)
+    if resp is not None:
+        return f"HTTP {resp.status_code}"
+    return type(exc).__name__
+
+
+def _timed(name: str, q: str, limit: int, timeout: float):
+    t0 = time.perf_counter()
+    with span("social.adapter", source=name):
+        items = ADAPTERS[name](q, limit, timeout)
+    return items, (time.perf_counter() - t0) * 1000
+
+
+def submit(q: str, limit: int = 5, sources: Optional[Sequence[str]] = None,
+           deadline_ms: Optional[float] = None) -> Dict[str, Any]:
+    """Start every source adapter on the pool; pair with gather()."""
+    names = [s for s in (SOCIAL_SOURCES if sources is None else sources) if s in ADAPTERS]
+    budget = (deadline_ms if deadline_ms is not None else SOCIAL_DEADLINE_MS) / 1000
+    return {
+        "deadline": time.monotonic() + budget,
+        "futures": {name: _pool.submit(_timed, name, q, limit, budget) for name in names},
+    }
+
+
+def outcome(fut) -> Dict[str, Any]:
+    """Timing/status report for one source future, plus its items when it succeeded."""
+    if not fut.done():
+        fut.cancel()
+        return {"status": "timeout"}
+    try:
+        items, ms = fut.result()
+    except Exception as exc:  # noqa: BLE001
+        return {"status": "error", "error": _describe(exc)}
+    return {"status": "ok", "ms": round(ms, 1), "count": len(items), "items": items}
+
+
+def gather(pending: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Collect whatever finished before the global deadline. Sources that fail or
+    run late are reported in "timings" and contribute an empty result list.
+    """
+    futures = pending["futures"]
+    wait(futures.values(), timeout=max(0.0, pending["deadline"] - time.monotonic()))
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+    for name, fut in futures.items():
+        timings[name] = outcome(fut)
+        results[name] = timings[name].pop("items", [])
+
+    return {
+        "results": results,
+        "timings": timings,
+        "partial": any(t["status"] != "ok" for t in timings.values()),
+    }
+
+
+def federated_search(q: str, limit: int = 5, sources: Optional[Sequence[str]] = None,
+                     deadline_ms: Optional[float] = None) -> Dict[str, Any]:
+    """Fan out to all source adapters concurrently and return within the deadline."""
+    return gather(submit(q, limit, sources, deadline_ms))
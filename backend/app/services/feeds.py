@@ -0,0 +1,215 @@
+# backend/app/services/feeds.py
+from __future__ import annotations
+
+import calendar
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from app.services.http import get_session
+from app.services.metrics import span
+from app.services.outbound import OUTBOUND
+
+# Per-feed ETag / Last-Modified, kept next to the Chroma data
+FEED_STATE_PATH = os.getenv(
+    "FEED_STATE_PATH",
+    os.path.join(os.getenv("CHROMA_PATH", "/opt/render/project/.chroma"), "feed_state.json"),
+)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "8"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+FEED_TIMEOUT = float(os.getenv("FEED_TIMEOUT", "12"))
+_UA = os.getenv("FEED_USER_AGENT", "SocialMediaRAG/0.1 (+feed ingest)")
+
+_state_lock = threading.Lock()
+_state: Optional[Dict[str, Dict[str, str]]] = None
+
+
+def _load_state() -> Dict[str, Dict[str, str]]:
+    global _state
+    if _state is None:
+        try:
+            with open(FEED_STATE_PATH, "r", encoding="utf-8") as f:
+                _state = json.load(f)
+        except (OSError, ValueError):
+            _state = {}
+    return _state
+
+
+def _save_state(updates: Dict[str, Dict[str, str]]) -> None:
+    with _state_lock:
+        state = _load_state()
+        state.update(updates)
+        try:
+            os.makedirs(os.path.dirname(FEED_STATE_PATH) or ".", exist_ok=True)
+            tmp = FEED_STATE_PATH + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, FEED_STATE_PATH)
+        except OSError as exc:
+            print(f"[feeds] could not persist feed state: {exc}")
+
+
+def entries_to_items(feed_url: str, entries: List[Any]) -> List[Dict[str, Any]]:
+    """Map parsed feed entries to add_documents() items."""
+    items: List[Dict[str, Any]] = []
+    now = time.time()
+    for e in entries:
+        title = (getattr(e, "title", "") or "").strip()
+        link = (getattr(e, "link", "") or "").strip()
+        summary = (getattr(e, "summary", "") or "").strip()
+        content = summary or title
+
+        if not content:
+            continue
+
+        parsed = getattr(e, "published_parsed", None) or getattr(e, "updated_parsed", None)
+        items.append(
+            {
+                "id": link or None,
+                "url": link or None,
+                "source": "rss",
+                "feed": feed_url,
+                "title": title,
+                "text": content,
+                "published": getattr(e, "published", None),
+                "ingested_at": datetime.utcnow().isoformat() + "Z",
+                # numeric copies so search can range-filter on them
+                **({"published_ts": float(calendar.timegm(parsed))} if parsed else {}),
+                "ingested_ts": now,
+            }
+        )
+    return items
+
+
+def fetch_feed(feed_url: str, conditional: bool = True) -> Dict[str, Any]:
+    """
+    GET one feed, sending If-None-Match / If-Modified-Since from the last run.
+    Returns {"url", "status", "items", "validators", "fetch_ms", "error"?}.
+    """
+    t0 = time.perf_counter()
+    headers = {"User-Agent": _UA}
+    if conditional:
+        with _state_lock:
+            prev = dict(_load_state().get(feed_url) or {})
+        if prev.get("etag"):
+            headers["If-None-Match"] = prev["etag"]
+        if prev.get("modified"):
+            headers["If-Modified-Since"] = prev["modified"]
+
+    out: Dict[str, Any] = {"url": feed_url, "status": None, "items": [], "validators": None}
+    try:
+        # coalesced + rate limited, but never cached: validators decide freshness
+        with span("feeds.fetch"):
+            r = OUTBOUND.call(
+                "rss", {"url": feed_url, **headers},
+                lambda: get_session().get(feed_url, headers=headers, timeout=FEED_TIMEOUT),
+                timeout=FEED_TIMEOUT, cache=False,
+            )
+        out["status"] = r.status_code
+        if r.status_code == 200:
+            import feedparser  # lazy import
+
+            with span("feeds.parse"):
+                parsed = feedparser.parse(r.content)
+                out["items"] = entries_to_items(feed_url, parsed.entries)
+            validators = {
+                k: v for k, v in
+                (("etag", r.headers.get("ETag")), ("modified", r.headers.get("Last-Modified")))
+                if v
+            }
+            out["validators"] = validators or None
+        elif r.status_code != 304:
+            out["error"] = f"HTTP {r.status_code}"
+    except requests.RequestException as exc:
+        out["error"] = str(exc)
+    out["fetch_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return out
+
+
+def ingest_feeds(
+    feeds: List[str],
+    add: Optional[Callable[[List[Dict[str, Any]]], Dict[str, int]]] = None,
+    workers: int = INGEST_WORKERS,
+    batch_size: int = INGEST_BATCH_SIZE,
+    conditional: bool = True,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch `feeds` concurrently on a bounded pool and upsert their entries through
+    `add` in merged batches of `batch_size`. Feeds answering 304 are skipped.
+    Validators are only persisted once every batch has been written.
+
+    `add` returns the rows written per feed url (default:
+    vectorstore.add_documents_by(items, "feed")), so `by_feed` and `added`
+    count what survived dedup and chunking, not the entries fetched.
+
+    `progress`, if given, receives {"type": "feed", "url", ...timing} as each
+    fetch completes and {"type": "batch", "added", "by_feed"} after each upsert.
+
+    `workers` comes from request bodies, so it is capped at INGEST_WORKERS.
+    """
+    if add is None:
+        from app.services.vectorstore import add_documents_by  # lazy import
+
+        def add(items: List[Dict[str, Any]]) -> Dict[str, int]:
+            return add_documents_by(items, "feed")
+    emit = progress or (lambda event: None)
+    t0 = time.perf_counter()
+    feeds = list(dict.fromkeys(feeds))
+    by_feed: Dict[str, int] = {f: 0 for f in feeds}
+    timings: Dict[str, Dict[str, Any]] = {}
+    validators: Dict[str, Dict[str, str]] = {}
+    buffer: Dict[str, Dict[str, Any]] = {}  # id -> item; dedupes syndicated entries within a batch
+    added = 0
+    skipped = 0
+
+    def flush() -> None:
+        nonlocal added
+        if not buffer:
+            return
+        batch = list(buffer.values())
+        buffer.clear()
+        with span("feeds.upsert"):
+            counts = add(batch)
+        n = sum(counts.values())
+        added += n
+        for url, c in counts.items():
+            by_feed[url] += c
+        emit({"type": "batch", "added": n, "by_feed": counts})
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, INGEST_WORKERS, len(feeds) or 1))) as pool:
+        futures = [pool.submit(fetch_feed, url, conditional) for url in feeds]
+        for fut in as_completed(futures):
+            res = fut.result()
+            url = res["url"]
+            timings[url] = {"fetch_ms": res["fetch_ms"], "status": res["status"], "entries": len(res["items"])}
+            if res.get("error"):
+                timings[url]["error"] = res["error"]
+            emit({"type": "feed", "url": url, **timings[url]})
+            if res["status"] == 304:
+                skipped += 1
+                continue
+            if res["validators"]:
+                validators[url] = res["validators"]
+            for it in res["items"]:
+                buffer[it["id"] or it["text"]] = it
+                if len(buffer) >= batch_size:
+                    flush()
+        flush()
+
+    if validators:
+        _save_state(validators)
+
+    return {
+        "added": added,
+        "by_feed": by_feed,
+        "skipped_304": skipped,
+        "timings": timings,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
@@ -0,0 +1,30 @@
+# backend/app/services/http.py
+from __future__ import annotations
+
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Keep-alive pool shared by every outbound caller (social adapters, feed fetches)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "16"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Singleton requests.Session with a bounded, keep-alive connection pool."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _session = s
+    return _session
@@ -0,0 +1,136 @@
+# backend/app/services/hybrid.py
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.rag import doc_key, get_rag
+from app.services.vectorstore import SHARED_INDEX, search as vs_search
+
+# Fusion weights as "retriever=weight,..."; RRF constant per Cormack et al.
+HYBRID_WEIGHTS = os.getenv("HYBRID_WEIGHTS", "vector=1.0,lexical=1.0")
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_DEADLINE_MS = float(os.getenv("HYBRID_DEADLINE_MS", "1500"))
+
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("HYBRID_WORKERS", "8")), thread_name_prefix="hybrid")
+
+
+def _parse_weights(raw: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, w = part.partition("=")
+        if name.strip() and w.strip():
+            out[name.strip()] = float(w)
+    return out
+
+
+DEFAULT_WEIGHTS = _parse_weights(HYBRID_WEIGHTS)
+
+
+def lexical_search(query: str, k: int = 10, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """TinyRAG results in the same shape as vectorstore.search()."""
+    rag = None
+    if SHARED_INDEX:
+        from app.services import shared_index  # lazy import
+
+        rag = shared_index.lexical()  # None until the first version is published
+    out: List[Dict[str, Any]] = []
+    for d in (rag or get_rag()).search(query, k=k, where=where, pad=False):
+        meta = {key: v for key, v in d.items() if key not in {"id", "text", "score"}}
+        out.append({"id": doc_key(d), "text": d.get("text"), "score": d["score"], "meta": meta})
+    return out
+
+
+# fn(query, k, where=None) -> results; `where` is a Chroma-style metadata filter
+RETRIEVERS: Dict[str, Callable[..., List[Dict[str, Any]]]] = {
+    "vector": vs_search,
+    "lexical": lexical_search,
+}
+
+
+def rrf(ranked: Dict[str, List[Dict[str, Any]]], weights: Dict[str, float],
+        k: int = 10, rrf_k: int = HYBRID_RRF_K) -> List[Dict[str, Any]]:
+    """Weighted reciprocal rank fusion: score(d) = sum_r w_r / (rrf_k + rank_r(d))."""
+    fused: Dict[str, Dict[str, Any]] = {}
+    for name, results in ranked.items():
+        w = weights.get(name, 1.0)
+        for rank, item in enumerate(results, start=1):
+            rid = item.get("id") or item.get("text")
+            entry = fused.get(rid)
+            if entry is None:
+                entry = fused[rid] = {**item, "score": 0.0, "ranks": {}}
+            entry["score"] += w / (rrf_k + rank)
+            entry["ranks"][name] = rank
+    out = sorted(fused.values(), key=lambda d: d["score"], reverse=True)[:k]
+    for d in out:
+        d["score"] = round(d["score"], 6)
+    return out
+
+
+def _timed(fn: Callable[..., List[Dict[str, Any]]], query: str, k: int,
+           where: Optional[Dict[str, Any]] = None):
+    t0 = time.perf_counter()
+    res = fn(query, k, where=where)
+    return res, (time.perf_counter() - t0) * 1000
+
+
+def submit(query: str, k: int = 10, weights: Optional[Dict[str, float]] = None,
+           deadline_ms: Optional[float] = None, where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Start every weighted retriever on the pool; pair with fuse()."""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    deadline = (deadline_ms if deadline_ms is not None else HYBRID_DEADLINE_MS) / 1000
+    # over-fetch so fusion has overlap to work with
+    depth = min(max(k * 2, 20), 100)
+    return {
+        "k": k,
+        "weights": weights,
+        "deadline": time.monotonic() + deadline,
+        "futures": {
+            name: _pool.submit(_timed, fn, query, depth, where)
+            for name, fn in RETRIEVERS.items()
+            if weights.get(name, 1.0) > 0
+        },
+    }
+
+
+def outcome(fut) -> Dict[str, Any]:
+    """Status report for one retriever future, plus its results when it succeeded."""
+    if not fut.done():
+        return {"status": "timeout"}
+    try:
+        results, ms = fut.result()
+    except Exception as exc:  # noqa: BLE001
+        return {"status": "error", "error": str(exc)}
+    return {"status": "ok", "ms": round(ms, 1), "count": len(results), "results": results}
+
+
+def fuse(pending: Dict[str, Any]) -> Dict[str, Any]:
+    """Fuse whatever finished before the deadline (see hybrid_search)."""
+    futures = pending["futures"]
+    wait(futures.values(), timeout=max(0.0, pending["deadline"] - time.monotonic()))
+
+    ranked: Dict[str, List[Dict[str, Any]]] = {}
+    report: Dict[str, Dict[str, Any]] = {}
+    for name, fut in futures.items():
+        report[name] = outcome(fut)
+        if report[name]["status"] == "ok":
+            ranked[name] = report[name].pop("results")
+
+    return {
+        "results": rrf(ranked, pending["weights"], k=pending["k"]),
+        "retrievers": report,
+        "degraded": len(ranked) < len(futures),
+    }
+
+
+def hybrid_search(query: str, k: int = 10, weights: Optional[Dict[str, float]] = None,
+                  deadline_ms: Optional[float] = None, where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run every retriever concurrently and fuse whatever finishes within the
+    deadline. A retriever that times out or fails is reported and left out,
+    so a slow side degrades the answer instead of stalling it. `where` is
+    applied inside every retriever, before ranking.
+    """
+    return fuse(submit(query, k, weights, deadline_ms, where))
@@ -0,0 +1,283 @@
+# backend/app/services/jobs.py
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.feeds import FEED_STATE_PATH, INGEST_BATCH_SIZE, INGEST_WORKERS, ingest_feeds
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev only, no cross-process lock
+    fcntl = None
+
+# Ingest jobs run here, never on the request path; keep it small so API threads stay free
+INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "2"))
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "200"))
+
+# Scheduled re-polling of registered feeds
+FEED_REGISTRY_PATH = os.getenv(
+    "FEED_REGISTRY_PATH", os.path.join(os.path.dirname(FEED_STATE_PATH) or ".", "feed_registry.json")
+)
+FEED_POLL_INTERVAL_S = float(os.getenv("FEED_POLL_INTERVAL_S", "900"))
+FEED_POLL_JITTER = float(os.getenv("FEED_POLL_JITTER", "0.1"))        # +/- fraction of the interval
+FEED_MAX_BACKOFF_S = float(os.getenv("FEED_MAX_BACKOFF_S", "21600"))  # 6h
+FEED_SCHEDULER = os.getenv("FEED_SCHEDULER", "on").lower() not in {"0", "false", "no", "off"}
+# Held (flock) by the one process running the scheduler, e.g. one of several uvicorn workers
+FEED_SCHEDULER_LOCK = os.getenv("FEED_SCHEDULER_LOCK", FEED_REGISTRY_PATH + ".lock")
+
+_pool = ThreadPoolExecutor(max_workers=INGEST_JOB_WORKERS, thread_name_prefix="ingest-job")
+_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+    out = json.loads(json.dumps(job))  # detached copy; jobs mutate while running
+    started = job.get("started_at")
+    if started:
+        elapsed = (job.get("finished_at") or _now()) - started
+        out["elapsed_s"] = round(elapsed, 2)
+        out["docs_per_s"] = round(job["added"] / elapsed, 1) if elapsed > 0 else None
+    return out
+
+
+def submit_feeds(feeds: List[str], batch_size: int = INGEST_BATCH_SIZE, workers: int = INGEST_WORKERS,
+                 conditional: bool = True, kind: str = "rss",
+                 on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+    """
+    Queue an ingest job for `feeds` and return its id immediately. `on_event`
+    additionally receives {"type": "started"} and every ingest_feeds progress event.
+    """
+    job_id = uuid.uuid4().hex[:12]
+    job = {
+        "id": job_id,
+        "kind": kind,
+        "status": "queued",
+        "created_at": _now(),
+        "started_at": None,
+        "finished_at": None,
+        "added": 0,
+        "feeds": {url: {"status": "pending", "added": 0} for url in dict.fromkeys(feeds)},
+        "skipped_304": 0,
+        "error": None,
+    }
+    with _lock:
+        _jobs[job_id] = job
+        while len(_jobs) > INGEST_JOB_HISTORY:
+            _jobs.popitem(last=False)
+    _pool.submit(_run, job, batch_size, workers, conditional, on_done, on_event)
+    return job_id
+
+
+def _run(job: Dict[str, Any], batch_size: int, workers: int, conditional: bool,
+         on_done: Optional[Callable[[Dict[str, Any]], None]],
+         on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+    def progress(event: Dict[str, Any]) -> None:
+        with _lock:
+            if event["type"] == "feed":
+                f = job["feeds"].setdefault(event["url"], {"added": 0})
+                f.update({k: v for k, v in event.items() if k not in {"type", "url"}})
+                f["status"] = "skipped" if event["status"] == 304 else ("error" if event.get("error") else "fetched")
+            elif event["type"] == "batch":
+                job["added"] += event["added"]
+                for url, n in event["by_feed"].items():
+                    job["feeds"][url]["added"] += n
+        if on_event is not None:
+            on_event(event)
+
+    with _lock:
+        job["status"] = "running"
+        job["started_at"] = _now()
+    if on_event is not None:
+        on_event({"type": "started", "job_id": job["id"]})
+    try:
+        res = ingest_feeds(list(job["feeds"]), workers=workers,
+                           batch_size=batch_size, conditional=conditional, progress=progress)
+        with _lock:
+            job["skipped_304"] = res["skipped_304"]
+            job["status"] = "done"
+    except Exception as exc:  # noqa: BLE001
+        with _lock:
+            job["status"] = "failed"
+            job["error"] = str(exc)
+    finally:
+        with _lock:
+            job["finished_at"] = _now()
+        if on_done is not None:
+            on_done(job)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        job = _jobs.get(job_id)
+        return _snapshot(job) if job is not None else None
+
+
+def list_jobs(limit: int = 20) -> List[Dict[str, Any]]:
+    with _lock:
+        recent = list(_jobs.values())[-limit:]
+        return [_snapshot(j) for j in reversed(recent)]
+
+
+# ----- feed registry + scheduler -----
+
+_registry: Optional[Dict[str, Dict[str, Any]]] = None
+_registry_mtime: Optional[int] = None
+_scheduler: Optional[threading.Thread] = None
+_scheduler_lock_file = None
+
+
+def _mtime() -> Optional[int]:
+    try:
+        return os.stat(FEED_REGISTRY_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_registry() -> Dict[str, Dict[str, Any]]:
+    """The registry, re-read when another process (worker) has rewritten the file."""
+    global _registry, _registry_mtime
+    mtime = _mtime()
+    if _registry is None or mtime != _registry_mtime:
+        try:
+            with open(FEED_REGISTRY_PATH, "r", encoding="utf-8") as f:
+                _registry = json.load(f)
+        except (OSError, ValueError):
+            _registry = {}
+        _registry_mtime = mtime
+    return _registry
+
+
+def _save_registry() -> None:
+    global _registry_mtime
+    try:
+        os.makedirs(os.path.dirname(FEED_REGISTRY_PATH) or ".", exist_ok=True)
+        tmp = FEED_REGISTRY_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_registry, f)
+        os.replace(tmp, FEED_REGISTRY_PATH)
+        _registry_mtime = _mtime()  # our own write: no reload needed
+    except OSError as exc:
+        print(f"[jobs] could not persist feed registry: {exc}")
+
+
+def _jittered(seconds: float) -> float:
+    return seconds * (1 + random.uniform(-FEED_POLL_JITTER, FEED_POLL_JITTER))
+
+
+def register_feeds(feeds: List[str], interval_s: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """Add/update feeds to poll every `interval_s`; first poll is due right away (jittered)."""
+    interval = float(interval_s or FEED_POLL_INTERVAL_S)
+    with _lock:
+        reg = _load_registry()
+        for url in feeds:
+            entry = reg.setdefault(url, {"failures": 0, "running": False})
+            entry["interval_s"] = interval
+            entry["next_at"] = _now() + random.uniform(0, FEED_POLL_JITTER * interval)
+        _save_registry()
+        out = {u: dict(reg[u]) for u in feeds}
+    start_scheduler()
+    return out
+
+
+def unregister_feeds(feeds: List[str]) -> int:
+    with _lock:
+        reg = _load_registry()
+        n = sum(1 for u in feeds if reg.pop(u, None) is not None)
+        _save_registry()
+        return n
+
+
+def registered_feeds() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        return {u: dict(e) for u, e in _load_registry().items()}
+
+
+def _reschedule(job: Dict[str, Any]) -> None:
+    """After a scheduled job: back off exponentially on failing feeds, jitter everyone."""
+    with _lock:
+        reg = _load_registry()
+        for url, f in job["feeds"].items():
+            entry = reg.get(url)
+            if entry is None:
+                continue  # unregistered meanwhile
+            entry["running"] = False
+            failed = job["status"] == "failed" or f.get("status") in {"error", "pending"}
+            entry["failures"] = entry.get("failures", 0) + 1 if failed else 0
+            delay = entry["interval_s"] * (2 ** entry["failures"])
+            entry["next_at"] = _now() + _jittered(min(delay, max(entry["interval_s"], FEED_MAX_BACKOFF_S)))
+            entry["last_status"] = f.get("status")
+            entry["last_polled_at"] = _now()
+        _save_registry()
+
+
+def _tick() -> None:
+    now = _now()
+    with _lock:
+        due = [u for u, e in _load_registry().items() if not e.get("running") and e.get("next_at", 0) <= now]
+        for u in due:
+            _registry[u]["running"] = True
+        if due:
+            _save_registry()  # persisted, so a reload can't make them due again
+    if due:
+        submit_feeds(due, kind="scheduled", on_done=_reschedule)
+
+
+def _schedule_loop() -> None:
+    while True:
+        try:
+            _tick()
+        except Exception as exc:  # noqa: BLE001
+            print(f"[jobs] scheduler tick failed: {exc}")
+        time.sleep(1.0)
+
+
+def _claim_scheduler() -> bool:
+    """Take FEED_SCHEDULER_LOCK for the life of the process; False if another process has it."""
+    global _scheduler_lock_file
+    if _scheduler_lock_file is not None or fcntl is None:
+        return True
+    os.makedirs(os.path.dirname(FEED_SCHEDULER_LOCK) or ".", exist_ok=True)
+    f = open(FEED_SCHEDULER_LOCK, "a+")
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return False
+    _scheduler_lock_file = f  # released by the OS when this process exits
+    return True
+
+
+def start_scheduler() -> None:
+    """
+    Start the re-poll loop once (no-op when FEED_SCHEDULER is off). Across
+    processes sharing FEED_SCHEDULER_LOCK only one runs it; the others retry
+    on their next start_scheduler() (e.g. a feed registration), so the loop
+    moves to another worker if its holder exits.
+    """
+    global _scheduler
+    if not FEED_SCHEDULER:
+        return
+    with _lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            if not _claim_scheduler():
+                return
+            print(f"[jobs] feed scheduler running in pid {os.getpid()}")
+            # a crash mid-job would leave feeds marked running forever
+            for e in _load_registry().values():
+                e["running"] = False
+            _save_registry()
+            _scheduler = threading.Thread(target=_schedule_loop, name="feed-scheduler", daemon=True)
+            _scheduler.start()
@@ -0,0 +1,129 @@
+# backend/app/services/metrics.py
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds; spans run from sub-ms (TinyRAG) to multi-second (feeds)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')  # noqa: E731
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set (Prometheus semantics)."""
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series: Dict[LabelKey, List[float]] = {}  # counts per bucket (+Inf last), then sum
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels: Any) -> None:
+        key = _key(labels)
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            s[i] += 1
+            s[-1] += seconds
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for key, s in sorted(series.items()):
+            acc = 0.0
+            for bound, n in zip(self.buckets + (float("inf"),), s):
+                acc += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append(f"{self.name}_bucket{_fmt_labels(key, ('le', le))} {acc:g}")
+            out.append(f"{self.name}_sum{_fmt_labels(key)} {s[-1]:.6f}")
+            out.append(f"{self.name}_count{_fmt_labels(key)} {acc:g}")
+        return out
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        out += [f"{self.name}{_fmt_labels(k)} {v:g}" for k, v in sorted(values.items())]
+        return out
+
+
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Request latency until the last body byte, by route.")
+HTTP_TTFB = Histogram("http_request_ttfb_seconds", "Time until response headers were sent, by route.")
+SPANS = Histogram("span_duration_seconds", "Time spent inside named hot-path spans.")
+SPAN_ERRORS = Counter("span_errors_total", "Spans that exited with an exception.")
+SLOW_PROFILES = Counter("slow_request_profiles_total", "Sampling profiles dumped for slow requests.")
+
+_METRICS = [HTTP_LATENCY, HTTP_TTFB, SPANS, SPAN_ERRORS, SLOW_PROFILES]
+
+# Gauge collectors: fn() -> [(name, help, {labels...}, value)]; evaluated on scrape
+_collectors: List[Callable[[], List[Tuple[str, str, Dict[str, Any], float]]]] = []
+
+
+@contextmanager
+def span(name: str, **labels: Any) -> Iterator[None]:
+    """Time a block into span_duration_seconds{span=name, ...}."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        SPAN_ERRORS.inc(span=name, **labels)
+        raise
+    finally:
+        SPANS.observe(time.perf_counter() - t0, span=name, **labels)
+
+
+def register_collector(fn: Callable[[], List[Tuple[str, str, Dict[str, Any], float]]]) -> None:
+    if fn not in _collectors:
+        _collectors.append(fn)
+
+
+def render() -> str:
+    """Everything in Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    for m in _METRICS:
+        lines += m.render()
+    gauges: Dict[str, Tuple[str, List[str]]] = {}
+    for fn in _collectors:
+        try:
+            samples = fn()
+        except Exception as exc:  # noqa: BLE001
+            print(f"[metrics] collector {fn!r} failed: {exc}")
+            continue
+        for name, help, labels, value in samples:
+            gauges.setdefault(name, (help, []))[1].append(f"{name}{_fmt_labels(_key(labels))} {float(value):g}")
+    for name, (help, samples) in gauges.items():
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"] + samples
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,168 @@
+# backend/app/services/outbound.py
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import requests
+
+from app.services.cache import LRUTTLCache
+
+T = TypeVar("T")
+
+# "source=rate_per_sec:burst,..."; sources not listed are unlimited
+OUTBOUND_LIMITS = os.getenv("OUTBOUND_LIMITS", "reddit=0.5:10,youtube=2:10,rss=20:50")
+OUTBOUND_CACHE_TTL = float(os.getenv("OUTBOUND_CACHE_TTL", "300"))
+OUTBOUND_CACHE_MAX_ENTRIES = int(os.getenv("OUTBOUND_CACHE_MAX_ENTRIES", "2048"))
+
+
+class RateLimited(requests.RequestException):
+    """Raised when a source's token bucket can't supply a token in time."""
+
+
+class CoalescedTimeout(requests.Timeout):
+    """A coalesced caller gave up waiting on the identical in-flight call."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting up to `timeout` seconds for a refill."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate if self.rate else timeout)
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def penalize(self, seconds: float) -> None:
+        """Upstream said slow down (e.g. 429 Retry-After): stop handing out tokens."""
+        with self._lock:
+            self.tokens = 0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+def _parse_limits(raw: str) -> Dict[str, TokenBucket]:
+    out: Dict[str, TokenBucket] = {}
+    for part in raw.split(","):
+        name, _, spec = part.partition("=")
+        rate, _, burst = spec.partition(":")
+        if name.strip() and rate.strip():
+            out[name.strip()] = TokenBucket(float(rate), float(burst or rate))
+    return out
+
+
+# Free-text search params, compared case- and whitespace-insensitively in cache keys;
+# every other param (URLs, ETag/Last-Modified validators, ids) is kept verbatim
+TEXT_PARAMS = frozenset({"q"})
+
+
+def _normalize(name: str, v: Any) -> Any:
+    if name in TEXT_PARAMS and isinstance(v, str):
+        return " ".join(v.split()).casefold()
+    return v
+
+
+class Outbound:
+    """
+    Shared front door for upstream API calls: TTL response cache keyed by
+    source + params (free-text query normalized), coalescing of identical in-flight calls, and a
+    per-source token bucket. Metrics count how many upstream calls were avoided.
+    """
+
+    def __init__(self, limits: Dict[str, TokenBucket], ttl: float, max_entries: int):
+        self.buckets = limits
+        self.cache = LRUTTLCache(max_entries=max_entries, ttl=ttl)
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "cache_hits": 0, "coalesced": 0, "upstream": 0, "rate_limited": 0, "errors": 0}
+        )
+
+    def call(self, source: str, params: Dict[str, Any], fn: Callable[[], T],
+             timeout: float = 12, cache: bool = True) -> T:
+        key = (source, tuple(sorted((k, _normalize(k, v)) for k, v in params.items())))
+        m = self._metrics[source]
+        with self._lock:
+            m["calls"] += 1
+        if cache:
+            hit = self.cache.get(key)
+            if hit is not None:
+                with self._lock:
+                    m["cache_hits"] += 1
+                return hit
+
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+            else:
+                m["coalesced"] += 1
+        if not leader:
+            try:
+                return fut.result(timeout=timeout)
+            except FutureTimeout:
+                with self._lock:
+                    m["errors"] += 1
+                # a RequestException, so callers' existing upstream-error handling applies
+                raise CoalescedTimeout(f"{source}: in-flight call did not finish within {timeout}s") from None
+
+        try:
+            bucket = self.buckets.get(source)
+            if bucket is not None and not bucket.acquire(timeout):
+                with self._lock:
+                    m["rate_limited"] += 1
+                raise RateLimited(f"{source}: local rate limit")
+            with self._lock:
+                m["upstream"] += 1
+            try:
+                value = fn()
+            except requests.HTTPError as exc:
+                resp = exc.response
+                if bucket is not None and resp is not None and resp.status_code == 429:
+                    retry = resp.headers.get("Retry-After", "")
+                    bucket.penalize(float(retry) if retry.isdigit() else 60.0)
+                raise
+            if cache:
+                self.cache.put(key, value)
+            fut.set_result(value)
+            return value
+        except BaseException as exc:
+            with self._lock:
+                m["errors"] += 1
+            fut.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            sources = {name: dict(m, avoided=m["cache_hits"] + m["coalesced"]) for name, m in self._metrics.items()}
+        return {
+            "sources": sources,
+            "avoided_total": sum(m["avoided"] for m in sources.values()),
+            "cache": self.cache.stats(),
+        }
+
+
+OUTBOUND = Outbound(_parse_limits(OUTBOUND_LIMITS), OUTBOUND_CACHE_TTL, OUTBOUND_CACHE_MAX_ENTRIES)
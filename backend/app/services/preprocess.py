@@ -0,0 +1,155 @@
+# backend/app/services/preprocess.py
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Texts longer than CHUNK_WORDS are split into overlapping windows (0 disables)
+CHUNK_WORDS = int(os.getenv("CHUNK_WORDS", "200"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "40"))
+# Near-duplicate suppression: SimHash fingerprints within this Hamming distance
+DEDUP = os.getenv("DEDUP", "on").lower() not in {"0", "false", "no", "off"}
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "500000"))
+
+_WORD_RE = re.compile(r"\S+")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)  # any script, not just ASCII
+
+
+def chunk_text(text: str, size: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split on whitespace into windows of `size` words sharing `overlap` words."""
+    words = _WORD_RE.findall(text)
+    if size <= 0 or len(words) <= size:
+        return [text]
+    step = max(1, size - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + size]))
+        if start + size >= len(words):
+            break
+    return chunks
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """
+    64-bit SimHash over word shingles. Texts without any word characters
+    (e.g. only emoji) get an exact hash of the stripped text instead, so
+    they only match themselves.
+    """
+    toks = [t.lower() for t in _TOKEN_RE.findall(text)]
+    if not toks:
+        return int.from_bytes(hashlib.blake2b(text.strip().encode("utf-8"), digest_size=8).digest(), "big")
+    import numpy as np  # lazy: this module is on the startup path
+
+    grams = [" ".join(toks[i:i + shingle]) for i in range(max(1, len(toks) - shingle + 1))]
+    digests = b"".join(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest() for g in grams)
+    # one row of 64 bits per shingle, least significant bit first; a bit is set in the
+    # fingerprint when more shingles have it set than clear
+    hashes = np.frombuffer(digests, dtype=">u8").astype("<u8")
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    fp = np.packbits(2 * bits.sum(axis=0, dtype=np.int64) > len(grams), bitorder="little")
+    return int.from_bytes(fp.tobytes(), "little")
+
+
+class SimHashIndex:
+    """
+    Bounded near-duplicate index. Fingerprints are split into (max_distance + 1)
+    bands; by pigeonhole any match within `max_distance` bits shares one band
+    exactly, so only those bucket members are compared.
+    """
+
+    def __init__(self, max_distance: int = DEDUP_MAX_DISTANCE, max_entries: int = DEDUP_MAX_ENTRIES):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.n_bands = max_distance + 1
+        self.band_bits = 64 // self.n_bands
+        self._owners: "OrderedDict[str, int]" = OrderedDict()  # id -> fingerprint, LRU order
+        self._bands: List[Dict[int, Set[str]]] = [defaultdict(set) for _ in range(self.n_bands)]
+        self._lock = threading.Lock()
+
+    def _keys(self, fp: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fp >> (b * self.band_bits)) & mask for b in range(self.n_bands)]
+
+    def find(self, fp: int) -> Optional[str]:
+        for band, key in zip(self._bands, self._keys(fp)):
+            for owner in band.get(key, ()):
+                if bin(self._owners[owner] ^ fp).count("1") <= self.max_distance:
+                    return owner
+        return None
+
+    def check_and_add(self, rid: str, text: str) -> Optional[str]:
+        """Return the id of an earlier near-duplicate owned by another doc, else index `rid`."""
+        fp = simhash(text)
+        with self._lock:
+            dup = self.find(fp)
+            if dup is not None and dup != rid:
+                self._owners.move_to_end(dup)
+                return dup
+            self._remove(rid)
+            self._owners[rid] = fp
+            for band, key in zip(self._bands, self._keys(fp)):
+                band[key].add(rid)
+            while len(self._owners) > self.max_entries:
+                self._remove(next(iter(self._owners)))
+            return None
+
+    def _remove(self, rid: str) -> None:
+        fp = self._owners.pop(rid, None)
+        if fp is None:
+            return
+        for band, key in zip(self._bands, self._keys(fp)):
+            members = band.get(key)
+            if members is not None:
+                members.discard(rid)
+                if not members:
+                    del band[key]
+
+
+_index = SimHashIndex()
+_stats = {"docs": 0, "duplicates": 0, "chunked_docs": 0, "chunks": 0}
+_stats_lock = threading.Lock()
+
+
+def prepare(ids: List[str], docs: List[str], metas: List[Dict[str, Any]]
+            ) -> Tuple[List[str], List[str], List[Dict[str, Any]], List[str]]:
+    """
+    Drop near-duplicates of already-seen docs, then split long texts into
+    overlapping chunks with ids "<parent>#c<i>" and parent_id/chunk metadata.
+    Returns (ids, docs, metas, chunked_parent_ids).
+    """
+    out_ids: List[str] = []
+    out_docs: List[str] = []
+    out_metas: List[Dict[str, Any]] = []
+    chunked: List[str] = []
+    dupes = 0
+    for rid, text, meta in zip(ids, docs, metas):
+        if DEDUP and _index.check_and_add(rid, text) is not None:
+            dupes += 1
+            continue
+        pieces = chunk_text(text)
+        if len(pieces) == 1:
+            out_ids.append(rid)
+            out_docs.append(text)
+            out_metas.append(meta)
+            continue
+        chunked.append(rid)
+        for i, piece in enumerate(pieces):
+            out_ids.append(f"{rid}#c{i}")
+            out_docs.append(piece)
+            out_metas.append({**meta, "parent_id": rid, "chunk": i, "chunks": len(pieces)})
+    with _stats_lock:
+        _stats["docs"] += len(ids)
+        _stats["duplicates"] += dupes
+        _stats["chunked_docs"] += len(chunked)
+        _stats["chunks"] += sum(1 for m in out_metas if "parent_id" in m)
+    return out_ids, out_docs, out_metas, chunked
+
+
+def stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,104 @@
+# backend/app/services/query_embed.py
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.cache import LRUTTLCache
+
+QUERY_EMBED_CACHE = int(os.getenv("QUERY_EMBED_CACHE", "4096"))
+# Gather concurrent query encodes for this long (0 = encode each call directly)
+QUERY_BATCH_WINDOW_MS = float(os.getenv("QUERY_BATCH_WINDOW_MS", "3"))
+QUERY_BATCH_MAX = int(os.getenv("QUERY_BATCH_MAX", "32"))
+
+
+class QueryEncoder:
+    """
+    Query-text -> embedding with a bounded LRU in front and a micro-batcher
+    behind it: cache misses that arrive within `window_ms` of each other are
+    encoded as one batch (up to `max_batch`) and each caller gets its vector.
+    """
+
+    def __init__(self, fn: Callable[[List[str]], Sequence[Any]], window_ms: float = QUERY_BATCH_WINDOW_MS,
+                 max_batch: int = QUERY_BATCH_MAX, cache_size: int = QUERY_EMBED_CACHE):
+        self.fn = fn
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.cache = LRUTTLCache(max_entries=cache_size, ttl=0, sizer=lambda v: v.nbytes)
+        self.batches = 0
+        self.batched_items = 0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _encode(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        distinct = list(dict.fromkeys(texts))
+        vecs = {t: np.asarray(v, dtype=np.float32) for t, v in zip(distinct, self.fn(distinct))}
+        for t, v in vecs.items():
+            self.cache.put(t, v)
+        with self._lock:
+            self.batches += 1
+            self.batched_items += len(texts)
+        return vecs
+
+    def encode(self, text: str) -> np.ndarray:
+        hit = self.cache.get(text)
+        if hit is not None:
+            return hit
+        if self.window <= 0:
+            return self._encode([text])[text]
+        self._ensure_worker()
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        return fut.result()
+
+    def encode_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Already a batch: serve hits from cache and encode the rest in one call."""
+        found = {t: self.cache.get(t) for t in dict.fromkeys(texts)}
+        missing = [t for t, v in found.items() if v is None]
+        if missing:
+            found.update(self._encode(missing))
+        return [found[t] for t in texts]
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                vecs = self._encode([t for t, _ in batch])
+                for t, fut in batch:
+                    fut.set_result(vecs[t])
+            except Exception as exc:  # noqa: BLE001
+                for _, fut in batch:
+                    fut.set_exception(exc)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.batched_items / self.batches if self.batches else 0.0
+            return {
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch,
+                "batches": self.batches,
+                "avg_batch": round(avg, 2),
+                "cache": self.cache.stats(),
+            }
@@ -1,27 +1,89 @@
-from collections import Counter
-import math, json, os, re
-from typing import List, Dict, Any
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+import hashlib, heapq, math, json, os, re, sys, threading
+from typing import TYPE_CHECKING, List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:  # numpy is imported lazily: only the compact layout needs it
+    import numpy as np
 
 WORD_RE = re.compile(r"[a-zA-Z0-9_]+")
 
 def tokenize(text: str) -> list[str]:
     return [w.lower() for w in WORD_RE.findall(text or "")]
 
+def _truthy(v: str) -> bool:
+    return v.lower() in {"1", "true", "yes", "on"}
+
+# Array-backed index (CompactTinyRAG) for large corpora on small instances
+RAG_COMPACT = _truthy(os.getenv("RAG_COMPACT", "false"))
+# Metadata CompactTinyRAG keeps in columns, so `where` filters on it never decode the doc blob
+META_CATEGORICAL = ("source", "feed")
+META_NUMERIC = ("published_ts", "ingested_ts")
+
+
+@dataclass
+class ReweightPolicy:
+    """
+    Controls how IDF drift from incremental updates is repaired.
+    - term_tolerance: re-weight a term's postings inline once its live idf moves
+      more than this fraction away from the idf its weights were built with
+    - max_inline_postings: terms with longer postings wait for the full pass
+    - drift_ratio: run a full re-weight once this fraction of the corpus has been
+      added/removed since the last full build (0 disables)
+    - background: run the full re-weight in a daemon thread instead of inline
+    """
+    term_tolerance: float = float(os.getenv("RAG_IDF_TERM_TOLERANCE", "0.05"))
+    max_inline_postings: int = int(os.getenv("RAG_IDF_MAX_INLINE_POSTINGS", "1000"))
+    drift_ratio: float = float(os.getenv("RAG_IDF_DRIFT_RATIO", "0.2"))
+    background: bool = _truthy(os.getenv("RAG_IDF_BACKGROUND", "true"))
+
+
+def doc_key(doc: Dict[str, Any]) -> str:
+    """Stable id for a doc; same precedence as vectorstore.add_documents."""
+    rid = doc.get("id") or doc.get("url")
+    if rid:
+        return str(rid)
+    return hashlib.sha1((doc.get("text") or "").strip().encode("utf-8")).hexdigest()
+
+
 class TinyRAG:
-    def __init__(self, docs: List[Dict[str, Any]]):
-        self.docs = docs
-        self.N = len(docs)
-        self.doc_tokens = [tokenize(d.get("text","")) for d in docs]
+    # attributes replaced wholesale when a full re-weight swaps in a fresh index
+    _STATE = ("docs", "N", "doc_tokens", "df", "idf", "doc_vecs", "postings", "doc_norms", "_ids", "_built_n")
+
+    def __init__(self, docs: List[Dict[str, Any]], policy: Optional[ReweightPolicy] = None):
+        self.policy = policy or ReweightPolicy()
+        self._lock = threading.RLock()
+        self._pending: Optional[List[Tuple[str, list]]] = None  # ops to replay onto a running re-weight
+        self._changes = 0
+
+        self.docs: List[Optional[Dict[str, Any]]] = list(docs)
+        self.N = len(self.docs)
+        self.doc_tokens = [tokenize(d.get("text","")) for d in self.docs]
         # build idf
-        df = Counter()
+        self.df = Counter()
         for toks in self.doc_tokens:
             for term in set(toks):
-                df[term] += 1
-        self.idf = {t: math.log((1 + self.N) / (1 + df[t])) + 1 for t in df}
+                self.df[term] += 1
+        self.idf = {t: self._live_idf(t) for t in self.df}
 
         # build vectors
         self.doc_vecs = [self._tfidf(toks) for toks in self.doc_tokens]
 
+        # build inverted index: term -> {doc idx: weight}, plus per-doc norms
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.doc_norms: List[float] = []
+        for i, vec in enumerate(self.doc_vecs):
+            for term, w in vec.items():
+                self.postings[term][i] = w
+            self.doc_norms.append(self._norm(vec))
+
+        self._ids = {doc_key(d): i for i, d in enumerate(self.docs)}
+        self._built_n = self.N
+
+    def _live_idf(self, term: str) -> float:
+        return math.log((1 + self.N) / (1 + self.df[term])) + 1
+
     def _tfidf(self, toks: list[str]) -> Dict[str, float]:
         tf = Counter(toks)
         vec = {}
@@ -29,6 +91,10 @@ class TinyRAG:
             vec[term] = (freq / max(1,len(toks))) * self.idf.get(term, 0.0)
         return vec
 
+    @staticmethod
+    def _norm(vec: Dict[str, float]) -> float:
+        return math.sqrt(sum(v*v for v in vec.values()))
+
     @staticmethod
     def _cos(a: Dict[str,float], b: Dict[str,float]) -> float:
         keys = set(a) | set(b)
@@ -38,17 +104,646 @@ class TinyRAG:
         if na == 0 or nb == 0: return 0.0
         return dot/(na*nb)
 
-    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        qv = self._tfidf(tokenize(query))
-        scored = [(self._cos(qv, dv), i) for i, dv in enumerate(self.doc_vecs)]
-        scored.sort(reverse=True)
-        out = []
-        for score, idx in scored[:k]:
-            d = self.docs[idx].copy()
-            d["score"] = round(score, 4)
-            out.append(d)
+    # ----- incremental updates -----
+
+    def add(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Index new docs. Raises ValueError if an id is already present."""
+        return self._mutate("add", list(docs))
+
+    def upsert(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Index docs, replacing any existing doc with the same id."""
+        return self._mutate("upsert", list(docs))
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Drop docs by id; unknown ids are ignored. Returns number removed."""
+        return self._mutate("remove", [str(i) for i in ids])
+
+    def _mutate(self, op: str, payload: list) -> int:
+        with self._lock:
+            n = self._apply(op, payload)
+            if self._pending is not None:
+                self._pending.append((op, payload))
+            self._changes += n
+            ratio = self.policy.drift_ratio
+            due = ratio > 0 and self._changes >= ratio * max(1, self._built_n)
+        if due:
+            self.reweight(wait=not self.policy.background)
+        return n
+
+    def _apply(self, op: str, payload: list) -> int:
+        touched: set = set()
+        n = 0
+        if op == "remove":
+            for key in payload:
+                idx = self._ids.pop(key, None)
+                if idx is not None:
+                    touched |= self._delete(idx)
+                    n += 1
+        else:
+            keyed = [(doc_key(d), d) for d in payload]
+            if op == "add":
+                seen = set(self._ids)
+                for key, _ in keyed:
+                    if key in seen:
+                        raise ValueError(f"document '{key}' already indexed; use upsert()")
+                    seen.add(key)
+            for key, d in keyed:
+                idx = self._ids.pop(key, None)
+                if idx is not None:
+                    touched |= self._delete(idx)
+                touched |= self._insert(key, d)
+                n += 1
+        self._reweight_terms(touched)
+        return n
+
+    def _insert(self, key: str, doc: Dict[str, Any]) -> set:
+        toks = tokenize(doc.get("text",""))
+        terms = set(toks)
+        idx = len(self.docs)
+        self.N += 1
+        for term in terms:
+            self.df[term] += 1
+            if term not in self.idf:
+                self.idf[term] = self._live_idf(term)
+        vec = self._tfidf(toks)
+        for term, w in vec.items():
+            self.postings[term][idx] = w
+        self.docs.append(doc)
+        self.doc_tokens.append(toks)
+        self.doc_vecs.append(vec)
+        self.doc_norms.append(self._norm(vec))
+        self._ids[key] = idx
+        return terms
+
+    def _delete(self, idx: int) -> set:
+        terms = set(self.doc_tokens[idx])
+        for term in terms:
+            plist = self.postings.get(term)
+            if plist is not None:
+                plist.pop(idx, None)
+                if not plist:
+                    del self.postings[term]
+            self.df[term] -= 1
+            if self.df[term] <= 0:
+                del self.df[term]
+                self.idf.pop(term, None)
+        self.N -= 1
+        # tombstone the slot; indices stay stable until the next full re-weight
+        self.docs[idx] = None
+        self.doc_tokens[idx] = []
+        self.doc_vecs[idx] = {}
+        self.doc_norms[idx] = 0.0
+        return terms
+
+    def _reweight_terms(self, terms: Iterable[str]) -> None:
+        """Bring drifted terms back to their live idf, patching weights and norms."""
+        tol = self.policy.term_tolerance
+        limit = self.policy.max_inline_postings
+        for term in terms:
+            if term not in self.df:
+                continue
+            old = self.idf[term]
+            new = self._live_idf(term)
+            plist = self.postings.get(term, {})
+            if abs(new - old) <= tol * old or len(plist) > limit:
+                continue
+            ratio = new / old
+            for idx, w in plist.items():
+                nw = w * ratio
+                plist[idx] = nw
+                self.doc_vecs[idx][term] = nw
+                self.doc_norms[idx] = math.sqrt(max(0.0, self.doc_norms[idx] ** 2 - w * w + nw * nw))
+            self.idf[term] = new
+
+    def reweight(self, wait: bool = True) -> None:
+        """
+        Rebuild every weight from live document frequencies. Updates that land
+        while the rebuild runs are replayed onto it before it is swapped in.
+        """
+        with self._lock:
+            if self._pending is not None:
+                return  # one already running
+            live = self._live_docs()
+            self._pending = []
+        if wait:
+            self._finish_reweight(live)
+        else:
+            threading.Thread(target=self._finish_reweight, args=(live,), name="tinyrag-reweight", daemon=True).start()
+
+    def _live_docs(self) -> Iterable[Dict[str, Any]]:
+        return [d for d in self.docs if d is not None]
+
+    def _finish_reweight(self, live: Iterable[Dict[str, Any]]) -> None:
+        try:
+            fresh = type(self)(live, policy=self.policy)
+        except Exception as exc:  # noqa: BLE001
+            print(f"[rag] re-weight failed: {exc}")
+            with self._lock:
+                self._pending = None
+            return
+        with self._lock:
+            for op, payload in self._pending or []:
+                fresh._apply(op, payload)
+            replayed = len(self._pending or [])
+            for name in self._STATE:
+                setattr(self, name, getattr(fresh, name))
+            self._changes = replayed
+            self._pending = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "layout": "standard",
+                "docs": self.N,
+                "slots": len(self.docs),
+                "terms": len(self.df),
+                "changes_since_reweight": self._changes,
+                "reweighting": self._pending is not None,
+            }
+
+    def memory(self) -> Dict[str, int]:
+        """Approximate bytes held per component (walks every object; slow on big indexes)."""
+        with self._lock:
+            seen: set = set()
+            out = {name: _deep_size(getattr(self, name), seen)
+                   for name in ("docs", "doc_tokens", "doc_vecs", "postings", "doc_norms", "df", "idf", "_ids")}
+        out["total"] = sum(out.values())
         return out
 
+    # ----- query -----
+
+    def search(self, query: str, k: int = 5,
+               keep: Optional[Callable[[Dict[str, Any]], bool]] = None, pad: bool = True,
+               where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k docs by cosine; `keep` and the Chroma-style `where` clause filter candidates
+        before ranking, so k stays full. With pad=False only docs sharing a term with the
+        query are returned (no zero-score fill), so a filter is never run over the rest of
+        the corpus.
+        """
+        keep = _with_where(keep, where)
+        with self._lock:
+            qv = self._tfidf(tokenize(query))
+            qn = self._norm(qv)
+
+            # accumulate dot products only for docs sharing a term with the query
+            dots: Dict[int, float] = {}
+            if qn:
+                for term, qw in qv.items():
+                    for idx, w in self.postings.get(term, {}).items():
+                        dots[idx] = dots.get(idx, 0.0) + qw * w
+            if keep is not None:
+                dots = {idx: dot for idx, dot in dots.items() if keep(self.docs[idx])}
+
+            scored = heapq.nlargest(
+                k, ((dot / (qn * self.doc_norms[idx]), idx) for idx, dot in dots.items())
+            )
+            # docs without overlap score 0; keep the old tie order (highest idx first)
+            idx = len(self.docs) - 1
+            while pad and len(scored) < k and idx >= 0:
+                if idx not in dots and self.docs[idx] is not None and (keep is None or keep(self.docs[idx])):
+                    scored.append((0.0, idx))
+                idx -= 1
+
+            out = []
+            for score, idx in scored:
+                d = self.docs[idx].copy()
+                d["score"] = round(score, 4)
+                out.append(d)
+            return out
+
+def _with_where(keep: Optional[Callable[[Dict[str, Any]], bool]],
+                where: Optional[Dict[str, Any]]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """`keep` and'ed with a `where` clause evaluated on each doc."""
+    if not where:
+        return keep
+    from app.services.vectorstore import matches  # lazy: vectorstore imports this module
+
+    if keep is None:
+        return lambda d: matches(d, where)
+    return lambda d: matches(d, where) and keep(d)
+
+
+def _deep_size(obj: Any, seen: set) -> int:
+    """sys.getsizeof over obj and everything it references, counting shared objects once."""
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        np = sys.modules.get("numpy")  # no ndarray can exist unless numpy is loaded
+        total += o.nbytes if np is not None and isinstance(o, np.ndarray) else sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif isinstance(o, _Grow):
+            stack.append(o.buf)
+    return total
+
+
+class _Grow:
+    """Append-only typed array (numpy buffer with amortised doubling)."""
+
+    def __init__(self, dtype, values: Any = ()):
+        import numpy as np
+        values = np.asarray(values, dtype=dtype)
+        self.n = len(values)
+        self.buf = np.empty(max(16, self.n), dtype=dtype)
+        self.buf[:self.n] = values
+
+    def append(self, value: Any) -> None:
+        if self.n == len(self.buf):
+            import numpy as np
+            self.buf = np.concatenate([self.buf, np.empty_like(self.buf)])
+        self.buf[self.n] = value
+        self.n += 1
+
+    @property
+    def a(self) -> "np.ndarray":
+        return self.buf[:self.n]
+
+
+def _encode(doc: Dict[str, Any]) -> bytes:
+    return json.dumps(doc, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+class CompactTinyRAG(TinyRAG):
+    """
+    Same scoring and update semantics as TinyRAG, stored in flat arrays:
+
+    - terms are interned to int ids (`vocab`); df / idf are arrays by term id
+    - postings are CSR by term (`indptr`, `post_docs` int32, `post_w` float32)
+    - docs are JSON in one `blob`, sliced by `offsets` and decoded only for
+      the returned hits (and for `keep` filters); no per-doc token lists or
+      vectors are kept
+    - META_CATEGORICAL fields are interned to int32 codes per field (`codes`,
+      -1 = missing) and META_NUMERIC fields are float64 (NaN = missing) in
+      `cols`, so `where` clauses on them are evaluated without decoding docs;
+      clauses on any other field fall back to decoding
+
+    Docs inserted after the build go to a small dict-of-dicts `delta`; removals
+    tombstone the slot (`alive`) and re-tokenize the stored text to find its
+    terms. Both are folded back into the arrays by the next full re-weight,
+    which ReweightPolicy.drift_ratio schedules as usual.
+    """
+
+    _STATE = ("N", "vocab", "df", "idf", "indptr", "post_docs", "post_w", "delta",
+              "norms", "alive", "offsets", "blob", "cols", "codes", "_impure", "_ids", "_built_n")
+
+    def __init__(self, docs: Iterable[Dict[str, Any]], policy: Optional[ReweightPolicy] = None):
+        import numpy as np
+        self.policy = policy or ReweightPolicy()
+        self._lock = threading.RLock()
+        self._pending: Optional[List[Tuple[str, list]]] = None
+        self._changes = 0
+
+        # one streaming pass: doc-major (row, term id, tf) triples + the doc blob
+        self.vocab: Dict[str, int] = {}
+        self._ids: Dict[str, int] = {}
+        self.blob = bytearray()
+        offsets = array("q", [0])
+        rows, tids, tfs = array("i"), array("i"), array("f")
+        self.codes: Dict[str, Dict[Any, int]] = {f: {} for f in META_CATEGORICAL}
+        self._impure: set = set()  # fields holding values the columns can't represent
+        meta = {f: array("i") for f in META_CATEGORICAL}
+        meta.update({f: array("d") for f in META_NUMERIC})
+        n = 0
+        for d in docs:
+            toks = tokenize(d.get("text", ""))
+            for term, freq in Counter(toks).items():
+                tid = self.vocab.setdefault(term, len(self.vocab))
+                rows.append(n)
+                tids.append(tid)
+                tfs.append(freq / len(toks))
+            self.blob += _encode(d)
+            offsets.append(len(self.blob))
+            for f, v in self._meta_row(d).items():
+                meta[f].append(v)
+            self._ids[doc_key(d)] = n
+            n += 1
+
+        rows_a = np.frombuffer(rows, dtype=np.int32)
+        tids_a = np.frombuffer(tids, dtype=np.int32)
+        df = np.bincount(tids_a, minlength=len(self.vocab)).astype(np.int32)
+        self.N = n
+        idf = np.log((1 + n) / (1 + df)) + 1
+        w = np.frombuffer(tfs, dtype=np.float32) * idf[tids_a]
+        # transpose to term-major; the stable sort keeps each posting list in doc order
+        order = np.argsort(tids_a, kind="stable")
+        self.post_docs = rows_a[order]
+        self.post_w = w[order].astype(np.float32)
+        self.indptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=self.indptr[1:])
+        self.df = _Grow(np.int32, df)
+        self.idf = _Grow(np.float64, idf)
+        self.norms = _Grow(np.float32, np.sqrt(np.bincount(rows_a, weights=w.astype(np.float64) ** 2, minlength=n)))
+        self.alive = _Grow(np.bool_, np.ones(n, dtype=np.bool_))
+        self.offsets = _Grow(np.int64, offsets)
+        self.cols = {f: _Grow(np.int32 if f in self.codes else np.float64, meta[f]) for f in meta}
+        self.delta: Dict[int, Dict[int, float]] = {}
+        self._built_n = self.N
+
+    def _doc(self, idx: int) -> Dict[str, Any]:
+        off = self.offsets.buf
+        return json.loads(self.blob[off[idx]:off[idx + 1]])
+
+    def _meta_row(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        row: Dict[str, Any] = {}
+        for f, codes in self.codes.items():
+            v = doc.get(f)
+            try:
+                row[f] = -1 if v is None else codes.setdefault(v, len(codes))
+            except TypeError:  # unhashable
+                self._impure.add(f)
+                row[f] = -1
+        for f in META_NUMERIC:
+            v = doc.get(f)
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                row[f] = float(v)
+            else:
+                if v is not None:
+                    self._impure.add(f)
+                row[f] = math.nan
+        return row
+
+    def _where_mask(self, where: Dict[str, Any], slots: Any) -> Any:
+        """
+        Bool array: which of `slots` satisfy `where` (vectorstore.matches semantics),
+        from the metadata columns. None when the clause needs a field they don't hold.
+        """
+        import numpy as np
+        mask = np.ones(len(slots), dtype=np.bool_)
+        for field, cond in where.items():
+            if field in ("$and", "$or"):
+                parts = [self._where_mask(c, slots) for c in cond]
+                if any(p is None for p in parts):
+                    return None
+                if field == "$and":
+                    for p in parts:
+                        mask &= p
+                else:
+                    mask &= np.logical_or.reduce(parts) if parts else False
+                continue
+            if field not in self.cols or field in self._impure:
+                return None
+            col = self.cols[field].buf[slots]
+            codes = self.codes.get(field)
+            for op, arg in (cond.items() if isinstance(cond, dict) else [("$eq", cond)]):
+                part = self._op_mask(col, codes, op, arg)
+                if part is None:
+                    return None
+                mask &= part
+        return mask
+
+    @staticmethod
+    def _op_mask(col: Any, codes: Optional[Dict[Any, int]], op: str, arg: Any) -> Any:
+        import numpy as np
+        if op in ("$in", "$nin"):
+            if not isinstance(arg, (list, tuple, set, frozenset)):
+                return None
+            values = list(arg)
+        else:
+            values = [arg]
+        if codes is not None:  # categorical: compare codes, -1 = missing, -2 = never stored
+            if op not in ("$eq", "$ne", "$in", "$nin"):
+                return None
+            try:
+                keys = [-1 if v is None else codes.get(v, -2) for v in values]
+            except TypeError:
+                return None
+        else:
+            if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                return None
+            keys = values
+        if op == "$eq":
+            return col == keys[0]
+        if op == "$ne":
+            return col != keys[0]
+        if op == "$in":
+            return np.isin(col, keys)
+        if op == "$nin":
+            return ~np.isin(col, keys)
+        if op == "$gt":
+            return col > keys[0]  # NaN (missing) compares False, like matches()
+        if op == "$gte":
+            return col >= keys[0]
+        if op == "$lt":
+            return col < keys[0]
+        if op == "$lte":
+            return col <= keys[0]
+        return None
+
+    def _term_id(self, term: str) -> int:
+        tid = self.vocab.get(term)
+        if tid is None:
+            tid = self.vocab[term] = len(self.vocab)
+            self.df.append(0)
+            self.idf.append(0.0)
+        return tid
+
+    def _insert(self, key: str, doc: Dict[str, Any]) -> set:
+        toks = tokenize(doc.get("text", ""))
+        tf = Counter(toks)
+        idx = self.offsets.n - 1
+        self.N += 1
+        tids = {term: self._term_id(term) for term in tf}
+        df, idf = self.df.buf, self.idf.buf  # _term_id may have grown them
+        for tid in tids.values():
+            df[tid] += 1
+            if idf[tid] == 0.0:  # 0 marks "not in the corpus" (a live idf is >= 1)
+                idf[tid] = math.log((1 + self.N) / (1 + df[tid])) + 1
+        sq = 0.0
+        for term, freq in tf.items():
+            tid = tids[term]
+            w = (freq / len(toks)) * idf[tid]
+            self.delta.setdefault(tid, {})[idx] = w
+            sq += w * w
+        self.norms.append(math.sqrt(sq))
+        self.alive.append(True)
+        self.blob += _encode(doc)
+        self.offsets.append(len(self.blob))
+        for f, v in self._meta_row(doc).items():
+            self.cols[f].append(v)
+        self._ids[key] = idx
+        return set(tf)
+
+    def _delete(self, idx: int) -> set:
+        terms = set(tokenize(self._doc(idx).get("text", "")))
+        df, idf = self.df.buf, self.idf.buf
+        for term in terms:
+            tid = self.vocab[term]
+            plist = self.delta.get(tid)
+            if plist is not None:
+                plist.pop(idx, None)
+                if not plist:
+                    del self.delta[tid]
+            df[tid] -= 1
+            if df[tid] <= 0:
+                df[tid] = 0
+                idf[tid] = 0.0
+        self.N -= 1
+        # tombstone; the blob bytes and base postings are reclaimed by the next full re-weight
+        self.alive.buf[idx] = False
+        self.norms.buf[idx] = 0.0
+        return terms
+
+    def _reweight_terms(self, terms: Iterable[str]) -> None:
+        import numpy as np
+        tol = self.policy.term_tolerance
+        limit = self.policy.max_inline_postings
+        df, idf, norms, alive = self.df.buf, self.idf.buf, self.norms.buf, self.alive.buf
+        nbase = len(self.indptr) - 1
+        for term in terms:
+            tid = self.vocab[term]
+            if df[tid] <= 0:
+                continue
+            old = idf[tid]
+            new = math.log((1 + self.N) / (1 + df[tid])) + 1
+            s, e = (int(self.indptr[tid]), int(self.indptr[tid + 1])) if tid < nbase else (0, 0)
+            plist = self.delta.get(tid, {})
+            if abs(new - old) <= tol * old or (e - s) + len(plist) > limit:
+                continue
+            ratio = new / old
+            if e > s:
+                docs = self.post_docs[s:e]
+                w = self.post_w[s:e].astype(np.float64)
+                nw = w * ratio
+                live = alive[docs]
+                d = docs[live]
+                norms[d] = np.sqrt(np.maximum(0.0, norms[d].astype(np.float64) ** 2 - w[live] ** 2 + nw[live] ** 2))
+                self.post_w[s:e] = nw
+            for idx, w in plist.items():
+                nw = w * ratio
+                plist[idx] = nw
+                norms[idx] = math.sqrt(max(0.0, float(norms[idx]) ** 2 - w * w + nw * nw))
+            idf[tid] = new
+
+    def _live_docs(self) -> Iterator[Dict[str, Any]]:
+        import numpy as np
+        # snapshot now, decode lazily: the blob is append-only, so old slices stay valid
+        blob, off = self.blob, self.offsets.a.copy()
+        slots = np.flatnonzero(self.alive.a)
+
+        def gen() -> Iterator[Dict[str, Any]]:
+            for idx in slots:
+                yield json.loads(blob[off[idx]:off[idx + 1]])
+
+        return gen()
+
+    def stats(self) -> Dict[str, Any]:
+        import numpy as np
+        with self._lock:
+            return {
+                "layout": "compact",
+                "docs": self.N,
+                "slots": self.alive.n,
+                "terms": int(np.count_nonzero(self.df.a)),
+                "delta_terms": len(self.delta),
+                "changes_since_reweight": self._changes,
+                "reweighting": self._pending is not None,
+            }
+
+    def memory(self) -> Dict[str, int]:
+        with self._lock:
+            seen: set = set()
+            out = {
+                "blob": sys.getsizeof(self.blob),
+                "offsets": self.offsets.buf.nbytes,
+                "postings": self.indptr.nbytes + self.post_docs.nbytes + self.post_w.nbytes,
+                "delta": _deep_size(self.delta, seen),
+                "doc_arrays": self.norms.buf.nbytes + self.alive.buf.nbytes,
+                "term_arrays": self.df.buf.nbytes + self.idf.buf.nbytes,
+                "meta_columns": sum(c.buf.nbytes for c in self.cols.values()) + _deep_size(self.codes, seen),
+                "vocab": _deep_size(self.vocab, seen),
+                "_ids": _deep_size(self._ids, seen),
+            }
+        out["total"] = sum(out.values())
+        return out
+
+    # ----- query -----
+
+    def search(self, query: str, k: int = 5,
+               keep: Optional[Callable[[Dict[str, Any]], bool]] = None, pad: bool = True,
+               where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        import numpy as np
+        with self._lock:
+            toks = tokenize(query)
+            idf = self.idf.buf
+            qv: Dict[int, float] = {}
+            for term, freq in Counter(toks).items():
+                tid = self.vocab.get(term)
+                if tid is not None and idf[tid] > 0:
+                    qv[tid] = (freq / len(toks)) * idf[tid]
+            qn = math.sqrt(sum(w * w for w in qv.values()))
+
+            nbase = len(self.indptr) - 1
+            ids, vals = [], []
+            for tid, qw in qv.items():
+                if tid < nbase:
+                    s, e = self.indptr[tid], self.indptr[tid + 1]
+                    ids.append(self.post_docs[s:e])
+                    vals.append(self.post_w[s:e] * qw)
+                plist = self.delta.get(tid)
+                if plist:
+                    ids.append(np.fromiter(plist.keys(), dtype=np.int32, count=len(plist)))
+                    vals.append(np.fromiter(plist.values(), dtype=np.float32, count=len(plist)) * qw)
+            if ids:
+                hits, inv = np.unique(np.concatenate(ids), return_inverse=True)
+                dots = np.bincount(inv, weights=np.concatenate(vals).astype(np.float64))
+                live = self.alive.buf[hits]
+                hits, dots = hits[live], dots[live]
+                scores = dots / (qn * self.norms.buf[hits].astype(np.float64))
+            else:
+                hits = scores = np.empty(0, dtype=np.int64)
+            matched = hits
+            if where:
+                cut = self._where_mask(where, hits)
+                if cut is None:  # not expressible on the columns: decode and match per doc
+                    keep, where = _with_where(keep, where), None
+                else:
+                    hits, scores = hits[cut], scores[cut]
+            order = np.lexsort((-hits, -scores))  # score desc, then highest idx, like heapq.nlargest
+
+            scored: List[Tuple[float, int, Optional[Dict[str, Any]]]] = []
+            for j in order:
+                if len(scored) >= k:
+                    break
+                idx = int(hits[j])
+                d = None
+                if keep is not None:
+                    d = self._doc(idx)
+                    if not keep(d):
+                        continue
+                scored.append((float(scores[j]), idx, d))
+            # docs without overlap score 0; same tie order as TinyRAG (highest idx first)
+            if pad and len(scored) < k:
+                free = self.alive.a.copy()
+                free[matched] = False
+                slots = np.flatnonzero(free)[::-1]
+                if where:
+                    slots = slots[self._where_mask(where, slots)]
+                for idx in slots.tolist():
+                    if len(scored) >= k:
+                        break
+                    d = None
+                    if keep is not None:
+                        d = self._doc(idx)
+                        if not keep(d):
+                            continue
+                    scored.append((0.0, idx, d))
+
+            out = []
+            for score, idx, d in scored:
+                d = d if d is not None else self._doc(idx)
+                d["score"] = round(score, 4)
+                out.append(d)
+            return out
+
+
 # load sample docs
 def load_default_corpus():
     here = os.path.dirname(__file__)
@@ -56,4 +751,20 @@ def load_default_corpus():
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-RAG = TinyRAG(load_default_corpus())
+_rag = None
+_rag_lock = threading.Lock()
+
+def get_rag() -> TinyRAG:
+    """Process-wide TinyRAG over the sample corpus, built on first use (array-backed with RAG_COMPACT)."""
+    global _rag
+    if _rag is None:
+        with _rag_lock:
+            if _rag is None:
+                _rag = (CompactTinyRAG if RAG_COMPACT else TinyRAG)(load_default_corpus())
+    return _rag
+
+def __getattr__(name: str):
+    # `from app.services.rag import RAG` keeps working, but builds lazily
+    if name == "RAG":
+        return get_rag()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
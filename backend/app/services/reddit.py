@@ -2,22 +2,26 @@ from typing import Any, Dict, List
 import os
 import requests
 
+from app.services.http import get_session
+from app.services.outbound import OUTBOUND
+
 _UA = os.getenv("REDDIT_USER_AGENT", "SocialMediaRAG/0.1 by yourusername")
-_BASE = "https://www.reddit.com/search.json"
+_BASE = os.getenv("REDDIT_SEARCH_URL", "https://www.reddit.com/search.json")
 
-def search_reddit(q: str, limit: int = 5) -> List[Dict[str, Any]]:
-    try:
-        r = requests.get(
-            _BASE,
-            params={"q": q, "sort": "relevance", "t": "year", "limit": max(1, min(limit, 25))},
-            headers={"User-Agent": _UA},
-            timeout=12,
-        )
-        if r.status_code != 200:
-            return []
-        data = r.json()
-    except requests.RequestException:
-        return []
+def fetch_reddit(q: str, limit: int = 5, timeout: float = 12) -> List[Dict[str, Any]]:
+    """Like search_reddit, but raises on transport/HTTP errors instead of returning []."""
+    params = {"q": q, "sort": "relevance", "t": "year", "limit": max(1, min(limit, 25))}
+    return OUTBOUND.call("reddit", params, lambda: _get(params, timeout), timeout=timeout)
+
+def _get(params: Dict[str, Any], timeout: float) -> List[Dict[str, Any]]:
+    r = get_session().get(
+        _BASE,
+        params=params,
+        headers={"User-Agent": _UA},
+        timeout=timeout,
+    )
+    r.raise_for_status()
+    data = r.json()
 
     items: List[Dict[str, Any]] = []
     for child in ((data or {}).get("data") or {}).get("children", []):
@@ -36,3 +40,9 @@ def search_reddit(q: str, limit: int = 5) -> List[Dict[str, Any]]:
             }
         )
     return items
+
+def search_reddit(q: str, limit: int = 5) -> List[Dict[str, Any]]:
+    try:
+        return fetch_reddit(q, limit)
+    except (requests.RequestException, ValueError):
+        return []
@@ -0,0 +1,498 @@
+# backend/app/services/shared_index.py
+"""
+Read-only index artifacts in memory-mapped files, shared zero-copy by every
+uvicorn worker (SHARED_INDEX=on, e.g. `uvicorn app.main:app --workers 4`).
+
+Instead of each process building its own TinyRAG and querying its own Chroma
+client, one process exports the collection into an immutable version
+directory; every worker maps the same files, so the pages live once in the
+OS page cache however many workers there are.
+
+    SHARED_INDEX_DIR/
+      CURRENT          name of the live version (replaced atomically)
+      .lock            flock held while a version is built
+      v<ms>/           manifest.json
+                       dense.npy                  L2-normalised embeddings, one row per doc
+                       docs.bin, doc_off.npy      JSON docs, sliced by offset
+                       terms.bin, term_off.npy    sorted vocabulary (term id = rank)
+                       indptr.npy, post_docs.npy, post_w.npy   CSR postings by term
+                       df.npy, idf.npy, norms.npy, alive.npy
+                       meta.json, meta_<field>.npy   filterable metadata columns (rag.META_*)
+
+Writes still go to Chroma. After ingest goes quiet for SHARED_INDEX_DEBOUNCE_S,
+the writing process publishes a new version and flips CURRENT; every worker
+notices within SHARED_INDEX_POLL_S and swaps its mappings between requests
+(old versions are immutable, so a request never sees a half-built index).
+Query embedding still runs per process: pair this with EMBED_BACKEND=onnx to
+keep that model small.
+
+Chroma's embedded client is not multi-process: a worker only sees another
+worker's writes once Chroma has flushed them. The feeds scheduler already
+runs in one worker only (jobs.FEED_SCHEDULER_LOCK); keep manual ingest on one
+process too (one ingest endpoint host, or the bulk CLI followed by `build`),
+so the process that publishes is the one that wrote.
+
+CLI (from backend/):
+    python -m app.services.shared_index build
+    python -m app.services.shared_index info
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.rag import CompactTinyRAG, ReweightPolicy
+from app.services.vectorstore import CHROMA_PATH, SHARED_INDEX, matches
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev only, no cross-process lock
+    fcntl = None
+
+SHARED_INDEX_DIR = os.getenv("SHARED_INDEX_DIR", os.path.join(CHROMA_PATH, "shared-index"))
+SHARED_INDEX_POLL_S = float(os.getenv("SHARED_INDEX_POLL_S", "2"))
+# Publish once ingest has been quiet this long, but at least every SHARED_INDEX_MAX_DELAY_S
+SHARED_INDEX_DEBOUNCE_S = float(os.getenv("SHARED_INDEX_DEBOUNCE_S", "10"))
+SHARED_INDEX_MAX_DELAY_S = float(os.getenv("SHARED_INDEX_MAX_DELAY_S", "120"))
+SHARED_INDEX_KEEP = int(os.getenv("SHARED_INDEX_KEEP", "3"))  # versions kept on disk
+# float16 halves the dense matrix but scores ~10x slower (upcast per block; numpy has no fp16 BLAS)
+SHARED_INDEX_DTYPE = os.getenv("SHARED_INDEX_DTYPE", "float32")
+
+_PAGE = 1000
+
+
+# ----- read side -----
+
+def _map_bytes(path: str) -> Any:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""  # mmap can't map an empty file
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _Frozen:
+    """Read-only stand-in for rag._Grow over a mapped array."""
+
+    def __init__(self, arr: np.ndarray):
+        self.buf = arr
+        self.n = len(arr)
+
+    @property
+    def a(self) -> np.ndarray:
+        return self.buf
+
+
+class _MappedVocab:
+    """term -> id by binary search over the sorted, mapped term blob."""
+
+    def __init__(self, blob: Any, off: np.ndarray):
+        self.blob = blob
+        self.off = off
+
+    def __len__(self) -> int:
+        return len(self.off) - 1
+
+    def _term(self, i: int) -> bytes:
+        return self.blob[int(self.off[i]):int(self.off[i + 1])]
+
+    def get(self, term: str, default: Optional[int] = None) -> Optional[int]:
+        key = term.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self._term(lo) == key else default
+
+
+class MappedTinyRAG(CompactTinyRAG):
+    """CompactTinyRAG search over mapped files; read-only, no lock needed."""
+
+    def __init__(self, path: str):
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode="r")  # noqa: E731
+        self.path = path
+        self.policy = ReweightPolicy()
+        self._lock = contextlib.nullcontext()
+        self._pending = None
+        self._changes = 0
+        self.vocab = _MappedVocab(_map_bytes(os.path.join(path, "terms.bin")), load("term_off.npy"))
+        self.indptr, self.post_docs, self.post_w = load("indptr.npy"), load("post_docs.npy"), load("post_w.npy")
+        self.df, self.idf = _Frozen(load("df.npy")), _Frozen(load("idf.npy"))
+        self.norms, self.alive = _Frozen(load("norms.npy")), _Frozen(load("alive.npy"))
+        self.offsets = _Frozen(load("doc_off.npy"))
+        self.blob = _map_bytes(os.path.join(path, "docs.bin"))
+        self.cols: Dict[str, _Frozen] = {}
+        self.codes: Dict[str, Dict[Any, int]] = {}
+        self._impure: set = set()
+        if os.path.exists(os.path.join(path, "meta.json")):  # older versions: filters decode docs
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.codes = {field: {v: i for i, v in enumerate(values)} for field, values in meta["codes"].items()}
+            self._impure = set(meta["impure"])
+            self.cols = {field: _Frozen(load(f"meta_{field}.npy")) for field in (*meta["codes"], *meta["numeric"])}
+        self.delta: Dict[int, Dict[int, float]] = {}
+        self._ids: Dict[str, int] = {}
+        self.N = self._built_n = self.alive.n
+
+    def _mutate(self, op: str, payload: list) -> int:
+        raise RuntimeError("the shared index is read-only; write through vectorstore.add_documents")
+
+    def reweight(self, wait: bool = True) -> None:
+        return None
+
+    def memory(self) -> Dict[str, int]:
+        mapped = sum(os.path.getsize(os.path.join(self.path, f)) for f in os.listdir(self.path))
+        return {"mapped": mapped, "total": mapped}
+
+
+class MappedDense:
+    """Brute-force cosine over the mapped embedding matrix, scored in row blocks."""
+
+    BLOCK = 65536  # rows per matmul; bounds the float32 temporary for float16 matrices
+
+    def __init__(self, path: str, docs: MappedTinyRAG):
+        self.mat = np.load(os.path.join(path, "dense.npy"), mmap_mode="r")
+        self.docs = docs
+
+    def _scores(self, q: np.ndarray) -> np.ndarray:
+        out = np.empty((len(q), len(self.mat)), dtype=np.float32)
+        for s in range(0, len(self.mat), self.BLOCK):
+            out[:, s:s + self.BLOCK] = q @ np.asarray(self.mat[s:s + self.BLOCK], dtype=np.float32).T
+        return out
+
+    @staticmethod
+    def _top(row: np.ndarray, k: int) -> np.ndarray:
+        """Positions of the k best scores in `row`, best first."""
+        n = len(row)
+        top = np.argpartition(-row, k - 1)[:k] if k < n else np.arange(n)
+        return top[np.argsort(-row[top], kind="stable")]
+
+    def _result(self, idx: int, score: float, doc: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        doc = doc if doc is not None else self.docs._doc(idx)
+        meta = {key: v for key, v in doc.items() if key not in {"id", "text"}}
+        return {"id": doc.get("id"), "text": doc.get("text"), "score": score, "meta": meta}
+
+    def search(self, embeddings: List[Any], k: int, where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Top-k per query vector, shaped like vectorstore.search(); `where` is applied before the cut."""
+        n = len(self.mat)
+        if n == 0 or len(embeddings) == 0:
+            return [[] for _ in embeddings]
+        q = np.asarray(embeddings, dtype=np.float32)
+        q /= np.clip(np.linalg.norm(q, axis=1, keepdims=True), 1e-12, None)
+        # filters on metadata columns select candidate rows up front; only the top k are decoded
+        cand = None
+        if where is not None:
+            mask = self.docs._where_mask(where, np.arange(n))
+            if mask is not None:
+                cand, where = np.flatnonzero(mask), None
+        out = []
+        for row in self._scores(q):
+            if cand is not None:
+                sub = row[cand]
+                out.append([self._result(int(cand[i]), float(sub[i])) for i in self._top(sub, k)])
+                continue
+            if where is None:
+                out.append([self._result(int(i), float(row[i])) for i in self._top(row, k)])
+                continue
+            # filtered: walk candidates best-first, widening the cut until k match
+            hits: List[Dict[str, Any]] = []
+            cut, seen = max(k * 4, 64), 0
+            while len(hits) < k and seen < n:
+                cut = min(cut, n)
+                part = np.argpartition(-row, cut - 1)[:cut] if cut < n else np.arange(n)
+                part = part[np.argsort(-row[part], kind="stable")][seen:]
+                for i in part:
+                    doc = self.docs._doc(int(i))
+                    if matches(doc, where):
+                        hits.append(self._result(int(i), float(row[i]), doc))
+                        if len(hits) == k:
+                            break
+                seen, cut = cut, cut * 4
+            out.append(hits)
+        return out
+
+
+class _Loaded:
+    def __init__(self, version: str, path: str):
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.version = version
+        self.lexical = MappedTinyRAG(path)
+        self.dense = MappedDense(path, self.lexical)
+        self.loaded_at = time.time()
+
+
+_current: Optional[_Loaded] = None
+_checked = 0.0
+_load_lock = threading.Lock()
+
+
+def _pointer() -> Optional[str]:
+    try:
+        with open(os.path.join(SHARED_INDEX_DIR, "CURRENT"), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def current() -> Optional[_Loaded]:
+    """The mapped version named by CURRENT, re-checked at most every SHARED_INDEX_POLL_S."""
+    global _current, _checked
+    now = time.monotonic()
+    if now - _checked < SHARED_INDEX_POLL_S:
+        return _current
+    with _load_lock:
+        if now - _checked < SHARED_INDEX_POLL_S:
+            return _current
+        _checked = now
+        name = _pointer()
+        if name and (_current is None or _current.version != name):
+            try:
+                _current = _Loaded(name, os.path.join(SHARED_INDEX_DIR, name))
+            except (OSError, ValueError) as exc:
+                print(f"[shared_index] could not map {name}: {exc}")
+            else:
+                from app.services.vectorstore import invalidate
+
+                invalidate()  # cached results came from the previous version
+                print(f"[shared_index] pid {os.getpid()} serving {name} ({_current.manifest['rows']} rows)")
+    return _current
+
+
+def lexical() -> Optional[MappedTinyRAG]:
+    loaded = current() if SHARED_INDEX else None
+    return loaded.lexical if loaded is not None else None
+
+
+def dense() -> Optional[MappedDense]:
+    loaded = current() if SHARED_INDEX else None
+    return loaded.dense if loaded is not None else None
+
+
+# ----- write side -----
+
+@contextlib.contextmanager
+def _flock(blocking: bool) -> Iterator[bool]:
+    os.makedirs(SHARED_INDEX_DIR, exist_ok=True)
+    with open(os.path.join(SHARED_INDEX_DIR, ".lock"), "a+") as f:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False  # another process is building
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _save_lexical(rag: CompactTinyRAG, out: str) -> None:
+    """Write `rag`'s arrays with the vocabulary re-numbered in sorted order."""
+    terms = list(rag.vocab)
+    order = np.array(sorted(range(len(terms)), key=terms.__getitem__), dtype=np.int64)
+    lengths = np.diff(rag.indptr)[order]
+    indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    # position j of the new layout reads old position (old start of its term) + (j - new start)
+    gather = np.repeat(rag.indptr[:-1][order] - indptr[:-1], lengths) + np.arange(indptr[-1])
+    encoded = [terms[i].encode("utf-8") for i in order]
+    term_off = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in encoded], out=term_off[1:])
+    with open(os.path.join(out, "terms.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    with open(os.path.join(out, "docs.bin"), "wb") as f:
+        f.write(rag.blob)
+    arrays = {
+        "term_off": term_off, "indptr": indptr,
+        "post_docs": rag.post_docs[gather], "post_w": rag.post_w[gather],
+        "df": rag.df.a[order], "idf": rag.idf.a[order],
+        "norms": rag.norms.a, "alive": rag.alive.a, "doc_off": rag.offsets.a,
+    }
+    for field, col in rag.cols.items():
+        arrays[f"meta_{field}"] = col.a
+    with open(os.path.join(out, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"codes": {field: list(codes) for field, codes in rag.codes.items()},
+                   "numeric": [field for field in rag.cols if field not in rag.codes],
+                   "impure": sorted(rag._impure)}, f)
+    for name, arr in arrays.items():
+        np.save(os.path.join(out, f"{name}.npy"), np.ascontiguousarray(arr))
+
+
+Page = Tuple[List[str], List[str], List[Dict[str, Any]], Any]  # ids, documents, metadatas, embeddings
+
+
+def _chroma_pages(col, count: int) -> Iterator[Page]:
+    row = 0
+    while row < count:
+        page = col.get(limit=min(_PAGE, count - row), offset=row, include=["embeddings", "documents", "metadatas"])
+        if not page["ids"]:
+            return
+        yield page["ids"], page["documents"], page["metadatas"], page["embeddings"]
+        row += len(page["ids"])
+
+
+def _rows(pages: Iterable[Page], count: int, dense: List[Any]) -> Iterator[Dict[str, Any]]:
+    """Docs in page order; writes each page's vectors into dense[0] (a .npy memmap) as a side effect."""
+    row = 0
+    for ids, documents, metadatas, embeddings in pages:
+        emb = np.asarray(embeddings, dtype=np.float32)[:count - row]
+        if dense[0] is None:
+            dense[0] = np.lib.format.open_memmap(dense[1], mode="w+", dtype=SHARED_INDEX_DTYPE,
+                                                 shape=(count, emb.shape[1]))
+        emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+        dense[0][row:row + len(emb)] = emb
+        for rid, doc, meta in zip(ids[:len(emb)], documents, metadatas or [None] * len(emb)):
+            yield {"id": rid, "text": doc, **(meta or {})}
+        row += len(emb)
+        if row == count:
+            return
+
+
+def publish(blocking: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Export the Chroma collection into a new version directory and point
+    CURRENT at it. Returns the manifest, or None when another process holds
+    the build lock (and blocking is False).
+    """
+    from app.services.embeddings import backend_key
+    from app.services.vectorstore import EMBED_MODEL, get_collection
+
+    with _flock(blocking) as got:
+        if not got:
+            return None
+        col = get_collection()
+        count = col.count()
+        return publish_pages(_chroma_pages(col, count), count, backend_key(EMBED_MODEL))
+
+
+def publish_pages(pages: Iterable[Page], count: int, model: str) -> Dict[str, Any]:
+    """Write up to `count` rows from `pages` as a new version and flip CURRENT (callers hold the lock)."""
+    t0 = time.perf_counter()
+    version = f"v{int(time.time() * 1000)}"
+    tmp = os.path.join(SHARED_INDEX_DIR, f".{version}.tmp")
+    os.makedirs(tmp)
+    dense: List[Any] = [None, os.path.join(tmp, "dense.npy")]
+    rag = CompactTinyRAG(_rows(pages, count, dense), policy=ReweightPolicy(drift_ratio=0))
+    rows = rag.alive.n
+    if dense[0] is None:
+        np.save(dense[1], np.zeros((0, 0), dtype=SHARED_INDEX_DTYPE))
+    else:
+        dense[0].flush()
+        trimmed = np.array(dense[0][:rows]) if rows < count else None  # collection shrank while exporting
+        dense[0] = None
+        if trimmed is not None:
+            np.save(dense[1], trimmed)
+    _save_lexical(rag, tmp)
+    manifest = {"version": version, "rows": rows, "terms": len(rag.vocab), "model": model,
+                "dtype": SHARED_INDEX_DTYPE, "created_at": time.time(),
+                "build_s": round(time.perf_counter() - t0, 3)}
+    with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(SHARED_INDEX_DIR, version))
+    pointer = os.path.join(SHARED_INDEX_DIR, "CURRENT")
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    _prune(keep=version)
+    print(f"[shared_index] published {version}: {rows} rows in {manifest['build_s']}s")
+    return manifest
+
+
+def _prune(keep: str) -> None:
+    """Drop all but the newest SHARED_INDEX_KEEP versions (mapped files stay valid until unmapped)."""
+    versions = sorted(d for d in os.listdir(SHARED_INDEX_DIR) if d.startswith("v") and d != keep)
+    for old in versions[:max(0, len(versions) - (SHARED_INDEX_KEEP - 1))]:
+        shutil.rmtree(os.path.join(SHARED_INDEX_DIR, old), ignore_errors=True)
+
+
+_dirty = {"first": 0.0, "last": 0.0}
+_publisher: Optional[threading.Thread] = None
+_publisher_lock = threading.Lock()
+
+
+def _on_ingest(ids: List[str], docs: List[str], metas: List[Dict[str, Any]]) -> None:
+    now = time.time()
+    with _publisher_lock:
+        _dirty["first"] = _dirty["first"] or now
+        _dirty["last"] = now
+
+
+def _publish_loop() -> None:
+    while True:
+        time.sleep(1.0)
+        current()  # idle workers swap (and release old mappings) without waiting for a request
+        now = time.time()
+        with _publisher_lock:
+            first, last = _dirty["first"], _dirty["last"]
+            due = first and (now - last >= SHARED_INDEX_DEBOUNCE_S or now - first >= SHARED_INDEX_MAX_DELAY_S)
+            if due:
+                _dirty["first"] = _dirty["last"] = 0.0
+        if due:
+            try:
+                if publish(blocking=True) is None:
+                    _on_ingest([], [], [])
+            except Exception as exc:  # noqa: BLE001
+                print(f"[shared_index] publish failed: {exc}")
+
+
+def start() -> None:
+    """Per worker: republish after local ingests; build the first version if none exists."""
+    global _publisher
+    from app.services.vectorstore import on_ingest
+
+    on_ingest(_on_ingest)
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = threading.Thread(target=_publish_loop, name="shared-index-publisher", daemon=True)
+            _publisher.start()
+    if _pointer() is None:
+        def _first() -> None:
+            try:
+                publish(blocking=False)  # one worker builds; the others pick it up on their next poll
+            except Exception as exc:  # noqa: BLE001
+                print(f"[shared_index] initial publish failed: {exc}")
+
+        threading.Thread(target=_first, name="shared-index-initial", daemon=True).start()
+
+
+def stats() -> Dict[str, Any]:
+    loaded = current() if SHARED_INDEX else None
+    if loaded is None:
+        return {"enabled": SHARED_INDEX, "version": None}
+    return {"enabled": True, "version": loaded.version, "rows": loaded.manifest["rows"],
+            "terms": loaded.manifest["terms"], "age_s": round(time.time() - loaded.manifest["created_at"], 1),
+            "mapped_bytes": loaded.lexical.memory()["mapped"], "pending_publish": bool(_dirty["first"])}
+
+
+def main() -> None:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Build / inspect the shared memory-mapped index.")
+    ap.add_argument("cmd", choices=["build", "info"])
+    args = ap.parse_args()
+    if args.cmd == "build":
+        print(json.dumps(publish(), indent=2))
+    else:
+        name = _pointer()
+        if name is None:
+            print(json.dumps({"version": None, "dir": SHARED_INDEX_DIR}))
+            return
+        with open(os.path.join(SHARED_INDEX_DIR, name, "manifest.json"), "r", encoding="utf-8") as f:
+            print(json.dumps(json.load(f), indent=2))
+
+
+if __name__ == "__main__":
+    main()
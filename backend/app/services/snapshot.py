@@ -0,0 +1,214 @@
+# backend/app/services/snapshot.py
+"""
+Binary snapshots of the vector collection, so a fresh deploy can come back
+without re-ingesting and re-embedding everything.
+
+File layout (little-endian):
+
+    b"SMRSNAP1"  u32 header_len  header JSON {version, collection, model, dim, dtype, count, created_at}
+    per block:   u32 rows  u32 payload_len
+                 rows * dim embedding values (float32 or float16)
+                 zlib(JSON {"ids", "documents", "metadatas"})
+    b"SMREND01"  u64 total rows
+
+Export pages through the collection and streams blocks out. Restore reads a
+block at a time and upserts the stored vectors directly, so the embedding
+function is never called; memory is bounded by one block.
+
+CLI (from backend/):
+    python -m app.services.snapshot export corpus.snap [--float16]
+    python -m app.services.snapshot restore corpus.snap [--force]
+    python -m app.services.snapshot info corpus.snap
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:  # imported lazily: routes/ingest loads this module at startup
+    import numpy as np
+
+# Restored by the RAG_EAGER_INIT warm-up thread when set
+SNAPSHOT_RESTORE = os.getenv("SNAPSHOT_RESTORE", "")
+# "if-empty" restores only into an empty collection; "always" upserts over what is there
+SNAPSHOT_RESTORE_MODE = os.getenv("SNAPSHOT_RESTORE_MODE", "if-empty").lower()
+SNAPSHOT_BLOCK_ROWS = int(os.getenv("SNAPSHOT_BLOCK_ROWS", "1000"))
+
+MAGIC = b"SMRSNAP1"
+END = b"SMREND01"
+VERSION = 1
+DTYPES = ("float32", "float16")
+_U32 = struct.Struct("<I")
+_BLOCK = struct.Struct("<II")
+_U64 = struct.Struct("<Q")
+
+# Result of the startup restore (exported as gauges by /api/metrics)
+last_restore: Optional[Dict[str, Any]] = None
+
+
+def _model_key() -> str:
+    from app.services.embeddings import backend_key
+    from app.services.vectorstore import EMBED_MODEL
+
+    return backend_key(EMBED_MODEL)
+
+
+def iter_snapshot(dtype: str = "float32", block_rows: int = SNAPSHOT_BLOCK_ROWS) -> Iterator[bytes]:
+    """Yield the snapshot of the current collection as byte chunks (one per block)."""
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {', '.join(DTYPES)}")
+    import numpy as np
+    from app.services.vectorstore import COLLECTION_NAME, get_collection
+
+    col = get_collection()
+    include = ["embeddings", "documents", "metadatas"]
+    page = col.get(limit=block_rows, offset=0, include=include)
+    dim = len(page["embeddings"][0]) if page["ids"] else 0
+    header = json.dumps({
+        "version": VERSION, "collection": COLLECTION_NAME, "model": _model_key(), "dim": dim,
+        "dtype": dtype, "count": col.count(), "created_at": time.time(),
+    }).encode("utf-8")
+    yield MAGIC + _U32.pack(len(header)) + header
+
+    rows = 0
+    while page["ids"]:
+        emb = np.asarray(page["embeddings"], dtype=np.float32).astype(dtype)
+        payload = zlib.compress(json.dumps({
+            "ids": page["ids"], "documents": page["documents"], "metadatas": page["metadatas"],
+        }, separators=(",", ":")).encode("utf-8"), 1)
+        yield _BLOCK.pack(len(page["ids"]), len(payload)) + emb.tobytes() + payload
+        rows += len(page["ids"])
+        if len(page["ids"]) < block_rows:
+            break
+        page = col.get(limit=block_rows, offset=rows, include=include)
+    yield END + _U64.pack(rows)
+
+
+def export_snapshot(path: str, dtype: str = "float32", block_rows: int = SNAPSHOT_BLOCK_ROWS) -> Dict[str, Any]:
+    """Write a snapshot to `path` (atomically, via a temp file)."""
+    t0 = time.perf_counter()
+    tmp = path + ".tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    size = 0
+    with open(tmp, "wb") as f:
+        for chunk in iter_snapshot(dtype, block_rows):
+            f.write(chunk)
+            size += len(chunk)
+    os.replace(tmp, path)
+    rows = _U64.unpack(chunk[len(END):])[0]
+    elapsed = time.perf_counter() - t0
+    return {"path": path, "rows": rows, "bytes": size, "dtype": dtype, "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(rows / elapsed, 1) if elapsed > 0 else None}
+
+
+def _read(f: BinaryIO, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise ValueError("snapshot is truncated")
+    return data
+
+
+def read_header(f: BinaryIO) -> Dict[str, Any]:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a snapshot file")
+    (n,) = _U32.unpack(_read(f, _U32.size))
+    header = json.loads(_read(f, n))
+    if header.get("version") != VERSION or header.get("dtype") not in DTYPES:
+        raise ValueError(f"unsupported snapshot version/dtype: {header.get('version')}/{header.get('dtype')}")
+    return header
+
+
+def iter_blocks(f: BinaryIO, header: Dict[str, Any]) -> Iterator[Tuple[np.ndarray, Dict[str, Any]]]:
+    """(float32 embeddings [rows, dim], {"ids", "documents", "metadatas"}) per block."""
+    import numpy as np
+    dtype = np.dtype(header["dtype"])
+    dim = header["dim"]
+    while True:
+        head = _read(f, len(END))
+        if head == END:
+            return
+        rows, payload_len = _BLOCK.unpack(head)
+        emb = np.frombuffer(_read(f, rows * dim * dtype.itemsize), dtype=dtype).reshape(rows, dim)
+        payload = json.loads(zlib.decompress(_read(f, payload_len)))
+        yield emb.astype(np.float32), payload
+
+
+def restore_snapshot(path: str, force: bool = False) -> Dict[str, Any]:
+    """
+    Upsert every row of the snapshot at `path` with its stored embedding.
+    Refuses a snapshot made with another embedding model/backend unless `force`.
+    float32 snapshots also seed the embedding cache, so re-ingesting the same
+    text after a deploy doesn't re-embed it either.
+    """
+    from app.services.vectorstore import get_embed_cache, upsert_embedded
+
+    t0 = time.perf_counter()
+    rows = 0
+    with open(path, "rb") as f:
+        header = read_header(f)
+        if header["model"] != _model_key() and not force:
+            raise ValueError(f"snapshot was embedded with {header['model']!r}, "
+                             f"this server uses {_model_key()!r}; pass force to restore anyway")
+        cache = get_embed_cache() if header["dtype"] == "float32" else None
+        for emb, block in iter_blocks(f, header):
+            upsert_embedded(block["ids"], emb, block["documents"], block["metadatas"])
+            if cache is not None:
+                texts = [(d, v) for d, v in zip(block["documents"], emb) if isinstance(d, str)]
+                cache.put([d for d, _ in texts], [v for _, v in texts])
+            rows += len(block["ids"])
+    elapsed = time.perf_counter() - t0
+    return {"path": path, "rows": rows, "expected": header["count"], "dtype": header["dtype"],
+            "elapsed_s": round(elapsed, 3), "rows_per_s": round(rows / elapsed, 1) if elapsed > 0 else None}
+
+
+def restore_on_startup() -> None:
+    """SNAPSHOT_RESTORE hook for the RAG_EAGER_INIT warm-up thread."""
+    if not SNAPSHOT_RESTORE:
+        return
+    if not os.path.exists(SNAPSHOT_RESTORE):
+        print(f"[snapshot] {SNAPSHOT_RESTORE} not found; skipping restore")
+        return
+    from app.services.vectorstore import get_collection
+
+    if SNAPSHOT_RESTORE_MODE == "if-empty" and get_collection().count() > 0:
+        print("[snapshot] collection already populated; skipping restore (SNAPSHOT_RESTORE_MODE=always to force)")
+        return
+    global last_restore
+    res = last_restore = restore_snapshot(SNAPSHOT_RESTORE)
+    print(f"[snapshot] restored {res['rows']} rows from {res['path']} in {res['elapsed_s']}s "
+          f"({res['rows_per_s']} rows/s)")
+
+
+def main() -> None:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Export / restore vector collection snapshots.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    exp = sub.add_parser("export")
+    exp.add_argument("path")
+    exp.add_argument("--float16", action="store_true", help="half-size embeddings (slightly lossy)")
+    exp.add_argument("--block-rows", type=int, default=SNAPSHOT_BLOCK_ROWS)
+    res = sub.add_parser("restore")
+    res.add_argument("path")
+    res.add_argument("--force", action="store_true", help="restore even if the embedding model differs")
+    info = sub.add_parser("info")
+    info.add_argument("path")
+    args = ap.parse_args()
+
+    if args.cmd == "export":
+        out = export_snapshot(args.path, "float16" if args.float16 else "float32", args.block_rows)
+    elif args.cmd == "restore":
+        out = restore_snapshot(args.path, force=args.force)
+    else:
+        with open(args.path, "rb") as f:
+            out = read_header(f)
+        out["bytes"] = os.path.getsize(args.path)
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
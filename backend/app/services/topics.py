@@ -0,0 +1,348 @@
+# backend/app/services/topics.py
+from __future__ import annotations
+
+import math
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer
+
+from app.services.metrics import span
+from app.services.rag import tokenize
+
+TOPICS_CLUSTERS = int(os.getenv("TOPICS_CLUSTERS", "20"))
+TOPICS_SEED_PAGE = int(os.getenv("TOPICS_SEED_PAGE", "1000"))
+# per-cluster keyword counters are pruned back to this many terms
+TOPICS_MAX_TERMS = int(os.getenv("TOPICS_MAX_TERMS", "2000"))
+# embedding mode: min seconds between re-clusterings, and docs sampled per cluster for labels
+TOPICS_EMBED_REFRESH_S = float(os.getenv("TOPICS_EMBED_REFRESH_S", "300"))
+TOPICS_LABEL_SAMPLE = int(os.getenv("TOPICS_LABEL_SAMPLE", "200"))
+# (id, text) hashes remembered to skip re-sent docs; oldest forgotten first
+TOPICS_SEEN_MAX = int(os.getenv("TOPICS_SEEN_MAX", "200000"))
+# docs held for the updater when its queue is full; beyond this they are dropped (and counted)
+TOPICS_MAX_BACKLOG = int(os.getenv("TOPICS_MAX_BACKLOG", "50000"))
+
+
+class TopicModel:
+    """
+    Streaming topic model: HashingVectorizer (stateless, so no refit) feeding
+    MiniBatchKMeans.partial_fit. Keywords are kept as per-cluster term counts
+    and ranked by tf * idf when a snapshot is taken.
+    """
+
+    def __init__(self, n_clusters: int = TOPICS_CLUSTERS):
+        self.n_clusters = n_clusters
+        self.vec = HashingVectorizer(
+            n_features=2 ** 18, ngram_range=(1, 2), stop_words="english", alternate_sign=False
+        )
+        self.analyze = self.vec.build_analyzer()
+        self.km = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+        self.fitted = False
+        self.n_docs = 0
+        self.counts = np.zeros(n_clusters, dtype=np.int64)
+        self.terms: List[Counter] = [Counter() for _ in range(n_clusters)]
+        self.df: Counter = Counter()
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._warmup: List[str] = []  # first partial_fit needs >= n_clusters samples
+
+    def update(self, ids: Sequence[str], texts: Sequence[str]) -> int:
+        """Fold new (id, text) pairs into the model; re-sent unchanged docs are ignored."""
+        batch = []
+        for rid, text in zip(ids, texts):
+            h = hash((rid, text))
+            if h in self._seen:
+                self._seen.move_to_end(h)
+                continue
+            self._seen[h] = None
+            if len(self._seen) > TOPICS_SEEN_MAX:
+                self._seen.popitem(last=False)
+            batch.append(text)
+        if not self.fitted:
+            self._warmup.extend(batch)
+            if len(self._warmup) < self.n_clusters:
+                return 0
+            batch, self._warmup = self._warmup, []
+        if not batch:
+            return 0
+
+        X = self.vec.transform(batch)
+        self.km.partial_fit(X)
+        self.fitted = True
+        labels = self.km.predict(X)
+        for text, c in zip(batch, labels):
+            toks = self.analyze(text)
+            self.terms[c].update(toks)
+            self.df.update(set(toks))
+            if len(self.terms[c]) > 2 * TOPICS_MAX_TERMS:
+                self.terms[c] = Counter(dict(self.terms[c].most_common(TOPICS_MAX_TERMS)))
+        if len(self.df) > 100 * TOPICS_MAX_TERMS:
+            self.df = Counter(dict(self.df.most_common(50 * TOPICS_MAX_TERMS)))
+        self.counts += np.bincount(labels, minlength=self.n_clusters)
+        self.n_docs += len(batch)
+        return len(batch)
+
+    def snapshot(self, n_keywords: int = 6) -> Dict[str, Any]:
+        keywords = []
+        for c, terms in enumerate(self.terms):
+            scored = sorted(
+                terms.items(),
+                key=lambda kv: kv[1] * math.log((1 + self.n_docs) / (1 + self.df.get(kv[0], 0))),
+                reverse=True,
+            )
+            keywords.append({"topic": c, "keywords": [t for t, _ in scored[:n_keywords]]})
+        topics = [{"topic": c, "count": int(n)} for c, n in enumerate(self.counts) if n]
+        topics.sort(key=lambda t: t["count"], reverse=True)
+        return {"topics": topics, "keywords": keywords, "docs": self.n_docs, "updated_at": time.time()}
+
+
+_model = TopicModel()
+_snapshot: Dict[str, Any] = {"topics": [], "keywords": [], "docs": 0, "updated_at": None}
+_queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=256)
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+# Batches that found the queue full wait here and ride along with the next update
+_backlog_ids: List[str] = []
+_backlog_texts: List[str] = []
+_backlog_lock = threading.Lock()
+_stats = {"merged": 0, "dropped": 0}
+
+
+def _seed_from_collection() -> None:
+    """Fold the already-stored corpus into the model, page by page."""
+    from app.services.vectorstore import get_collection  # lazy import
+
+    col = get_collection()
+    offset = 0
+    while True:
+        res = col.get(include=["documents"], limit=TOPICS_SEED_PAGE, offset=offset)
+        ids = res.get("ids") or []
+        if not ids:
+            break
+        _apply(ids, res.get("documents") or [])
+        offset += len(ids)
+
+
+def _apply(ids: Sequence[str], texts: Sequence[str]) -> None:
+    global _snapshot
+    with span("topics.update"):
+        if _model.update(ids, texts):
+            _snapshot = _model.snapshot()
+
+
+def _run() -> None:
+    try:
+        _seed_from_collection()
+    except Exception as exc:  # noqa: BLE001
+        print(f"[topics] seeding from collection failed: {exc}")
+    while True:
+        try:
+            job = _queue.get(timeout=1.0)
+        except queue.Empty:
+            job = ([], [])  # only the backlog, if any
+        if job is None:
+            break
+        ids, texts = job
+        with _backlog_lock:
+            if _backlog_ids:
+                ids, texts = ids + _backlog_ids, texts + _backlog_texts
+                _backlog_ids.clear()
+                _backlog_texts.clear()
+        if not ids:
+            continue
+        try:
+            _apply(ids, texts)
+        except Exception as exc:  # noqa: BLE001
+            print(f"[topics] update failed: {exc}")
+
+
+def start() -> None:
+    """Start the background updater (idempotent); it seeds from the collection first."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="topics-updater", daemon=True)
+            _worker.start()
+
+
+def observe(ids: Sequence[str], texts: Sequence[str], metas: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+    """
+    Ingest hook: hand a freshly upserted batch to the background updater.
+    Never blocks ingest: while the model is seeding or behind, batches are
+    merged into a bounded backlog, and dropped past TOPICS_MAX_BACKLOG docs.
+    """
+    start()
+    try:
+        _queue.put_nowait((list(ids), list(texts)))
+        return
+    except queue.Full:
+        pass
+    with _backlog_lock:
+        if len(_backlog_ids) + len(ids) > TOPICS_MAX_BACKLOG:
+            _stats["dropped"] += len(ids)
+            return
+        _backlog_ids.extend(ids)
+        _backlog_texts.extend(texts)
+        _stats["merged"] += len(ids)
+
+
+def stats() -> Dict[str, int]:
+    with _backlog_lock:
+        return {"queued_batches": _queue.qsize(), "backlog_docs": len(_backlog_ids),
+                "seen": len(_model._seen), **_stats}
+
+
+def snapshot() -> Dict[str, Any]:
+    """Latest published snapshot; never blocks on the model."""
+    start()
+    return _snapshot
+
+
+def cluster_batch(k: int, limit: int = 500) -> Dict[str, Any]:
+    """
+    One-off TF-IDF + k-means over up to `limit` stored docs, with
+    min(k, N // 20) clusters (at least 2): the pre-streaming behaviour, used
+    while the streaming model is still warming up (fewer docs than clusters).
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from app.services.vectorstore import get_collection  # lazy import
+
+    docs = [d for d in (get_collection().get(include=["documents"], limit=limit).get("documents") or []) if d]
+    if not docs:
+        return {"topics": [], "keywords": [], "docs": 0, "updated_at": time.time()}
+    tfidf = TfidfVectorizer(max_features=2000, ngram_range=(1, 2), stop_words="english")
+    try:
+        X = tfidf.fit_transform(docs)
+    except ValueError:  # only stop words
+        return {"topics": [], "keywords": [], "docs": 0, "updated_at": time.time()}
+    n_clusters = min(k, max(2, X.shape[0] // 20), X.shape[0])
+    km = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+    labels = km.fit_predict(X)
+    terms = tfidf.get_feature_names_out()
+    keywords = [{"topic": c, "keywords": [terms[i] for i in km.cluster_centers_[c].argsort()[-6:][::-1]]}
+                for c in range(n_clusters)]
+    counts = np.bincount(labels, minlength=n_clusters)
+    topics = [{"topic": c, "count": int(n)} for c, n in enumerate(counts) if n]
+    topics.sort(key=lambda t: t["count"], reverse=True)
+    return {"topics": topics, "keywords": keywords, "docs": len(docs), "updated_at": time.time()}
+
+
+# ----- embedding mode: cluster the vectors Chroma already stores -----
+
+def _pages(col, include: List[str], page: int):
+    offset = 0
+    while True:
+        res = col.get(include=include, limit=page, offset=offset)
+        ids = res.get("ids") or []
+        if not ids:
+            return
+        yield res
+        offset += len(ids)
+
+
+def _unit_rows(res: Dict[str, Any]) -> np.ndarray:
+    X = np.asarray(res["embeddings"], dtype=np.float32)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return X / norms  # unit length, so k-means approximates cosine clustering
+
+
+def _keywords(samples: List[List[str]], n_keywords: int = 6) -> List[List[str]]:
+    """Rank terms per cluster by tf * idf over the sampled member docs only."""
+    per_cluster: List[Counter] = []
+    df: Counter = Counter()
+    n = 0
+    for docs in samples:
+        tf: Counter = Counter()
+        for doc in docs:
+            toks = [t for t in tokenize(doc) if len(t) > 2 and not t.isdigit() and t not in ENGLISH_STOP_WORDS]
+            tf.update(toks)
+            df.update(set(toks))
+            n += 1
+        per_cluster.append(tf)
+    return [
+        [t for t, _ in sorted(tf.items(), key=lambda kv: kv[1] * math.log((1 + n) / (1 + df[kv[0]])), reverse=True)[:n_keywords]]
+        for tf in per_cluster
+    ]
+
+
+def cluster_embeddings(n_clusters: int = TOPICS_CLUSTERS, page: int = TOPICS_SEED_PAGE) -> Dict[str, Any]:
+    """
+    Two paged passes over the collection's stored embeddings: partial_fit the
+    centroids, then assign members. Only a reservoir sample of each cluster's
+    documents is tokenized, for keyword labels.
+    """
+    from app.services.vectorstore import get_collection  # lazy import
+
+    col = get_collection()
+    km = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+    fitted = False
+    pending: List[np.ndarray] = []
+    for res in _pages(col, ["embeddings"], page):
+        pending.append(_unit_rows(res))
+        if sum(len(x) for x in pending) >= n_clusters:
+            km.partial_fit(np.vstack(pending))
+            pending, fitted = [], True
+    if not fitted:
+        return {"topics": [], "keywords": [], "docs": 0, "updated_at": time.time()}
+    if pending:
+        km.partial_fit(np.vstack(pending))
+
+    rng = random.Random(42)
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    samples: List[List[str]] = [[] for _ in range(n_clusters)]
+    for res in _pages(col, ["embeddings", "documents"], page):
+        labels = km.predict(_unit_rows(res))
+        for doc, c in zip(res.get("documents") or [], labels):
+            counts[c] += 1
+            # reservoir sampling keeps label cost independent of cluster size
+            if len(samples[c]) < TOPICS_LABEL_SAMPLE:
+                samples[c].append(doc or "")
+            else:
+                j = rng.randrange(int(counts[c]))
+                if j < TOPICS_LABEL_SAMPLE:
+                    samples[c][j] = doc or ""
+
+    keywords = [{"topic": c, "keywords": kws} for c, kws in enumerate(_keywords(samples))]
+    topics = [{"topic": c, "count": int(n)} for c, n in enumerate(counts) if n]
+    topics.sort(key=lambda t: t["count"], reverse=True)
+    return {"topics": topics, "keywords": keywords, "docs": int(counts.sum()), "updated_at": time.time()}
+
+
+_emb_snapshot: Dict[str, Any] = {"topics": [], "keywords": [], "docs": 0, "updated_at": None}
+_emb_generation: Optional[int] = None
+_emb_running = threading.Lock()
+
+
+def _refresh_embeddings(gen: int) -> None:
+    global _emb_snapshot, _emb_generation
+    try:
+        with span("topics.cluster_embeddings"):
+            _emb_snapshot = cluster_embeddings()
+        _emb_generation = gen
+    except Exception as exc:  # noqa: BLE001
+        print(f"[topics] embedding clustering failed: {exc}")
+    finally:
+        _emb_running.release()
+
+
+def embedding_snapshot() -> Dict[str, Any]:
+    """
+    Latest embedding-mode snapshot. Re-clusters in the background when the
+    collection changed and the snapshot is older than TOPICS_EMBED_REFRESH_S.
+    """
+    from app.services.vectorstore import generation  # lazy import
+
+    gen = generation()
+    updated = _emb_snapshot["updated_at"]
+    stale = updated is None or (gen != _emb_generation and time.time() - updated >= TOPICS_EMBED_REFRESH_S)
+    if stale and _emb_running.acquire(blocking=False):
+        threading.Thread(target=_refresh_embeddings, args=(gen,), name="topics-embeddings", daemon=True).start()
+    return _emb_snapshot
@@ -1,5 +1,11 @@
+from app.services.outbound import OUTBOUND
+
 def search_twitter(query: str, max_results: int = 5):
     # Stub (no API calls). Replace with real X API if you have credentials.
+    # Goes through OUTBOUND already so a real client inherits caching + rate limits.
+    return OUTBOUND.call("twitter", {"q": query, "max_results": max_results}, lambda: _stub(query))
+
+def _stub(query: str):
     return {
         "source": "twitter",
         "items": [
@@ -3,58 +3,278 @@ from __future__ import annotations
 
 import os
 import hashlib
-from typing import Iterable, List, Dict, Any
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Callable, Iterable, List, Dict, Any, Optional
 
-import chromadb
-from chromadb.utils import embedding_functions
+from app.services import preprocess
+from app.services.metrics import span
+from app.services.rag import get_rag
+
+if TYPE_CHECKING:  # chromadb / numpy-backed helpers are imported on first use
+    from app.services.embed_cache import EmbeddingCache
+    from app.services.query_embed import QueryEncoder
 
 
 # Use a persistent folder (ephemeral on free Render, persists across app restarts but not deploys)
 CHROMA_PATH = os.getenv("CHROMA_PATH", "/opt/render/project/.chroma")
 COLLECTION_NAME = os.getenv("CHROMA_COLLECTION", "docs")
+EMBED_MODEL = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
+
+# On-disk embedding cache so re-ingested text isn't re-embedded ("off" disables)
+EMBED_CACHE = os.getenv("EMBED_CACHE", "on").lower() not in {"0", "false", "no", "off"}
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", os.path.join(CHROMA_PATH, "embed_cache.sqlite3"))
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "200000"))
+
+# Multi-worker mode: reads come from memory-mapped artifacts shared by all
+# processes (services/shared_index.py) instead of per-process indexes
+SHARED_INDEX = os.getenv("SHARED_INDEX", "off").lower() in {"1", "true", "yes", "on"}
+
+# Mirror ingested docs into the in-memory TinyRAG so hybrid search sees them
+# (off by default in SHARED_INDEX mode, where lexical reads use the shared postings)
+LEXICAL_INGEST = os.getenv("LEXICAL_INGEST", "off" if SHARED_INDEX else "on").lower() not in {"0", "false", "no", "off"}
 
 _client = None
 _collection = None
+_collection_lock = threading.Lock()
+_ef = None
+_embed_cache: Optional[EmbeddingCache] = None
+_query_encoder: Optional[QueryEncoder] = None
+
+# Bumped by every write so read-side caches can tell their entries are stale;
+# the ingest pool publishes from several threads, so the increment takes a lock
+_generation = 0
+_generation_lock = threading.Lock()
+
+# Called as fn(ids, documents, metadatas) after every successful upsert
+_ingest_listeners: List[Callable[[List[str], List[str], List[Dict[str, Any]]], None]] = []
 
 
 def get_collection():
-    """Singleton Chroma collection with SentenceTransformer embeddings."""
+    """Singleton Chroma collection; embeddings come from the EMBED_BACKEND function."""
+    if _collection is not None:
+        return _collection
+    with _collection_lock:  # background threads (topics seeding, warm-up) race the first request
+        return _open_collection()
+
+
+def _open_collection():
     global _client, _collection
     if _collection is not None:
         return _collection
 
+    import chromadb  # lazy: keeps app startup fast
+
     # Make sure the directory exists
     os.makedirs(CHROMA_PATH, exist_ok=True)
 
     _client = chromadb.PersistentClient(path=CHROMA_PATH)
+    ef = get_embedding_function()
 
-    # Lightweight, good default
-    ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name=os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
-    )
-
-    _collection = _client.get_or_create_collection(
-        name=COLLECTION_NAME,
-        embedding_function=ef,
-        metadata={"hnsw:space": "cosine"},
-    )
+    try:
+        _collection = _client.get_or_create_collection(
+            name=COLLECTION_NAME,
+            embedding_function=ef,
+            metadata={"hnsw:space": "cosine"},
+        )
+    except ValueError as exc:
+        if "conflict" not in str(exc).lower():
+            raise
+        # created under another backend (e.g. ST -> ONNX of the same model, same
+        # dimension); we always pass embeddings ourselves, so open it unbound
+        print(f"[vectorstore] collection '{COLLECTION_NAME}' was built with another embedding backend; "
+              f"use a new CHROMA_COLLECTION if the embedding dimension differs")
+        _collection = _client.get_or_create_collection(
+            name=COLLECTION_NAME,
+            metadata={"hnsw:space": "cosine"},
+        )
     return _collection
 
 
+def get_embedding_function():
+    """Singleton embedding function; loading it does not open Chroma."""
+    global _ef
+    if _ef is None:
+        from app.services.embeddings import make_embedding_function
+
+        # SentenceTransformer by default; EMBED_BACKEND=onnx for the int8 CPU model
+        _ef = make_embedding_function(EMBED_MODEL)
+    return _ef
+
+
+def get_embed_cache() -> Optional[EmbeddingCache]:
+    """Singleton embedding cache (None when EMBED_CACHE is off)."""
+    global _embed_cache
+    if _embed_cache is None and EMBED_CACHE:
+        from app.services.embed_cache import EmbeddingCache  # lazy import
+        from app.services.embeddings import backend_key
+
+        os.makedirs(os.path.dirname(EMBED_CACHE_PATH) or ".", exist_ok=True)
+        _embed_cache = EmbeddingCache(EMBED_CACHE_PATH, backend_key(EMBED_MODEL),
+                                      max_entries=EMBED_CACHE_MAX_ENTRIES)
+    return _embed_cache
+
+
+def get_query_encoder() -> QueryEncoder:
+    """Singleton query encoder (LRU + micro-batching) over the collection's model."""
+    global _query_encoder
+    if _query_encoder is None:
+        from app.services.query_embed import QueryEncoder  # lazy import
+
+        _query_encoder = QueryEncoder(get_embedding_function())
+    return _query_encoder
+
+
+def query_encoder_stats() -> Dict[str, Any]:
+    return get_query_encoder().stats()
+
+
+def embed_cache_stats() -> Dict[str, Any]:
+    cache = get_embed_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+def on_ingest(fn: Callable[[List[str], List[str], List[Dict[str, Any]]], None]) -> None:
+    """Register a callback for freshly upserted batches (keep it cheap; queue heavy work)."""
+    if fn not in _ingest_listeners:
+        _ingest_listeners.append(fn)
+
+
+def generation() -> int:
+    """Ingest generation; changes whenever the collection is written to."""
+    return _generation
+
+
+def _bump_generation() -> None:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+def invalidate() -> None:
+    """Bump the generation without a local write (e.g. another worker published a new index)."""
+    _bump_generation()
+
+
 def _hash_id(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8")).hexdigest()
 
 
+def to_epoch(value: Any) -> Optional[float]:
+    """Seconds since the epoch from a number, ISO-8601 or RFC-822 date; None if unparseable."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for parse in (lambda t: datetime.fromisoformat(t.replace("Z", "+00:00")), parsedate_to_datetime):
+        try:
+            dt = parse(text)
+        except (TypeError, ValueError, IndexError):
+            continue
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return None
+
+
+def _add_timestamps(meta: Dict[str, Any], now: float) -> None:
+    """Numeric published_ts / ingested_ts next to the display strings, for range filters."""
+    if "published_ts" not in meta:
+        ts = to_epoch(meta.get("published"))
+        if ts is not None:
+            meta["published_ts"] = ts
+    if "ingested_ts" not in meta:
+        meta["ingested_ts"] = to_epoch(meta.get("ingested_at")) or now
+
+
+# ----- metadata filters -----
+
+def build_where(sources: Optional[List[str]] = None, feeds: Optional[List[str]] = None,
+                published_after: Optional[float] = None, published_before: Optional[float] = None,
+                ingested_after: Optional[float] = None, ingested_before: Optional[float] = None
+                ) -> Optional[Dict[str, Any]]:
+    """Chroma `where` clause for the given filters (None when there is nothing to filter on)."""
+    clauses: List[Dict[str, Any]] = []
+    for field, values in (("source", sources), ("feed", feeds)):
+        if values:
+            clauses.append({field: values[0]} if len(values) == 1 else {field: {"$in": list(values)}})
+    for field, op, bound in (("published_ts", "$gte", published_after), ("published_ts", "$lte", published_before),
+                             ("ingested_ts", "$gte", ingested_after), ("ingested_ts", "$lte", ingested_before)):
+        if bound is not None:
+            clauses.append({field: {op: float(bound)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+}
+
+
+def matches(meta: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a `where` clause against one metadata dict (for retrievers outside Chroma)."""
+    if not where:
+        return True
+    for field, cond in where.items():
+        if field == "$and":
+            if not all(matches(meta, c) for c in cond):
+                return False
+        elif field == "$or":
+            if not any(matches(meta, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            if not all(_OPS[op](meta.get(field), arg) for op, arg in cond.items()):
+                return False
+        elif meta.get(field) != cond:
+            return False
+    return True
+
+
 def add_documents(items: Iterable[Dict[str, Any]]) -> int:
     """
     items: [{id?, text, url?, source?, title?, extra...}]
     Returns number added/upserted.
     """
+    return len(_write(items))
+
+
+def add_documents_by(items: Iterable[Dict[str, Any]], field: str) -> Dict[Any, int]:
+    """
+    add_documents(), but the rows written are counted per value of the item's
+    `field` (e.g. "feed"). Near-duplicates count nowhere, chunks count under
+    their parent's value, so the counts sum to add_documents()' return value.
+    """
+    counts: Dict[Any, int] = {}
+    for meta in _write(items):
+        counts[meta.get(field)] = counts.get(meta.get(field), 0) + 1
+    return counts
+
+
+def _write(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Preprocess, embed and upsert `items`; returns the metadata of every row written."""
     col = get_collection()
 
     ids: List[str] = []
     docs: List[str] = []
     metas: List[Dict[str, Any]] = []
+    now = time.time()
 
     for it in items:
         text = (it.get("text") or "").strip()
@@ -64,24 +284,82 @@ def add_documents(items: Iterable[Dict[str, Any]]) -> int:
         rid = it.get("id") or it.get("url") or _hash_id(text)
         ids.append(str(rid))
         docs.append(text)
-        metas.append({k: v for k, v in it.items() if k not in {"id", "text"}})
+        meta = {k: v for k, v in it.items() if k not in {"id", "text"}}
+        _add_timestamps(meta, now)
+        metas.append(meta)
 
-    if not ids:
-        return 0
+    # near-duplicate suppression + chunking, before anything is embedded
+    with span("vectorstore.add.preprocess"):
+        ids, docs, metas, _ = preprocess.prepare(ids, docs, metas)
+        if not ids:
+            return []
 
-    col.upsert(ids=ids, documents=docs, metadatas=metas)
-    return len(ids)
+    cache = get_embed_cache()
+    with span("vectorstore.add.embed"):
+        # only new/changed text reaches the embedding function when the cache is on
+        embeddings = cache.embed(docs, _ef) if cache is not None else _ef(docs)
+    with span("vectorstore.add.upsert"):
+        col.upsert(ids=ids, documents=docs, metadatas=metas, embeddings=embeddings)
+    # only once the new rows are stored: a failed embed/upsert must leave the old ones in place
+    _drop_stale_chunks(col, list(dict.fromkeys(m.get("parent_id") or rid for rid, m in zip(ids, metas))), set(ids))
+    _publish(ids, docs, metas)
+    return metas
 
 
-def search(query: str, k: int = 10) -> List[Dict[str, Any]]:
+def upsert_embedded(ids: List[str], embeddings: Any, documents: List[str],
+                    metadatas: List[Optional[Dict[str, Any]]]) -> int:
+    """
+    Write rows that already carry their vectors (snapshot restore): no
+    preprocessing, and the embedding function is never called.
+    """
     col = get_collection()
-    res = col.query(query_texts=[query], n_results=k)
+    with span("vectorstore.restore.upsert"):
+        col.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=[m or None for m in metadatas])
+    _publish(ids, documents, [m or {} for m in metadatas])
+    return len(ids)
+
+
+def _publish(ids: List[str], docs: List[str], metas: List[Dict[str, Any]]) -> None:
+    """After a write: mirror into TinyRAG, bump the generation, notify listeners."""
+    if LEXICAL_INGEST:
+        with span("vectorstore.add.lexical"):
+            get_rag().upsert({"id": rid, "text": doc, **meta} for rid, doc, meta in zip(ids, docs, metas))
+    _bump_generation()
+    with span("vectorstore.add.listeners"):
+        for fn in _ingest_listeners:
+            try:
+                fn(ids, docs, metas)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[vectorstore] ingest listener {fn!r} failed: {exc}")
+
+
+def _drop_stale_chunks(col, parents: List[str], keep: set) -> None:
+    """
+    Rows of `parents` not rewritten by this call: chunks beyond a parent's new
+    chunk count, all its chunks when it is now stored whole, or the whole row
+    when it is now chunked.
+    """
+    res = col.get(where={"parent_id": {"$in": parents}}, include=[])
+    stale = [i for i in (res.get("ids") or []) if i not in keep] + [p for p in parents if p not in keep]
+    if not stale:
+        return
+    col.delete(ids=stale)
+    if LEXICAL_INGEST:
+        get_rag().remove(stale)
+
+
+def preprocess_stats() -> Dict[str, int]:
+    return preprocess.stats()
+
+
+def _shape(res: Dict[str, Any], qi: int) -> List[Dict[str, Any]]:
+    """Results for the qi-th query of a col.query() response."""
     out: List[Dict[str, Any]] = []
 
-    ids = res.get("ids", [[]])[0]
-    docs = res.get("documents", [[]])[0]
-    metas = res.get("metadatas", [[]])[0]
-    dists = res.get("distances", [[]])[0] or []
+    ids = (res.get("ids") or [[]])[qi]
+    docs = (res.get("documents") or [[]])[qi]
+    metas = (res.get("metadatas") or [[]])[qi]
+    dists = (res.get("distances") or [[]])[qi] or []
 
     for i, doc in enumerate(docs):
         meta = metas[i] if i < len(metas) else {}
@@ -95,3 +373,90 @@ def search(query: str, k: int = 10) -> List[Dict[str, Any]]:
         )
     return out
 
+
+def _query(col, embeddings: list, k: int, where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    col.query() with the filter pushed down. Chroma pre-filters before the
+    HNSW walk, but a very selective filter can still leave a query short of k;
+    if more docs match than came back, retry once with a wider beam.
+    """
+    res = col.query(query_embeddings=embeddings, n_results=k, where=where)
+    if where is None:
+        return res
+    got = min(len(ids) for ids in res.get("ids") or [[]])
+    if got < k and len(col.get(where=where, include=[], limit=k).get("ids") or []) > got:
+        res = col.query(query_embeddings=embeddings, n_results=k * 4, where=where)
+        for field in ("ids", "documents", "metadatas", "distances"):
+            if res.get(field) is not None:
+                res[field] = [row[:k] for row in res[field]]
+    return res
+
+
+def _shared_dense():
+    if not SHARED_INDEX:
+        return None
+    from app.services import shared_index  # lazy import
+
+    return shared_index.dense()
+
+
+def search(query: str, k: int = 10, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    dense = _shared_dense()
+    with span("vectorstore.search.embed"):
+        emb = get_query_encoder().encode(query)
+    if dense is not None:
+        with span("vectorstore.search.mapped", filtered=where is not None):
+            return dense.search([emb], k, where)[0]
+    col = get_collection()
+    with span("vectorstore.search.query", filtered=where is not None):
+        res = _query(col, [emb], k, where)
+    with span("vectorstore.search.shape"):
+        return _shape(res, 0)
+
+
+def search_many(queries: List[str], k: int = 10,
+                where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Search several queries at once: one embedding pass over all (distinct)
+    query texts and a single col.query(). Returns one result list per query.
+    """
+    if not queries:
+        return []
+    dense = _shared_dense()
+    distinct = list(dict.fromkeys(queries))
+    with span("vectorstore.search_many.embed"):
+        embeddings = get_query_encoder().encode_many(distinct)
+    if dense is not None:
+        with span("vectorstore.search_many.mapped", filtered=where is not None):
+            by_query = dict(zip(distinct, dense.search(embeddings, k, where)))
+        return [by_query[q] for q in queries]
+    col = get_collection()
+    with span("vectorstore.search_many.query", filtered=where is not None):
+        res = _query(col, embeddings, k, where)
+    with span("vectorstore.search_many.shape"):
+        by_query = {q: _shape(res, i) for i, q in enumerate(distinct)}
+    return [by_query[q] for q in queries]
+
+
+def backfill_timestamps(page: int = 1000) -> int:
+    """Add published_ts / ingested_ts to docs stored before they existed. Returns docs updated."""
+    col = get_collection()
+    now = time.time()
+    updated = offset = 0
+    while True:
+        res = col.get(include=["metadatas"], limit=page, offset=offset)
+        ids = res.get("ids") or []
+        if not ids:
+            return updated
+        fix_ids, fix_metas = [], []
+        for rid, meta in zip(ids, res.get("metadatas") or []):
+            meta = dict(meta or {})
+            before = len(meta)
+            _add_timestamps(meta, now)
+            if len(meta) != before:
+                fix_ids.append(rid)
+                fix_metas.append(meta)
+        if fix_ids:
+            col.update(ids=fix_ids, metadatas=fix_metas)
+            updated += len(fix_ids)
+        offset += len(ids)
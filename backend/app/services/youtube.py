@@ -2,31 +2,29 @@ import os
 from typing import Any, Dict, List
 import requests
 
-_API = "https://www.googleapis.com/youtube/v3/search"
+from app.services.http import get_session
+from app.services.outbound import OUTBOUND
+
+_API = os.getenv("YOUTUBE_SEARCH_URL", "https://www.googleapis.com/youtube/v3/search")
 _API_KEY = os.getenv("YOUTUBE_API_KEY", "").strip()
 
-def search_youtube(q: str, max_results: int = 5) -> List[Dict[str, Any]]:
+def fetch_youtube(q: str, max_results: int = 5, timeout: float = 12) -> List[Dict[str, Any]]:
+    """Like search_youtube, but raises on transport/HTTP errors instead of returning []."""
     # No key? just return []
     if not _API_KEY:
         return []
 
-    try:
-        r = requests.get(
-            _API,
-            params={
-                "part": "snippet",
-                "type": "video",
-                "q": q,
-                "maxResults": max_results,
-                "key": _API_KEY,
-            },
-            timeout=12,
-        )
-        if r.status_code != 200:
-            return []
-        data = r.json()
-    except requests.RequestException:
-        return []
+    params = {"part": "snippet", "type": "video", "q": q, "maxResults": max_results}
+    return OUTBOUND.call("youtube", params, lambda: _get(params, timeout), timeout=timeout)
+
+def _get(params: Dict[str, Any], timeout: float) -> List[Dict[str, Any]]:
+    r = get_session().get(
+        _API,
+        params={**params, "key": _API_KEY},
+        timeout=timeout,
+    )
+    r.raise_for_status()
+    data = r.json()
 
     items: List[Dict[str, Any]] = []
     for it in (data or {}).get("items", []):
@@ -46,3 +44,9 @@ def search_youtube(q: str, max_results: int = 5) -> List[Dict[str, Any]]:
             }
         )
     return items
+
+def search_youtube(q: str, max_results: int = 5) -> List[Dict[str, Any]]:
+    try:
+        return fetch_youtube(q, max_results)
+    except (requests.RequestException, ValueError):
+        return []
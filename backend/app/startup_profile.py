@@ -0,0 +1,72 @@
+# backend/app/startup_profile.py
+from __future__ import annotations
+
+import builtins
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+
+def rss_mb() -> float:
+    """Resident set size of this process in MB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+class StartupProfiler:
+    """
+    Records cumulative first-import time per module (like `python -X importtime`)
+    and time/RSS deltas for named startup steps. Enabled by STARTUP_PROFILE=1.
+    """
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.rss0 = rss_mb()
+        self.imports: Dict[str, float] = {}
+        self.steps: List[Dict[str, Any]] = []
+        self._orig_import = None
+
+    def start(self) -> None:
+        orig = self._orig_import = builtins.__import__
+
+        def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return orig(name, globals, locals, fromlist, level)
+            t = time.perf_counter()
+            try:
+                return orig(name, globals, locals, fromlist, level)
+            finally:
+                self.imports.setdefault(name, (time.perf_counter() - t) * 1000)
+
+        builtins.__import__ = _timed_import
+
+    def stop(self) -> None:
+        if self._orig_import is not None:
+            builtins.__import__ = self._orig_import
+            self._orig_import = None
+
+    def step(self, name: str, t_start: float, rss_start: float) -> None:
+        self.steps.append({
+            "step": name,
+            "ms": round((time.perf_counter() - t_start) * 1000, 1),
+            "rss_delta_mb": round(rss_mb() - rss_start, 1),
+        })
+
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        slowest = sorted(self.imports.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        return {
+            "total_ms": round((time.perf_counter() - self.t0) * 1000, 1),
+            "rss_mb": rss_mb(),
+            "rss_start_mb": self.rss0,
+            "steps": self.steps,
+            "imports_ms": [{"module": m, "ms": round(ms, 1)} for m, ms in slowest],
+            "modules_loaded": len(sys.modules),
+        }
@@ -0,0 +1,137 @@
+# backend/app/timing.py
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter as Tally, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.services.metrics import HTTP_LATENCY, HTTP_TTFB, SLOW_PROFILES
+
+# Dump a folded-stack profile for requests slower than this (0 = profiler off)
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_SAMPLE_MS = float(os.getenv("PROFILE_SAMPLE_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/slow-profiles")
+PROFILE_KEEP_S = float(os.getenv("PROFILE_KEEP_S", "30"))  # sample history kept in memory
+
+# Threads parked here are idle, not work
+_IDLE = {"wait", "select", "poll", "epoll", "_worker", "get", "accept", "sleep", "serve_forever"}
+
+Frame = Tuple[str, str]  # (module file, function)
+_POOL_WORK = ("thread.py", "run")  # concurrent.futures work item: handlers fan out to these pools
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's Python stack every PROFILE_SAMPLE_MS into a
+    bounded ring. When a request turns out slow, the samples from its time
+    window whose stack passes through the endpoint are written as folded
+    stacks ("a;b;c <count>"), ready for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval_s: float, keep_s: float, out_dir: str):
+        self.interval = interval_s
+        self.out_dir = out_dir
+        self._samples: Deque[Tuple[float, Tuple[Frame, ...]]] = deque(maxlen=int(keep_s / interval_s) * 8)
+        self._interned: Dict[Tuple[Frame, ...], Tuple[Frame, ...]] = {}  # repeated stacks share one tuple
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            now = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == me or frame.f_code.co_name in _IDLE:
+                    continue
+                stack: List[Frame] = []
+                while frame is not None:
+                    stack.append((os.path.basename(frame.f_code.co_filename), frame.f_code.co_name))
+                    frame = frame.f_back
+                key = tuple(reversed(stack))
+                if len(self._interned) > 20000:
+                    self._interned.clear()
+                self._samples.append((now, self._interned.setdefault(key, key)))
+            time.sleep(self.interval)
+
+    def dump(self, label: str, start: float, end: float, endpoint: Any = None) -> Optional[str]:
+        code = getattr(endpoint, "__code__", None)
+        want = (os.path.basename(code.co_filename), code.co_name) if code else None
+        folded: Tally = Tally()
+        for t, stack in list(self._samples):
+            if start <= t <= end and (want is None or want in stack or _POOL_WORK in stack):
+                folded[";".join(f"{fn} ({mod})" for mod, fn in stack)] += 1
+        if not folded:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{re.sub(r'[^A-Za-z0-9]+', '_', label)}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{stack} {n}\n" for stack, n in folded.most_common())
+        return path
+
+
+def _route_label(scope) -> Optional[str]:
+    """Full route template including the /api prefix, across FastAPI router layouts."""
+    ctx = (scope.get("fastapi") or {}).get("effective_route_context")  # newer FastAPI keeps routers nested
+    if getattr(ctx, "path", None):
+        return ctx.path
+    return getattr(scope.get("route"), "path", None)
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware (streams pass straight through) recording per-route
+    latency to the last body byte and time to first byte. Routes are labelled
+    by template (/api/ingest/jobs/{job_id}), never by raw path.
+    """
+
+    def __init__(self, app, slow_ms: float = PROFILE_SLOW_MS):
+        self.app = app
+        self.slow_ms = slow_ms
+        self.profiler = SamplingProfiler(PROFILE_SAMPLE_MS / 1000, PROFILE_KEEP_S, PROFILE_DIR) if slow_ms > 0 else None
+        if self.profiler:
+            self.profiler.start()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = time.perf_counter()
+        status = {"code": 500, "ttfb": None}
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["ttfb"] = time.perf_counter() - t0
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            elapsed = time.perf_counter() - t0
+            route = _route_label(scope) or ("static" if status["code"] < 400 else "unmatched")
+            labels = {"method": scope["method"], "route": route, "status": status["code"]}
+            HTTP_LATENCY.observe(elapsed, **labels)
+            if status["ttfb"] is not None:
+                HTTP_TTFB.observe(status["ttfb"], **labels)
+            if self.profiler and elapsed * 1000 >= self.slow_ms:
+                self._dump(f"{scope['method']} {route}", t0, t0 + elapsed, scope.get("endpoint"), elapsed)
+
+    def _dump(self, label: str, start: float, end: float, endpoint: Any, elapsed: float) -> None:
+        try:
+            path = self.profiler.dump(label, start, end, endpoint)
+        except OSError as exc:
+            print(f"[timing] could not write slow-request profile: {exc}")
+            return
+        if path:
+            SLOW_PROFILES.inc(route=label)
+            print(f"[timing] {label} took {elapsed * 1000:.0f} ms; profile: {path}")
@@ -0,0 +1,54 @@
+# backend/benchmarks/asgi.py
+"""Minimal in-process ASGI client, so benchmarks don't need httpx or a server."""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+
+async def request(app, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                  body: Any = None, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+    """`body` is sent as JSON, or as-is when it is already bytes."""
+    payload = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(params or {}).encode(),
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode())]
+                   + [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+def get(app, path: str, **params) -> Tuple[int, bytes]:
+    return asyncio.run(request(app, "GET", path, params))
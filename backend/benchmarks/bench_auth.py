@@ -0,0 +1,146 @@
+# backend/benchmarks/bench_auth.py
+"""
+Authenticated vs unauthenticated endpoint load.
+
+A small FastAPI app with the repo's auth dependency is driven in-process
+(benchmarks/asgi.py) at a fixed concurrency:
+
+  throughput   req/s and p50/p99 for GET /open vs GET /secure
+               (Depends(current_user)), with the verified-token cache off and on;
+               tokens are drawn from --users distinct users
+  hash storm   GET /open while --storm sign-ins hash passwords: "inline"
+               hashes in a sync handler (request threadpool), "pool" awaits
+               run_password_hashing (AUTH_HASH_WORKERS threads). req/s is the
+               headline: with every sign-in hashing at once the event loop
+               gets a thin slice of the CPU
+
+The password hash is PBKDF2-SHA256 (--hash-iters) as a stand-in for the
+configured hasher; only its cost matters here.
+
+Run from backend/:
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --requests 20000 --concurrency 64 --users 1000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from fastapi import Depends, FastAPI
+
+from benchmarks.asgi import request
+from benchmarks.suite import percentiles
+
+
+def _hash(password: str, iters: int) -> str:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), b"bench-salt", iters).hex()
+
+
+def build_app(iters: int) -> FastAPI:
+    from app.routes import auth_deps
+
+    app = FastAPI()
+
+    @app.get("/open")
+    async def open_route() -> Dict[str, Any]:
+        return {"ok": True}
+
+    @app.get("/secure")
+    async def secure_route(user: Dict[str, Any] = Depends(auth_deps.current_user)) -> Dict[str, Any]:
+        return {"ok": True, "sub": user["sub"]}
+
+    @app.post("/signin/inline")
+    def signin_inline() -> Dict[str, Any]:
+        return {"hash": _hash("hunter2", iters)}
+
+    @app.post("/signin/pool")
+    async def signin_pool() -> Dict[str, Any]:
+        return {"hash": await auth_deps.run_password_hashing(_hash, "hunter2", iters)}
+
+    return app
+
+
+async def _load(app, path: str, n: int, concurrency: int, tokens: List[str]) -> Dict[str, float]:
+    lat: List[float] = []
+    rng = random.Random(7)
+
+    async def one() -> None:
+        headers = {"authorization": f"Bearer {rng.choice(tokens)}"} if tokens else None
+        t0 = time.perf_counter()
+        status, _ = await request(app, "GET", path, headers=headers)
+        lat.append((time.perf_counter() - t0) * 1000)
+        assert status == 200, status
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            await one()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(n // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    p = percentiles(lat)
+    return {"rps": len(lat) / elapsed, "p50": p["p50"], "p99": p["p99"]}
+
+
+async def _storm(app, mode: str, storm: int, n: int, concurrency: int) -> Dict[str, float]:
+    async def signin() -> int:
+        status, _ = await request(app, "POST", f"/signin/{mode}")
+        return status
+
+    t0 = time.perf_counter()
+    hashing = asyncio.gather(*(signin() for _ in range(storm)))
+    await asyncio.sleep(0)  # let the sign-ins queue first
+    res = await _load(app, "/open", n, concurrency, [])
+    statuses = await hashing
+    res["signin_s"] = time.perf_counter() - t0
+    res["rejected"] = sum(s == 503 for s in statuses)
+    return res
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from app.routes import auth_deps
+
+    app = build_app(args.hash_iters)
+    tokens = [auth_deps.create_access_token(f"user{i}") for i in range(args.users)]
+    cache = auth_deps._verified
+
+    print(f"{'run':>22} {'req/s':>9} {'p50_ms':>8} {'p99_ms':>8}")
+    rows = [("open", "/open", [], cache), ("secure, cache off", "/secure", tokens, None),
+            ("secure, cache on", "/secure", tokens, cache)]
+    for name, path, toks, verified in rows:
+        auth_deps._verified = verified
+        if verified is not None:
+            verified.clear()
+        await _load(app, path, min(args.requests, 500), args.concurrency, toks)  # warm-up
+        r = await _load(app, path, args.requests, args.concurrency, toks)
+        print(f"{name:>22} {r['rps']:>9.0f} {r['p50']:>8.3f} {r['p99']:>8.3f}")
+    if cache is not None:
+        print(f"{'':>22} token cache: {auth_deps.token_cache_stats()}")
+
+    print(f"\n/open during {args.storm} concurrent sign-ins (AUTH_HASH_WORKERS={auth_deps.AUTH_HASH_WORKERS})")
+    print(f"{'hashing':>22} {'req/s':>9} {'p50_ms':>8} {'p99_ms':>8} {'signin_s':>9} {'503s':>5}")
+    for mode in ("inline", "pool"):
+        r = await _storm(app, mode, args.storm, args.requests // 4, args.concurrency)
+        print(f"{mode:>22} {r['rps']:>9.0f} {r['p50']:>8.3f} {r['p99']:>8.3f} {r['signin_s']:>9.2f} {r['rejected']:>5}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--users", type=int, default=200, help="distinct tokens in rotation")
+    ap.add_argument("--storm", type=int, default=32, help="concurrent sign-ins in the hash-storm phase")
+    ap.add_argument("--hash-iters", type=int, default=200000, help="PBKDF2 iterations per password hash")
+    args = ap.parse_args()
+    # must be set before auth_deps is imported; PyJWT warns on short HMAC keys
+    os.environ.setdefault("JWT_SECRET", "bench-" + "0" * 32)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
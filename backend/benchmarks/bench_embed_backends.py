@@ -0,0 +1,109 @@
+# backend/benchmarks/bench_embed_backends.py
+"""
+Embedding backend comparison: latency, throughput, recall, memory.
+
+For each backend it measures single-query encode latency (p50/p95), bulk
+encode throughput at the configured batch size, and the RSS growth from
+loading the model. Recall@k is the overlap of each query's top-k neighbours
+over the corpus with the top-k produced by the reference backend, i.e. how
+much of the current retrieval quality a faster backend keeps.
+
+Run from backend/:
+    python -m benchmarks.bench_embed_backends
+    python -m benchmarks.bench_embed_backends --backends onnx onnx-fp32 --reference onnx-fp32 --threads 2
+    python -m benchmarks.bench_embed_backends --corpus app/data/sample_docs.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.services.embeddings import EMBED_BATCH_SIZE, EMBED_THREADS, make_embedding_function
+from app.services.vectorstore import EMBED_MODEL
+from app.startup_profile import rss_mb
+from benchmarks.bench_rag import synthetic_corpus
+
+
+def _load_corpus(path: str, n: int) -> List[str]:
+    if not path:
+        return [d["text"] for d in synthetic_corpus(n, vocab=5000)]
+    with open(path, "r", encoding="utf-8") as f:
+        return [d["text"] for d in json.load(f) if d.get("text")][:n]
+
+
+def _topk(queries: np.ndarray, corpus: np.ndarray, k: int) -> List[set]:
+    sims = queries @ corpus.T  # both sides are unit vectors
+    return [set(np.argsort(-row)[:k].tolist()) for row in sims]
+
+
+def _measure(backend: str, texts: List[str], queries: List[str], threads: int, batch: int) -> Dict:
+    before = rss_mb()
+    t0 = time.perf_counter()
+    ef = make_embedding_function(EMBED_MODEL, backend=backend, threads=threads, batch_size=batch)
+    ef(["warm up"])  # model load (and int8 conversion on the first ever run)
+    load_s = time.perf_counter() - t0
+
+    lat = []
+    for q in queries:
+        t0 = time.perf_counter()
+        ef([q])
+        lat.append((time.perf_counter() - t0) * 1000)
+    lat.sort()
+
+    t0 = time.perf_counter()
+    corpus = np.asarray(ef(texts), dtype=np.float32)
+    bulk_s = time.perf_counter() - t0
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "rss_mb": rss_mb() - before,
+        "p50_ms": statistics.median(lat),
+        "p95_ms": lat[min(len(lat) - 1, int(0.95 * len(lat)))],
+        "docs_per_s": len(texts) / bulk_s,
+        "corpus": corpus,
+        "queries": np.asarray(ef(queries), dtype=np.float32),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backends", nargs="+", default=["sentence-transformers", "onnx-fp32", "onnx"])
+    ap.add_argument("--reference", default="", help="backend whose neighbours count as ground truth "
+                                                    "(default: first of --backends)")
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--corpus", default="", help="JSON list of {text} docs instead of the synthetic corpus")
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--threads", type=int, default=EMBED_THREADS)
+    ap.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    args = ap.parse_args()
+
+    texts = _load_corpus(args.corpus, args.docs)
+    rng = random.Random(5)
+    # short keyword queries plus a few passages lifted from the corpus
+    queries = [" ".join(rng.choice(texts).split()[:rng.randint(2, 6)]) for _ in range(args.queries)]
+
+    reference = args.reference or args.backends[0]
+    backends = list(dict.fromkeys([reference] + args.backends))
+    runs = {b: _measure(b, texts, queries, args.threads, args.batch_size) for b in backends}
+    truth = _topk(runs[reference]["queries"], runs[reference]["corpus"], args.k)
+
+    print(f"docs={len(texts)} queries={len(queries)} k={args.k} threads={args.threads or 'auto'} "
+          f"batch={args.batch_size} reference={reference}")
+    print(f"{'backend':>22} {'load_s':>7} {'rss_mb':>7} {'p50_ms':>7} {'p95_ms':>7} {'docs/s':>8} {'recall@k':>9}")
+    for b in args.backends:
+        r = runs[b]
+        got = _topk(r["queries"], r["corpus"], args.k)
+        recall = sum(len(g & t) for g, t in zip(got, truth)) / (args.k * len(truth))
+        print(f"{b:>22} {r['load_s']:>7.2f} {r['rss_mb']:>7.1f} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f} "
+              f"{r['docs_per_s']:>8.0f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# backend/benchmarks/bench_rag.py
+"""
+TinyRAG search benchmark.
+
+Builds synthetic corpora of growing size and times the inverted-index search
+against the old brute-force scan (`_cos` against every doc vector). The
+per-query cost of the index grows with the postings touched, not with N, so
+the `index_ms` column should stay far flatter than `scan_ms`.
+
+Run from backend/:
+    python -m benchmarks.bench_rag
+    python -m benchmarks.bench_rag --sizes 10000 100000 300000 --no-scan
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from app.services.rag import TinyRAG, tokenize
+
+
+def synthetic_corpus(n: int, vocab: int = 50000, seed: int = 7) -> List[Dict[str, Any]]:
+    """Posts of 8-40 tokens drawn from a Zipf-like vocabulary."""
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocab)]
+    cum, acc = [], 0.0
+    for r in range(vocab):
+        acc += 1.0 / (r + 1)
+        cum.append(acc)
+    docs = []
+    for i in range(n):
+        toks = rng.choices(words, cum_weights=cum, k=rng.randint(8, 40))
+        docs.append({"source": "synthetic", "title": f"post {i}", "text": " ".join(toks)})
+    return docs
+
+
+def scan_search(rag: TinyRAG, query: str, k: int) -> List[Dict[str, Any]]:
+    """The pre-index implementation, kept as the reference."""
+    qv = rag._tfidf(tokenize(query))
+    scored = [(rag._cos(qv, dv), i) for i, dv in enumerate(rag.doc_vecs)]
+    scored.sort(reverse=True)
+    out = []
+    for score, idx in scored[:k]:
+        d = rag.docs[idx].copy()
+        d["score"] = round(score, 4)
+        out.append(d)
+    return out
+
+
+def _time_per_query(fn, queries: List[str], k: int) -> float:
+    t0 = time.perf_counter()
+    for q in queries:
+        fn(q, k)
+    return (time.perf_counter() - t0) * 1000 / len(queries)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--no-scan", action="store_true", help="skip the brute-force baseline")
+    args = ap.parse_args()
+
+    rng = random.Random(11)
+    # mid/low-frequency terms, as real keyword queries are
+    queries = [f"w{rng.randint(200, 20000)} w{rng.randint(200, 20000)}" for _ in range(args.queries)]
+
+    print(f"{'docs':>10} {'build_s':>9} {'index_ms':>10} {'scan_ms':>10} {'same':>6}")
+    for n in args.sizes:
+        docs = synthetic_corpus(n)
+        t0 = time.perf_counter()
+        rag = TinyRAG(docs)
+        build_s = time.perf_counter() - t0
+
+        index_ms = _time_per_query(rag.search, queries, args.k)
+        scan_ms = float("nan")
+        same = "-"
+        if not args.no_scan:
+            scan_ms = _time_per_query(lambda q, k: scan_search(rag, q, k), queries, args.k)
+            same = str(all(
+                [d["score"] for d in rag.search(q, args.k)] == [d["score"] for d in scan_search(rag, q, args.k)]
+                for q in queries[:10]
+            ))
+        print(f"{n:>10} {build_s:>9.2f} {index_ms:>10.3f} {scan_ms:>10.3f} {same:>6}")
+
+
+if __name__ == "__main__":
+    main()
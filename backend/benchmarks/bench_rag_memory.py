@@ -0,0 +1,94 @@
+# backend/benchmarks/bench_rag_memory.py
+"""
+TinyRAG memory report: standard (dict/list) layout vs CompactTinyRAG.
+
+For each corpus size, both layouts are built from the synthetic social
+corpus (benchmarks/corpus.py). Reported per layout:
+
+  retained_mb   heap still held once the build returns and the input list is
+                gone (tracemalloc; numpy buffers included)
+  peak_mb       build-time peak, input corpus included
+  bytes/doc     retained_mb per indexed doc
+  build_s       build time (separate run, without tracemalloc)
+  p50_ms        search latency
+  same%         queries whose top-k ids match the standard layout exactly
+                (float32 weights can reorder near-ties)
+
+With --components, the per-component breakdown from .memory() is printed too
+(slow for the standard layout: it walks every object).
+
+Run from backend/:
+    python -m benchmarks.bench_rag_memory
+    python -m benchmarks.bench_rag_memory --sizes 100000 1000000 --components
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from app.services.rag import CompactTinyRAG, TinyRAG
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.suite import percentiles
+
+LAYOUTS = {"standard": TinyRAG, "compact": CompactTinyRAG}
+
+
+def _measure(cls, n: int, seed: int) -> Dict[str, Any]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rag = cls(CorpusGenerator(seed).posts(n))  # the corpus list is dropped when the build returns
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"rag": rag, "retained": current - before, "peak": peak - before}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--components", action="store_true", help="also print .memory() per component")
+    args = ap.parse_args()
+
+    queries = CorpusGenerator(args.seed + 1).queries(args.queries)
+    print(f"{'docs':>9} {'layout':>9} {'retained_mb':>12} {'peak_mb':>9} {'bytes/doc':>10} "
+          f"{'build_s':>8} {'p50_ms':>8} {'same%':>6}")
+    for n in args.sizes:
+        reference: List[List[str]] = []
+        for name, cls in LAYOUTS.items():
+            m = _measure(cls, n, args.seed)
+            rag = m.pop("rag")
+            components = rag.memory() if args.components else None
+            del rag
+            gc.collect()
+
+            docs = CorpusGenerator(args.seed).posts(n)
+            t0 = time.perf_counter()
+            rag = cls(docs)
+            build_s = time.perf_counter() - t0
+            del docs
+
+            lat, ids = [], []
+            for q in queries:
+                t0 = time.perf_counter()
+                res = rag.search(q, args.k)
+                lat.append((time.perf_counter() - t0) * 1000)
+                ids.append([d["id"] for d in res])
+            same = "-" if not reference else f"{100 * sum(a == b for a, b in zip(ids, reference)) / len(ids):.1f}"
+            reference = reference or ids
+            print(f"{n:>9} {name:>9} {m['retained'] / 2**20:>12.1f} {m['peak'] / 2**20:>9.1f} "
+                  f"{m['retained'] / n:>10.0f} {build_s:>8.2f} {percentiles(lat)['p50']:>8.3f} {same:>6}")
+            if components:
+                print("          " + ", ".join(f"{k}={v / 2**20:.1f}MB" for k, v in components.items()))
+            del rag
+            gc.collect()
+
+
+if __name__ == "__main__":
+    main()
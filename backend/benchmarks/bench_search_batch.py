@@ -0,0 +1,59 @@
+# backend/benchmarks/bench_search_batch.py
+"""
+Batch vs sequential vector search.
+
+Loads a synthetic corpus into a throwaway Chroma directory, then times N
+sequential vectorstore.search() calls against one vectorstore.search_many()
+call for the same N queries. Uses the configured EMBED_MODEL.
+
+Run from backend/:
+    python -m benchmarks.bench_search_batch --docs 2000 --queries 10 25 50
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=2000)
+    ap.add_argument("--queries", type=int, nargs="+", default=[10, 25, 50])
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    # must be set before vectorstore is imported
+    os.environ["CHROMA_PATH"] = tempfile.mkdtemp(prefix="bench-chroma-")
+    os.environ["EMBED_CACHE"] = "off"
+    from app.services import vectorstore
+    from benchmarks.bench_rag import synthetic_corpus
+
+    docs = synthetic_corpus(args.docs, vocab=5000)
+    for i, d in enumerate(docs):
+        d["id"] = f"doc{i}"
+    for i in range(0, len(docs), 500):
+        vectorstore.add_documents(docs[i:i + 500])
+    vectorstore.search("warm up", k=args.k)  # model load
+
+    rng = random.Random(3)
+    print(f"{'queries':>8} {'sequential_ms':>14} {'batch_ms':>10} {'speedup':>8}")
+    for n in args.queries:
+        seq = bat = float("inf")
+        for _ in range(args.repeat):
+            queries = [f"w{rng.randint(0, 5000)} w{rng.randint(0, 5000)} w{rng.randint(0, 500)}" for _ in range(n)]
+            t0 = time.perf_counter()
+            for q in queries:
+                vectorstore.search(q, k=args.k)
+            seq = min(seq, (time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            vectorstore.search_many(queries, k=args.k)
+            bat = min(bat, (time.perf_counter() - t0) * 1000)
+        print(f"{n:>8} {seq:>14.1f} {bat:>10.1f} {seq / bat:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
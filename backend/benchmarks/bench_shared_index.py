@@ -0,0 +1,138 @@
+# backend/benchmarks/bench_shared_index.py
+"""
+Memory across W worker processes: per-process indexes vs the shared
+memory-mapped index (services/shared_index.py).
+
+  process  every worker builds its own CompactTinyRAG and holds its own
+           float32 embedding matrix (what each uvicorn worker does today)
+  mapped   the parent publishes one version; every worker maps it
+
+Workers build/map, run the same queries (lexical + brute-force dense, which
+touches every page), then report together while all are alive:
+
+  rss_mb   resident set per worker (counts shared pages in every worker)
+  pss_mb   proportional set per worker (shared pages split between workers);
+           the sum is what the machine actually pays
+  load_s   build (process) or map (mapped) time
+  lex_ms / dense_ms   p50 query latency
+
+Embeddings are random unit vectors: latency and memory don't depend on
+their content. Linux only (/proc/self/smaps_rollup).
+
+Run from backend/:
+    python -m benchmarks.bench_shared_index
+    python -m benchmarks.bench_shared_index --docs 200000 --workers 4 --dim 384
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.suite import percentiles
+
+
+def _mem_mb() -> Dict[str, float]:
+    out = {}
+    with open("/proc/self/smaps_rollup", "r", encoding="utf-8") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in {"Rss", "Pss"}:
+                out[key.lower() + "_mb"] = int(rest.split()[0]) / 1024
+    return out
+
+
+def _vectors(n: int, dim: int, seed: int) -> np.ndarray:
+    v = np.random.default_rng(seed).standard_normal((n, dim), dtype=np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _worker(mode: str, args: argparse.Namespace, path: str, barrier, results) -> None:
+    from app.services.rag import CompactTinyRAG
+    from app.services.shared_index import MappedDense, MappedTinyRAG
+
+    t0 = time.perf_counter()
+    if mode == "mapped":
+        lex = MappedTinyRAG(path)
+        dense = MappedDense(path, lex)
+        search_dense = lambda q: dense.search([q], args.k)  # noqa: E731
+    else:
+        lex = CompactTinyRAG(CorpusGenerator(args.seed).posts(args.docs))
+        mat = _vectors(args.docs, args.dim, args.seed)
+        search_dense = lambda q: np.argpartition(-(mat @ q), args.k)[:args.k]  # noqa: E731
+    load_s = time.perf_counter() - t0
+
+    queries = CorpusGenerator(args.seed + 1).queries(args.queries)
+    qvecs = _vectors(args.queries, args.dim, args.seed + 1)
+    lex_ms, dense_ms = [], []
+    for q, qv in zip(queries, qvecs):
+        t0 = time.perf_counter()
+        lex.search(q, args.k)
+        lex_ms.append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        search_dense(qv)
+        dense_ms.append((time.perf_counter() - t0) * 1000)
+
+    barrier.wait()  # measure with every worker alive, so shared pages are split
+    results.put({"load_s": load_s, "lex_ms": percentiles(lex_ms)["p50"],
+                 "dense_ms": percentiles(dense_ms)["p50"], **_mem_mb()})
+    barrier.wait()
+
+
+def _run(mode: str, args: argparse.Namespace, path: str) -> List[Dict[str, Any]]:
+    ctx = mp.get_context("spawn")  # fresh interpreters, like uvicorn workers
+    barrier, results = ctx.Barrier(args.workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, args, path, barrier, results)) for _ in range(args.workers)]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=50000)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--float16", action="store_true", help="publish the dense matrix as float16")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-shared-index-") as tmp:
+        os.environ["SHARED_INDEX_DIR"] = tmp
+        os.environ["SHARED_INDEX_DTYPE"] = "float16" if args.float16 else "float32"
+        from app.services import shared_index  # after the env: config is read at import
+
+        docs = CorpusGenerator(args.seed).posts(args.docs)
+        vecs = _vectors(args.docs, args.dim, args.seed)
+        pages = ((
+            [str(d["id"]) for d in docs[s:s + 1000]], [d["text"] for d in docs[s:s + 1000]],
+            [{k: v for k, v in d.items() if k not in {"id", "text"}} for d in docs[s:s + 1000]], vecs[s:s + 1000],
+        ) for s in range(0, len(docs), 1000))
+        manifest = shared_index.publish_pages(pages, len(docs), "bench")
+        del docs, vecs
+        path = os.path.join(tmp, manifest["version"])
+        on_disk = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"{args.docs} docs, dim {args.dim}, {args.workers} workers; "
+              f"published in {manifest['build_s']}s, {on_disk / 2**20:.1f}MB on disk")
+
+        print(f"{'mode':>8} {'rss_mb':>9} {'pss_mb':>9} {'sum_pss_mb':>11} {'load_s':>7} {'lex_ms':>7} {'dense_ms':>9}")
+        for mode in ("process", "mapped"):
+            res = _run(mode, args, path)
+            avg = {key: sum(r[key] for r in res) / len(res) for key in res[0]}
+            print(f"{mode:>8} {avg['rss_mb']:>9.1f} {avg['pss_mb']:>9.1f} {sum(r['pss_mb'] for r in res):>11.1f} "
+                  f"{avg['load_s']:>7.2f} {avg['lex_ms']:>7.3f} {avg['dense_ms']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
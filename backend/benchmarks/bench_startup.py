@@ -0,0 +1,56 @@
+# backend/benchmarks/bench_startup.py
+"""
+Cold-start budget check.
+
+Starts a fresh interpreter, imports app.main (which builds the app) and
+times the first /api/health response, repeated a few times. Exits 1 when the
+median exceeds the budget, so it can gate CI/deploys.
+
+Run from backend/:
+    python -m benchmarks.bench_startup --budget-ms 1500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t_app = time.perf_counter()
+from benchmarks.asgi import get
+status, _ = get(app.main.app, "/api/health")
+t_health = time.perf_counter()
+from app.startup_profile import rss_mb
+print(json.dumps({"status": status, "create_app_ms": (t_app - t0) * 1000,
+                  "first_health_ms": (t_health - t0) * 1000, "rss_mb": rss_mb()}))
+"""
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "1500")))
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, "-c", _CHILD], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    median = statistics.median(r["first_health_ms"] for r in runs)
+    print(f"{'run':>4} {'create_app_ms':>14} {'first_health_ms':>16} {'rss_mb':>8} {'status':>7}")
+    for i, r in enumerate(runs):
+        print(f"{i:>4} {r['create_app_ms']:>14.1f} {r['first_health_ms']:>16.1f} {r['rss_mb']:>8.1f} {r['status']:>7}")
+    verdict = "OK" if median <= args.budget_ms else "OVER BUDGET"
+    print(f"median first /api/health: {median:.1f} ms (budget {args.budget_ms:.0f} ms) {verdict}")
+    sys.exit(0 if median <= args.budget_ms and all(r["status"] == 200 for r in runs) else 1)
+
+
+if __name__ == "__main__":
+    main()
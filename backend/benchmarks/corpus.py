@@ -0,0 +1,163 @@
+# backend/benchmarks/corpus.py
+"""
+Deterministic synthetic social-media corpus.
+
+Posts mimic the shape of what the ingest paths see: a mix of sources with
+their own length distributions (log-normal, so a few Reddit posts are long
+enough to be chunked), a Zipf-weighted English core vocabulary, per-topic
+jargon that gives /trends something to find, a long tail of rare tokens,
+hashtags / mentions / links, a few near-duplicate reposts, and publish times
+spread over a month with a daily cycle. Same seed, same corpus.
+"""
+from __future__ import annotations
+
+import math
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+_COMMON = (
+    "the to and a of i it is in that you for this on my was with but have be just so not are like "
+    "they what if at all about can me from we do get one your out would up or some people think "
+    "know how will time there an more really when good no because even now has new much any been "
+    "make only also right see then still want way than them back going need other into first "
+    "over after year work day actually pretty best most better great thing things anyone using"
+).split()
+
+TOPICS: Dict[str, List[str]] = {
+    "ai": "model llm gpt training inference weights prompt agents openai anthropic benchmark gpu "
+          "finetune embeddings transformer tokens context reasoning alignment dataset".split(),
+    "python": "python fastapi django pip asyncio typing pandas numpy pytest virtualenv poetry uvicorn "
+              "decorator generator import module package wheel".split(),
+    "crypto": "bitcoin ethereum wallet blockchain token defi exchange mining stablecoin ledger solana "
+              "airdrop nft staking gas".split(),
+    "gaming": "game steam console fps nintendo playstation xbox patch release rpg multiplayer "
+              "speedrun controller indie esports".split(),
+    "space": "nasa rocket launch orbit spacex mars moon satellite telescope astronaut booster "
+             "starship payload webb".split(),
+    "finance": "stocks market inflation rates fed earnings index bonds recession etf dividend "
+               "portfolio housing mortgage".split(),
+    "climate": "climate emissions carbon solar wind heatwave drought renewable grid battery ev "
+               "wildfire flooding policy".split(),
+    "security": "breach vulnerability exploit patch ransomware phishing cve zeroday malware "
+                "password firewall encryption leak".split(),
+    "football": "match goal league transfer striker coach penalty derby season club keeper "
+                "champions fixture var".split(),
+    "food": "recipe pasta bread coffee restaurant vegan spicy baking dinner cheese ramen "
+            "sourdough grill dessert".split(),
+    "music": "album tour concert single vinyl playlist guitar producer lyrics festival "
+             "drummer remix spotify".split(),
+    "health": "sleep workout diet vaccine protein running cardio therapy stress doctor "
+              "nutrition fasting clinic".split(),
+}
+
+# source -> (share, median words, log-normal sigma, max words)
+SOURCES = {
+    "twitter": (0.45, 18, 0.5, 60),
+    "reddit": (0.30, 55, 0.9, 700),
+    "youtube": (0.10, 30, 0.6, 120),
+    "rss": (0.15, 45, 0.5, 200),
+}
+
+BASE_TS = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def _zipf_cum(n: int, s: float = 1.07) -> List[float]:
+    cum, acc = [], 0.0
+    for r in range(n):
+        acc += 1.0 / (r + 1) ** s
+        cum.append(acc)
+    return cum
+
+
+class CorpusGenerator:
+    """Build posts and queries from one seeded RNG."""
+
+    def __init__(self, seed: int = 42, rare_vocab: int = 30000, repost_rate: float = 0.03, days: int = 30):
+        self.rng = random.Random(seed)
+        self.topics = list(TOPICS)
+        self.repost_rate = repost_rate
+        self.days = days
+        self._common_cum = _zipf_cum(len(_COMMON))
+        self._topic_cum = {t: _zipf_cum(len(w)) for t, w in TOPICS.items()}
+        self._topic_weights = _zipf_cum(len(self.topics), s=0.8)  # a few topics dominate
+        self._rare = [f"x{i}" for i in range(rare_vocab)]
+        self._rare_cum = _zipf_cum(rare_vocab)
+        self._sources = list(SOURCES)
+        self._source_cum = [sum(SOURCES[s][0] for s in self._sources[:i + 1]) for i in range(len(SOURCES))]
+
+    def _length(self, source: str) -> int:
+        _, median, sigma, cap = SOURCES[source]
+        return max(3, min(cap, int(self.rng.lognormvariate(math.log(median), sigma))))
+
+    def _words(self, topic: str, n: int) -> List[str]:
+        rng = self.rng
+        out = []
+        for _ in range(n):
+            r = rng.random()
+            if r < 0.55:
+                out.append(rng.choices(_COMMON, cum_weights=self._common_cum)[0])
+            elif r < 0.90:
+                out.append(rng.choices(TOPICS[topic], cum_weights=self._topic_cum[topic])[0])
+            else:
+                out.append(rng.choices(self._rare, cum_weights=self._rare_cum)[0])
+        return out
+
+    def _published(self) -> float:
+        day = self.rng.randrange(self.days)
+        hour = self.rng.gauss(15, 4) % 24  # afternoon peak
+        return BASE_TS + day * 86400 + hour * 3600
+
+    def post(self, i: int) -> Dict[str, Any]:
+        rng = self.rng
+        source = rng.choices(self._sources, cum_weights=self._source_cum)[0]
+        topic = rng.choices(self.topics, cum_weights=self._topic_weights)[0]
+        words = self._words(topic, self._length(source))
+        if source == "twitter":
+            if rng.random() < 0.4:
+                words.append("#" + rng.choice(TOPICS[topic]))
+            if rng.random() < 0.3:
+                words.insert(0, f"@user{rng.randrange(5000)}")
+            if rng.random() < 0.2:
+                words.append(f"https://t.co/{rng.randrange(16 ** 8):08x}")
+        published = self._published()
+        return {
+            "id": f"{source}-{i}",
+            "url": f"https://example.com/{source}/{i}",
+            "source": source,
+            "feed": f"https://example.com/{source}/{topic}.xml",
+            "title": " ".join(words[:8]),
+            "text": " ".join(words),
+            "topic": topic,
+            "published": datetime.fromtimestamp(published, tz=timezone.utc).isoformat().replace("+00:00", "Z"),
+        }
+
+    def posts(self, n: int) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for i in range(n):
+            if out and self.rng.random() < self.repost_rate:
+                # near-duplicate repost: same text, one word swapped, new id
+                src = dict(self.rng.choice(out))
+                words = src["text"].split()
+                words[self.rng.randrange(len(words))] = self.rng.choice(_COMMON)
+                src.update({"id": f"{src['source']}-{i}", "url": f"https://example.com/repost/{i}",
+                            "text": " ".join(words)})
+                out.append(src)
+            else:
+                out.append(self.post(i))
+        return out
+
+    def queries(self, n: int) -> List[str]:
+        """Short keyword queries: mostly topic jargon, sometimes with a common word."""
+        out = []
+        for _ in range(n):
+            topic = self.rng.choices(self.topics, cum_weights=self._topic_weights)[0]
+            words = self.rng.sample(TOPICS[topic], self.rng.randint(1, 3))
+            if self.rng.random() < 0.3:
+                words.append(self.rng.choice(_COMMON))
+            out.append(" ".join(words))
+        return out
+
+
+def social_corpus(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    return CorpusGenerator(seed).posts(n)
@@ -0,0 +1,317 @@
+# backend/benchmarks/suite.py
+"""
+Offline benchmark suite with regression gates.
+
+Generates a deterministic social-media corpus (benchmarks/corpus.py), then
+measures, in a throwaway Chroma directory with the `hashing` embedding
+backend (no model download, no network):
+
+  tinyrag     TinyRAG build time and search latency percentiles
+  ingest      vectorstore.add_documents throughput (batched, as feeds do)
+  search      vectorstore.search latency percentiles (uncached queries)
+  trends      /api/trends latency (text and embeddings mode) and the time
+              the background topic model needs to absorb the corpus
+  api         end-to-end latency through the ASGI app: /api/search (vector,
+              hybrid, cached), /api/search/batch, /api/health
+
+The suite runs --repeat times, each in a fresh interpreter and Chroma
+directory; a metric's value is the median of the runs and its spread is the
+scaled median absolute deviation (a robust stddev). Results are written as
+JSON ({"meta", "metrics": {name: {value, spread, samples, unit, better}}}).
+
+With --baseline, a metric regresses when it is worse than the baseline by
+more than --tolerance and by more than --noise times the larger of the two
+spreads, so jitter on fast paths isn't flagged; the process then exits 1.
+p99s are reported but not gated in --quick mode (50 queries: p99 is the
+slowest sample).
+
+Run from backend/:
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --quick --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --quick --save-baseline benchmarks/baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+SECTIONS = ("tinyrag", "ingest", "search", "trends", "api")
+
+
+def _configure_env(workdir: str) -> None:
+    """Must run before any app module is imported: app config is read at import time."""
+    os.environ.update({
+        "CHROMA_PATH": workdir,
+        "EMBED_BACKEND": os.getenv("BENCH_EMBED_BACKEND", "hashing"),
+        "EMBED_CACHE": "off",
+        "FEED_SCHEDULER": "off",
+        "SOCIAL_SOURCES": "",
+        "RAG_EAGER_INIT": "false",
+        "TOPICS_EMBED_REFRESH_S": "0",
+    })
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    s = sorted(samples_ms)
+
+    def rank(p: float) -> float:
+        return s[min(len(s) - 1, max(0, int(round(p / 100 * len(s))) - 1))]
+
+    return {"p50": rank(50), "p95": rank(95), "p99": rank(99)}
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, value: float, unit: str = "ms", better: str = "lower") -> None:
+        self.metrics[name] = {"value": round(value, 4), "unit": unit, "better": better}
+        print(f"  {name:<38} {value:>12.3f} {unit}")
+
+    def latency(self, prefix: str, samples_ms: List[float]) -> None:
+        for p, v in percentiles(samples_ms).items():
+            self.add(f"{prefix}_{p}_ms", v)
+
+
+# ----- sections -----
+
+def bench_tinyrag(rec: Recorder, docs: List[Dict[str, Any]], queries: List[str], k: int) -> None:
+    from app.services.rag import TinyRAG
+
+    t0 = time.perf_counter()
+    rag = TinyRAG(docs)
+    build_ms = (time.perf_counter() - t0) * 1000
+    rec.add("tinyrag.build_ms", build_ms)
+    rec.add("tinyrag.build_docs_per_s", len(docs) / (build_ms / 1000), "docs/s", "higher")
+    rec.latency("tinyrag.search", [_timed(lambda q=q: rag.search(q, k)) for q in queries])
+
+
+def bench_ingest(rec: Recorder, docs: List[Dict[str, Any]], batch: int) -> None:
+    from app.services import vectorstore
+
+    vectorstore.get_collection()  # client + embedding function, outside the timing
+    lat = []
+    t0 = time.perf_counter()
+    for i in range(0, len(docs), batch):
+        lat.append(_timed(lambda b=docs[i:i + batch]: vectorstore.add_documents(b)))
+    elapsed = time.perf_counter() - t0
+    rec.add("ingest.docs_per_s", len(docs) / elapsed, "docs/s", "higher")
+    rec.add("ingest.batch_p95_ms", percentiles(lat)["p95"])
+
+
+def bench_search(rec: Recorder, queries: List[str], k: int) -> None:
+    from app.services import vectorstore
+
+    vectorstore.search("warm up", k)
+    # unique suffix so neither the query-embedding cache nor Chroma's caches help
+    rec.latency("search.vector", [_timed(lambda q=f"{q} u{i}": vectorstore.search(q, k))
+                                  for i, q in enumerate(queries)])
+
+
+def bench_trends(rec: Recorder, n_docs: int, requests: int, get: Callable[..., Any]) -> None:
+    from app.services import topics
+
+    t0 = time.perf_counter()
+    topics.start()
+    while topics.snapshot()["docs"] < n_docs * 0.9 and time.perf_counter() - t0 < 120:
+        time.sleep(0.05)  # dedup/chunking make the exact count fuzzy
+    rec.add("trends.text_catch_up_ms", (time.perf_counter() - t0) * 1000)
+    rec.add("trends.cluster_embeddings_ms", _timed(topics.cluster_embeddings))
+    get("/api/trends", mode="embeddings")  # kicks off the background refresh
+    for mode in ("text", "embeddings"):
+        rec.latency(f"trends.api_{mode}", [_timed(lambda: get("/api/trends", mode=mode)) for _ in range(requests)])
+
+
+def bench_api(rec: Recorder, app, queries: List[str], k: int) -> None:
+    from benchmarks.asgi import request
+
+    def call(method: str, path: str, params: Optional[Dict[str, Any]] = None, body: Any = None) -> None:
+        status, payload = asyncio.run(request(app, method, path, params, body))
+        if status != 200:
+            raise RuntimeError(f"{method} {path} -> {status}: {payload[:200]!r}")
+
+    rec.latency("api.health", [_timed(lambda: call("GET", "/api/health")) for _ in range(len(queries))])
+    for mode in ("vector", "hybrid"):
+        rec.latency(f"api.search_{mode}", [
+            _timed(lambda q=f"{q} {mode}{i}": call("GET", "/api/search", {"q": q, "k": k, "mode": mode, "sources": ""}))
+            for i, q in enumerate(queries)
+        ])
+    hot = queries[0]
+    call("GET", "/api/search", {"q": hot, "k": k, "sources": ""})
+    rec.latency("api.search_cached", [
+        _timed(lambda: call("GET", "/api/search", {"q": hot, "k": k, "sources": ""})) for _ in queries
+    ])
+    batches = [queries[i:i + 10] for i in range(0, len(queries), 10)]
+    rec.latency("api.search_batch10", [
+        _timed(lambda b=b, i=i: call("POST", "/api/search/batch", body={"queries": [f"{q} b{i}" for q in b], "k": k}))
+        for i, b in enumerate(batches)
+    ])
+
+
+# ----- repetitions and comparison -----
+
+def aggregate(runs: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Per metric: the median of the runs' values and their spread (1.4826 * MAD)."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, first in runs[0].items():
+        values = [r[name]["value"] for r in runs if name in r]
+        med = statistics.median(values)
+        mad = statistics.median(abs(v - med) for v in values)
+        out[name] = {**first, "value": round(med, 4), "spread": round(1.4826 * mad, 4), "samples": values}
+    return out
+
+
+def gated(name: str, quick: bool) -> bool:
+    return not (quick and name.endswith("_p99_ms"))
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, noise: float) -> List[str]:
+    """Print a diff table; return the names of regressed metrics."""
+    regressed = []
+    quick = bool(current["meta"].get("quick") or baseline["meta"].get("quick"))
+    print(f"\n{'metric':<40} {'baseline':>12} {'current':>12} {'change':>8} {'noise':>10}")
+    for name, base in sorted(baseline["metrics"].items()):
+        cur = current["metrics"].get(name)
+        if cur is None or not base["value"]:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        floor = noise * max(base.get("spread", 0.0), cur.get("spread", 0.0))
+        worse = change > tolerance if base["better"] == "lower" else change < -tolerance
+        worse = worse and abs(cur["value"] - base["value"]) > floor and gated(name, quick)
+        flag = "  REGRESSION" if worse else ("" if gated(name, quick) else "  (not gated)")
+        print(f"{name:<40} {base['value']:>12.3f} {cur['value']:>12.3f} {change:>+7.1%} {floor:>10.3f}{flag}")
+        if worse:
+            regressed.append(name)
+    return regressed
+
+
+def _repeat(args: argparse.Namespace) -> List[Dict[str, Dict[str, Any]]]:
+    """Metrics of args.repeat single runs, each in a fresh interpreter (no warm caches or shared Chroma)."""
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="bench-suite-runs-") as tmp:
+        for i in range(args.repeat):
+            out = os.path.join(tmp, f"run{i}.json")
+            print(f"\n=== run {i + 1}/{args.repeat}", flush=True)
+            subprocess.run([sys.executable, "-m", "benchmarks.suite", "--repeat", "1", "--out", out,
+                            "--docs", str(args.docs), "--queries", str(args.queries), "-k", str(args.k),
+                            "--batch", str(args.batch), "--seed", str(args.seed), "--only", *args.only],
+                           check=True)
+            with open(out, "r", encoding="utf-8") as f:
+                runs.append(json.load(f)["metrics"])
+    return runs
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=5000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--batch", type=int, default=256, help="add_documents batch size")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--quick", action="store_true", help="1000 docs / 50 queries, for CI")
+    ap.add_argument("--only", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    ap.add_argument("--out", default="bench-results.json")
+    ap.add_argument("--baseline", help="compare against this results file; exit 1 on regression")
+    ap.add_argument("--save-baseline", help="also write the results here")
+    ap.add_argument("--repeat", type=int, default=5, help="runs to take the median of")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    ap.add_argument("--noise", type=float, default=3.0,
+                    help="also require the change to exceed this many spreads (robust stddevs) of the runs")
+    args = ap.parse_args()
+    if args.quick:
+        args.docs, args.queries = 1000, 50
+
+    if args.repeat > 1:
+        metrics = aggregate(_repeat(args))
+    else:
+        metrics = _run(args)
+
+    result = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "embed_backend": os.getenv("BENCH_EMBED_BACKEND", "hashing"),
+            "docs": args.docs, "queries": args.queries, "k": args.k, "batch": args.batch, "seed": args.seed,
+            "repeat": args.repeat, "quick": args.quick,
+        },
+        "metrics": metrics,
+    }
+    for path in filter(None, (args.out, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"wrote {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if {k: baseline["meta"].get(k) for k in ("docs", "queries", "k")} != {k: result["meta"][k] for k in ("docs", "queries", "k")}:
+            print("warning: baseline was recorded with different --docs/--queries/-k")
+        if baseline["meta"].get("repeat", 1) < 3 or args.repeat < 3:
+            print("warning: fewer than 3 runs on one side: no spread, so only --tolerance filters noise")
+        regressed = compare(result, baseline, args.tolerance, args.noise)
+        print(f"\n{len(regressed)} regression(s) beyond {args.tolerance:.0%}" if regressed else "\nno regressions")
+        sys.exit(1 if regressed else 0)
+
+
+def _run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """One pass over the selected sections in this process."""
+    _configure_env(tempfile.mkdtemp(prefix="bench-suite-"))
+    from benchmarks.corpus import CorpusGenerator
+
+    gen = CorpusGenerator(args.seed)
+    docs = gen.posts(args.docs)
+    queries = gen.queries(args.queries)
+    rec = Recorder()
+
+    print(f"corpus: {len(docs)} posts, {len(queries)} queries (seed {args.seed})")
+    if "tinyrag" in args.only:
+        print("tinyrag")
+        bench_tinyrag(rec, docs, queries, args.k)
+    # everything below needs the corpus in Chroma
+    if set(args.only) & {"ingest", "search", "trends", "api"}:
+        print("ingest")
+        bench_ingest(rec, docs, args.batch)
+    if "search" in args.only:
+        print("search")
+        bench_search(rec, queries, args.k)
+    if {"trends", "api"} & set(args.only):
+        import app.main
+        from benchmarks.asgi import get
+
+        if "trends" in args.only:
+            print("trends")
+            bench_trends(rec, len(docs), min(len(queries), 100), lambda path, **p: get(app.main.app, path, **p))
+        if "api" in args.only:
+            print("api")
+            bench_api(rec, app.main.app, queries, args.k)
+    return rec.metrics
+
+
+if __name__ == "__main__":
+    main()
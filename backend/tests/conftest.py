@@ -0,0 +1,70 @@
+# backend/tests/conftest.py
+"""Offline settings for the whole suite; must run before any app module is imported."""
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+os.environ.setdefault("CHROMA_PATH", tempfile.mkdtemp(prefix="test-chroma-"))
+os.environ.setdefault("EMBED_BACKEND", "hashing")
+os.environ.setdefault("EMBED_CACHE", "off")
+os.environ.setdefault("FEED_SCHEDULER", "off")
+os.environ.setdefault("SOCIAL_SOURCES", "")
+os.environ.setdefault("CHUNK_WORDS", "5")
+os.environ.setdefault("CHUNK_OVERLAP", "1")
+
+
+class StubServer:
+    """
+    Local HTTP server for adapter tests. `routes[path](query, headers)` returns
+    (status, body, headers); body may be bytes, str or JSON-able. Every request
+    is recorded in `hits` as (path, query).
+    """
+
+    def __init__(self) -> None:
+        self.routes = {}
+        self.hits = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stub.hits.append((url.path, query))
+                route = stub.routes.get(url.path)
+                status, body, headers = route(query, dict(self.headers)) if route else (404, b"", {})
+                if not isinstance(body, (bytes, str)):
+                    body = json.dumps(body)
+                body = body.encode() if isinstance(body, str) else body
+                try:
+                    self.send_response(status)
+                    for k, v in headers.items():
+                        self.send_header(k, v)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # the client gave up (deadline tests)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
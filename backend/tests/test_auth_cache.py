@@ -0,0 +1,82 @@
+# backend/tests/test_auth_cache.py
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import jwt
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+
+from app.routes import auth_deps
+from app.services.cache import LRUTTLCache
+from benchmarks.asgi import request
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    monkeypatch.setattr(auth_deps, "_verified", LRUTTLCache(max_entries=100, ttl=0, sizer=lambda _: 0))
+    calls = []
+    real = auth_deps.decode_token
+    monkeypatch.setattr(auth_deps, "decode_token", lambda token: calls.append(token) or real(token))
+    return calls
+
+
+def test_repeat_verifies_hit_the_cache_until_the_token_expires(decodes, monkeypatch):
+    token = auth_deps.create_access_token("alice", {"scopes": ["read"]})
+    exp = jwt.decode(token, options={"verify_signature": False})["exp"]
+    monkeypatch.setattr(auth_deps, "time", SimpleNamespace(time=lambda: exp - 0.2))  # 0.2s of life left
+
+    first = auth_deps.verify_token(token)
+    first["sub"] = "mallory"  # callers get a copy
+    assert auth_deps.verify_token(token)["sub"] == "alice"
+    assert len(decodes) == 1
+    assert auth_deps.token_cache_stats()["hits"] == 1
+
+    time.sleep(0.3)
+    auth_deps.verify_token(token)
+    assert len(decodes) == 2
+
+
+def test_only_verified_tokens_with_an_exp_are_cached(decodes):
+    bad = auth_deps.create_access_token("bob")[:-2] + "xx"
+    for _ in range(2):
+        with pytest.raises(jwt.InvalidTokenError):
+            auth_deps.verify_token(bad)
+    no_exp = jwt.encode({"sub": "carol", "iss": auth_deps.JWT_ISS}, auth_deps.JWT_SECRET, algorithm=auth_deps.JWT_ALG)
+    for _ in range(2):
+        assert auth_deps.verify_token(no_exp)["sub"] == "carol"
+    assert len(decodes) == 4
+
+
+def test_current_user_dependency(decodes):
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user=Depends(auth_deps.current_user)):
+        return {"sub": user["sub"]}
+
+    token = auth_deps.create_access_token("dave")
+    expired = auth_deps.create_access_token("dave", expires_minutes=-1)
+    status, body = asyncio.run(request(app, "GET", "/me"))
+    assert status == 401 and json.loads(body)["detail"] == "Not authenticated"
+    for _ in range(3):
+        status, body = asyncio.run(request(app, "GET", "/me", headers={"Authorization": f"Bearer {token}"}))
+        assert status == 200 and json.loads(body) == {"sub": "dave"}
+    status, body = asyncio.run(request(app, "GET", "/me", headers={"Authorization": f"Bearer {expired}"}))
+    assert status == 401 and json.loads(body)["detail"] == "Token expired"
+    assert decodes == [token, expired]
+
+
+def test_password_hashing_sheds_load_when_the_queue_is_full(monkeypatch):
+    monkeypatch.setattr(auth_deps, "_hash_slots", threading.BoundedSemaphore(1))
+    assert asyncio.run(auth_deps.run_password_hashing(lambda pw: pw.upper(), "secret")) == "SECRET"
+
+    auth_deps._hash_slots.acquire()
+    try:
+        with pytest.raises(HTTPException) as info:
+            asyncio.run(auth_deps.run_password_hashing(lambda pw: pw, "secret"))
+    finally:
+        auth_deps._hash_slots.release()
+    assert info.value.status_code == 503 and info.value.headers == {"Retry-After": "1"}
@@ -0,0 +1,48 @@
+# backend/tests/test_bench_suite.py
+from collections import Counter
+
+from benchmarks.corpus import SOURCES, CorpusGenerator, social_corpus
+from benchmarks.suite import aggregate, compare
+
+
+def _run(**values):
+    return {name: {"value": v, "unit": "ms", "better": "lower"} for name, v in values.items()}
+
+
+def _result(metrics, quick=False):
+    return {"meta": {"quick": quick}, "metrics": metrics}
+
+
+def test_aggregate_takes_the_median_and_a_robust_spread():
+    runs = [_run(a_p50_ms=v) for v in (1.0, 1.1, 0.9, 1.05, 9.0)]  # one outlier run
+    m = aggregate(runs)["a_p50_ms"]
+    assert m["value"] == 1.05
+    assert 0 < m["spread"] < 0.2
+    assert m["samples"] == [1.0, 1.1, 0.9, 1.05, 9.0]
+
+
+def test_compare_ignores_changes_within_the_run_spread():
+    base = aggregate([_run(fast_p50_ms=v, slow_p50_ms=10 + v) for v in (0.10, 0.16, 0.12, 0.2, 0.11)])
+    cur = aggregate([_run(fast_p50_ms=v, slow_p50_ms=10 + v) for v in (0.17, 0.15, 0.21, 0.14, 0.18)])
+    assert compare(_result(cur), _result(base), tolerance=0.25, noise=3.0) == []
+
+    slow = aggregate([_run(fast_p50_ms=v, slow_p50_ms=20 + v) for v in (0.17, 0.15, 0.21, 0.14, 0.18)])
+    assert compare(_result(slow), _result(base), tolerance=0.25, noise=3.0) == ["slow_p50_ms"]
+
+
+def test_quick_mode_does_not_gate_p99():
+    base = _result(_run(x_p99_ms=1.0, x_p50_ms=1.0), quick=True)
+    cur = _result(_run(x_p99_ms=5.0, x_p50_ms=5.0), quick=True)
+    assert compare(cur, base, tolerance=0.25, noise=3.0) == ["x_p50_ms"]
+    assert compare(_result(cur["metrics"]), _result(base["metrics"]), 0.25, 3.0) == ["x_p50_ms", "x_p99_ms"]
+
+
+def test_synthetic_corpus_is_seeded_and_social_shaped():
+    posts = social_corpus(2000, seed=7)
+    assert posts == social_corpus(2000, seed=7) and posts != social_corpus(2000, seed=8)
+    assert len({p["id"] for p in posts}) == len(posts)
+    assert set(Counter(p["source"] for p in posts)) == set(SOURCES)
+    reposts = [p for p in posts if "/repost/" in p["url"]]
+    assert 0 < len(reposts) < 0.1 * len(posts)
+    assert all(p["text"] and p["published"].endswith("Z") for p in posts)
+    assert CorpusGenerator(7).queries(5) == CorpusGenerator(7).queries(5)
@@ -0,0 +1,82 @@
+# backend/tests/test_bulk.py
+import asyncio
+import gzip
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.bulk import BulkIngest, ingest_stream
+from benchmarks.asgi import request
+
+
+def _jsonl(records):
+    return b"".join(json.dumps(r).encode() + b"\n" for r in records)
+
+
+def _chunks(data, size=7):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+RECORDS = [{"id": f"r{i}", "text": f"record {i}"} for i in range(10)]
+BAD = b'{"id": "x"}\nnot json\n\n[1, 2]\n'
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_plain_and_gzip_parse_the_same(compress):
+    data = _jsonl(RECORDS[:6]) + BAD + _jsonl(RECORDS[6:] + [{"id": "r0", "text": "record 0 again"}])
+    if compress:  # two concatenated members, as `cat a.gz b.gz` produces
+        data = gzip.compress(data[:40]) + gzip.compress(data[40:])
+    batches = []
+    res = ingest_stream(_chunks(data), add=lambda b: batches.append(b) or len(b), batch_size=4)
+    assert res["gzip"] is compress
+    assert res["records"] == 11 and res["bad_lines"] == 3 and [e["line"] for e in res["errors"]] == [7, 8, 10]
+    assert [len(b) for b in batches] == [4, 4, 3] and res["added"] == 11
+    assert [r["text"] for b in batches for r in b][-1] == "record 0 again"
+
+
+def test_truncated_gzip_is_reported():
+    data = gzip.compress(_jsonl(RECORDS))
+    res = ingest_stream([data[:-12]], add=len)
+    assert any(e["error"] == "truncated gzip stream" for e in res["errors"])
+
+
+def test_feed_blocks_while_the_writer_is_behind():
+    release = threading.Event()
+
+    def slow_add(batch):
+        release.wait(5)
+        return len(batch)
+
+    bulk = BulkIngest(add=slow_add, batch_size=1, queue_batches=1)
+    done = threading.Event()
+    threading.Thread(target=lambda: (bulk.feed(_jsonl(RECORDS[:5])), done.set()), daemon=True).start()
+    time.sleep(0.2)
+    assert not done.is_set()  # one batch in add(), one queued: parsing waits
+    release.set()
+    assert done.wait(5)
+    res = bulk.close()
+    assert res["written"] == 5 and res["blocked_s"] > 0.1
+
+
+def test_writer_failure_aborts_the_load():
+    def broken(batch):
+        raise ValueError("disk full")
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        ingest_stream(_chunks(_jsonl(RECORDS) * 3), add=broken, batch_size=2, queue_batches=1)
+
+
+def test_bulk_endpoint_accepts_gzip_without_a_header():
+    from app.main import app
+
+    records = [{"id": f"bulk-{i}", "text": f"marmot colony {i} burrow", "source": "bulk"} for i in range(5)]
+    status, body = asyncio.run(request(app, "POST", "/api/ingest/bulk", {"batch_size": 2},
+                                       body=gzip.compress(_jsonl(records) + b"oops\n")))
+    res = json.loads(body)
+    assert status == 200 and res["gzip"] and res["records"] == 5 and res["bad_lines"] == 1
+    assert res["batches"] == 3 and res["added"] == 5
+
+    status, _ = asyncio.run(request(app, "POST", "/api/ingest/bulk", {"batch_size": 0}, body=b""))
+    assert status == 422
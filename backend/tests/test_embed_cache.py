@@ -0,0 +1,52 @@
+# backend/tests/test_embed_cache.py
+import itertools
+
+import numpy as np
+
+from app.services import embed_cache
+from app.services.embed_cache import EmbeddingCache
+
+
+class _Model:
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, texts):
+        self.seen.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_only_unseen_texts_reach_the_model(tmp_path):
+    model = _Model()
+    cache = EmbeddingCache(str(tmp_path / "c.sqlite3"), "m1")
+    vecs = cache.embed(["a", "bb", "a"], model)
+    assert model.seen == ["a", "bb"]
+    assert [v.tolist() for v in vecs] == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert all(v.dtype == np.float32 for v in vecs)
+
+    cache.embed(["bb", "ccc"], model)
+    assert model.seen == ["a", "bb", "ccc"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 4
+    cache.close()
+
+    # persisted across restarts, but keyed by model
+    reopened = EmbeddingCache(str(tmp_path / "c.sqlite3"), "m1")
+    reopened.embed(["a", "ccc"], model)
+    EmbeddingCache(str(tmp_path / "c.sqlite3"), "m2").embed(["a"], model)
+    assert model.seen == ["a", "bb", "ccc", "a"]
+
+
+def test_least_recently_used_rows_are_evicted(tmp_path, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(embed_cache.time, "time", lambda: float(next(clock)))
+    model = _Model()
+    cache = EmbeddingCache(str(tmp_path / "c.sqlite3"), "m", max_entries=10)
+    for i in range(10):
+        cache.embed([f"t{i}"], model)
+    cache.embed(["t0"], model)  # touch t0 so t1 is now the oldest
+    cache.embed(["t10"], model)  # over the limit: evict down to 9 rows
+    assert cache.stats()["entries"] == 9 and cache.evictions == 2
+
+    model.seen.clear()
+    cache.embed(["t0", "t1", "t2", "t3"], model)
+    assert model.seen == ["t1", "t2"]
@@ -0,0 +1,79 @@
+# backend/tests/test_embeddings.py
+import sys
+
+import numpy as np
+import pytest
+
+from app.services import embeddings
+from app.services.embeddings import (
+    HashingEmbeddingFunction, OnnxEmbeddingFunction, backend_key, make_embedding_function,
+)
+
+VOCAB = ["[UNK]", "rust", "python", "release", "compiler", "video", "feed"]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """A tiny ONNX 'transformer' (token states = embedding lookup) and its tokenizer.json."""
+    onnx = pytest.importorskip("onnx")
+    tokenizers = pytest.importorskip("tokenizers")
+    from onnx import TensorProto, helper, numpy_helper
+
+    out = tmp_path_factory.mktemp("onnx-model")
+    table = np.random.default_rng(0).standard_normal((len(VOCAB), 16)).astype(np.float32)
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["table", "input_ids"], ["last_hidden_state"])],
+        "tiny",
+        [helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["b", "t"]),
+         helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["b", "t"])],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["b", "t", 16])],
+        [numpy_helper.from_array(table, "table")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)], ir_version=8)
+    onnx.save(model, str(out / "model.onnx"))
+
+    tok = tokenizers.Tokenizer(tokenizers.models.WordLevel({w: i for i, w in enumerate(VOCAB)}, unk_token="[UNK]"))
+    tok.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tok.save(str(out / "tokenizer.json"))
+    return out, table
+
+
+def _reference(table, text):
+    ids = [VOCAB.index(w) if w in VOCAB else 0 for w in text.split()]
+    v = table[ids].mean(0)
+    return v / np.linalg.norm(v)
+
+
+def test_backend_selection_and_cache_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, "EMBED_ONNX_DIR", str(tmp_path))
+    assert isinstance(make_embedding_function("m", backend="hashing"), HashingEmbeddingFunction)
+    int8, fp32 = make_embedding_function("m", backend="onnx"), make_embedding_function("m", backend="onnx-fp32")
+    assert isinstance(int8, OnnxEmbeddingFunction) and int8.quantized and not fp32.quantized
+    with pytest.raises(ValueError, match="hashing"):
+        make_embedding_function("m", backend="tpu")
+    keys = {backend_key("m", b) for b in embeddings.BACKENDS}
+    assert len(keys) == len(embeddings.BACKENDS) and backend_key("m", "sentence-transformers") == "m"
+
+
+def test_missing_onnxruntime_names_the_extra(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "onnxruntime", None)
+    with pytest.raises(ImportError, match="onnx` extra"):
+        OnnxEmbeddingFunction(str(tmp_path), quantized=False)(["text"])
+
+
+def test_length_sorted_batches_match_single_texts(model_dir):
+    path, table = model_dir
+    ef = OnnxEmbeddingFunction(str(path), quantized=False, batch_size=2, threads=1)
+    texts = ["rust compiler release", "video", "python feed video rust compiler", "unknown words", "feed"]
+    out = np.stack(ef(texts))
+    assert np.allclose(out, [_reference(table, t) for t in texts], atol=1e-5)
+    assert np.allclose(out[2], ef([texts[2]])[0], atol=1e-6)
+
+
+def test_int8_model_is_built_once_and_stays_close(model_dir):
+    path, table = model_dir
+    ef = OnnxEmbeddingFunction(str(path), quantized=True)
+    vecs = np.stack(ef(["rust compiler", "python video feed"]))
+    assert (path / "model_int8.onnx").exists()
+    cos = (vecs * [_reference(table, t) for t in ["rust compiler", "python video feed"]]).sum(1)
+    assert (cos > 0.99).all()
@@ -0,0 +1,72 @@
+# backend/tests/test_federated.py
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.services import federated, reddit, youtube
+from benchmarks.asgi import request
+
+
+def _reddit_listing(query, headers):
+    if query["q"].startswith("slow"):
+        time.sleep(1.0)
+    post = {"title": f"post about {query['q']}", "permalink": "/r/test/1", "subreddit": "test"}
+    return 200, {"data": {"children": [{"data": post}]}}, {}
+
+
+def _youtube_fails(query, headers):
+    return 500, {"error": "boom"}, {}
+
+
+@pytest.fixture
+def stubbed(stub_server, monkeypatch):
+    stub_server.routes = {"/reddit": _reddit_listing, "/youtube": _youtube_fails}
+    monkeypatch.setattr(reddit, "_BASE", stub_server.url + "/reddit")
+    monkeypatch.setattr(youtube, "_API", stub_server.url + "/youtube")
+    monkeypatch.setattr(youtube, "_API_KEY", "test-key")
+    return stub_server
+
+
+def test_plain_search_stays_local(stubbed):
+    from app.main import app
+
+    status, body = asyncio.run(request(app, "GET", "/api/search", {"q": "local only query"}))
+    assert status == 200
+    assert json.loads(body)["sources"] == {}
+    assert stubbed.hits == []
+
+    status, body = asyncio.run(request(app, "GET", "/api/search", {"q": "opt in query", "sources": "reddit"}))
+    payload = json.loads(body)
+    assert payload["sources"]["reddit"][0]["title"] == "post about opt in query"
+    assert payload["source_timings"]["reddit"]["status"] == "ok"
+
+
+def test_failing_source_gives_partial_results(stubbed):
+    res = federated.federated_search("partial query", sources=["reddit", "youtube"], deadline_ms=2000)
+    assert res["partial"] is True
+    assert [d["title"] for d in res["results"]["reddit"]] == ["post about partial query"]
+    assert res["results"]["youtube"] == []
+    assert res["timings"]["youtube"] == {"status": "error", "error": "HTTP 500"}
+    assert "test-key" not in json.dumps(res)
+
+
+def test_deadline_returns_without_the_slow_source(stubbed):
+    t0 = time.monotonic()
+    res = federated.federated_search("slow query", sources=["reddit", "youtube"], deadline_ms=200)
+    assert time.monotonic() - t0 < 0.8
+    assert res["timings"]["reddit"] == {"status": "timeout"}
+    assert res["timings"]["youtube"]["status"] == "error"
+    assert res["partial"] is True and res["results"]["reddit"] == []
+
+
+def test_fan_out_is_opt_in_by_default(monkeypatch):
+    import importlib
+
+    monkeypatch.delenv("SOCIAL_SOURCES", raising=False)
+    try:
+        assert importlib.reload(federated).SOCIAL_SOURCES == []
+    finally:
+        monkeypatch.undo()
+        importlib.reload(federated)
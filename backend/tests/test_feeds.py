@@ -0,0 +1,49 @@
+# backend/tests/test_feeds.py
+import asyncio
+
+from app.services import preprocess
+from app.services.feeds import ingest_feeds
+from benchmarks.asgi import request
+
+LONG = "quokka marsupials thrive on rottnest island eating grasses leaves and stems"
+
+
+def _rss(entries):
+    items = "".join(f"<item><title>{t}</title><link>{link}</link><description>{t}</description></item>"
+                    for link, t in entries)
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{items}</channel></rss>'
+
+
+def _feed(entries, etag):
+    def route(query, headers):
+        if headers.get("If-None-Match") == etag:
+            return 304, b"", {}
+        return 200, _rss(entries), {"ETag": etag, "Content-Type": "application/rss+xml"}
+    return route
+
+
+def test_by_feed_counts_rows_written_and_304s_are_skipped(stub_server):
+    a, b = stub_server.url + "/a.xml", stub_server.url + "/b.xml"
+    stub_server.routes = {
+        "/a.xml": _feed([("https://a/1", "axolotl regrows limbs"), ("https://a/2", LONG)], '"a1"'),
+        # the first entry repeats feed a's text under another link: dropped as a near-duplicate
+        "/b.xml": _feed([("https://b/1", "axolotl regrows limbs"), ("https://b/2", "narwhal tusk sensors")], '"b1"'),
+    }
+    events = []
+
+    first = ingest_feeds([a], progress=events.append)
+    assert first["by_feed"] == {a: 1 + len(preprocess.chunk_text(LONG))} and first["added"] == first["by_feed"][a]
+    assert [e["by_feed"] for e in events if e["type"] == "batch"] == [first["by_feed"]]
+
+    second = ingest_feeds([a, b])
+    assert second["skipped_304"] == 1
+    assert second["by_feed"] == {a: 0, b: 1} and second["added"] == 1
+
+
+def test_non_numeric_ingest_params_are_rejected():
+    from app.main import app
+
+    for path in ("/api/ingest/rss", "/api/ingest/rss/stream"):
+        for body in ({"feeds": [], "workers": "many"}, {"feeds": [], "batch_size": "big"}, {"feeds": [], "batch_size": 0}):
+            status, payload = asyncio.run(request(app, "POST", path, body=body))
+            assert status == 422, (path, body, payload)
@@ -0,0 +1,62 @@
+# backend/tests/test_hybrid.py
+import threading
+import time
+
+import pytest
+
+from app.services import hybrid
+
+
+def _hits(*ids):
+    return [{"id": i, "text": i, "score": 1.0, "meta": {}} for i in ids]
+
+
+def test_rrf_weights_and_ranks():
+    ranked = {"vector": _hits("a", "b", "c"), "lexical": _hits("c", "d")}
+    fused = hybrid.rrf(ranked, {"vector": 1.0, "lexical": 1.0}, k=4, rrf_k=60)
+    assert [d["id"] for d in fused] == ["c", "a", "b", "d"]
+    assert fused[0]["ranks"] == {"vector": 3, "lexical": 1}
+    assert fused[0]["score"] == pytest.approx(1 / 63 + 1 / 61, abs=1e-6)
+
+    lexical_heavy = hybrid.rrf(ranked, {"vector": 0.1, "lexical": 2.0}, k=2, rrf_k=60)
+    assert [d["id"] for d in lexical_heavy] == ["c", "d"]
+
+
+@pytest.fixture
+def retrievers(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def fast(query, k, where=None):
+        calls.append(("fast", where))
+        return _hits("f1", "f2")
+
+    def slow(query, k, where=None):
+        calls.append(("slow", where))
+        release.wait(2)
+        return _hits("s1")
+
+    def broken(query, k, where=None):
+        raise RuntimeError("index offline")
+
+    monkeypatch.setattr(hybrid, "RETRIEVERS", {"fast": fast, "slow": slow, "broken": broken})
+    yield calls
+    release.set()
+
+
+def test_slow_and_failing_retrievers_degrade_instead_of_stalling(retrievers):
+    t0 = time.monotonic()
+    res = hybrid.hybrid_search("q", k=5, deadline_ms=100, where={"source": "rss"})
+    assert time.monotonic() - t0 < 1.0
+    assert [d["id"] for d in res["results"]] == ["f1", "f2"]
+    assert res["degraded"] is True
+    assert res["retrievers"]["slow"] == {"status": "timeout"}
+    assert res["retrievers"]["broken"] == {"status": "error", "error": "index offline"}
+    assert res["retrievers"]["fast"]["status"] == "ok" and res["retrievers"]["fast"]["count"] == 2
+    assert sorted(retrievers) == [("fast", {"source": "rss"}), ("slow", {"source": "rss"})]
+
+
+def test_zero_weight_retrievers_are_not_run(retrievers):
+    res = hybrid.hybrid_search("q", k=5, weights={"slow": 0, "broken": 0}, deadline_ms=1000)
+    assert res["degraded"] is False and list(res["retrievers"]) == ["fast"]
+    assert retrievers == [("fast", None)]
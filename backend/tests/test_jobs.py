@@ -0,0 +1,72 @@
+# backend/tests/test_jobs.py
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.services import jobs
+from benchmarks.asgi import request
+
+RSS = ('<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+       '<item><title>wombat burrows are cubic</title><link>https://w/1</link></item>'
+       '<item><title>pangolin scales are keratin</title><link>https://w/2</link></item></channel></rss>')
+
+
+def test_queued_job_reports_per_feed_progress(stub_server):
+    from app.main import app
+
+    stub_server.routes = {"/ok.xml": lambda q, h: (200, RSS, {}), "/down.xml": lambda q, h: (503, b"", {})}
+    feeds = [stub_server.url + "/ok.xml", stub_server.url + "/down.xml"]
+    status, body = asyncio.run(request(app, "POST", "/api/ingest/rss", body={"feeds": feeds}))
+    assert status == 200
+    job_id = json.loads(body)["job_id"]
+
+    deadline = time.monotonic() + 10
+    while True:
+        status, body = asyncio.run(request(app, "GET", f"/api/ingest/jobs/{job_id}"))
+        job = json.loads(body)
+        if job["status"] in {"done", "failed"} or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert job["status"] == "done" and job["added"] == 2
+    assert job["feeds"][feeds[0]]["status"] == "fetched" and job["feeds"][feeds[0]]["added"] == 2
+    assert job["feeds"][feeds[1]]["status"] == "error" and job["feeds"][feeds[1]]["error"] == "HTTP 503"
+    assert job_id in [j["id"] for j in jobs.list_jobs()]
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "FEED_REGISTRY_PATH", str(tmp_path / "registry.json"))
+    monkeypatch.setattr(jobs, "_registry", None)
+    monkeypatch.setattr(jobs, "FEED_POLL_JITTER", 0.0)
+    monkeypatch.setattr(jobs, "FEED_MAX_BACKOFF_S", 1000.0)
+    now = [1000.0]
+    monkeypatch.setattr(jobs, "_now", lambda: now[0])
+    submitted = []
+    monkeypatch.setattr(jobs, "submit_feeds", lambda feeds, **kw: submitted.append(feeds))
+    return now, submitted
+
+
+def _finish(url, status, job_status="done"):
+    jobs._reschedule({"status": job_status, "feeds": {url: {"status": status}}})
+    return jobs.registered_feeds()[url]
+
+
+def test_scheduler_backs_off_failing_feeds_and_resets_on_success(registry):
+    now, submitted = registry
+    jobs.register_feeds(["https://f"], interval_s=100)
+    jobs._tick()
+    jobs._tick()  # still running: not submitted twice
+    assert submitted == [["https://f"]]
+
+    assert [_finish("https://f", "error")["next_at"] - now[0] for _ in range(4)] == [200, 400, 800, 1000]
+    assert _finish("https://f", "fetched", job_status="failed")["failures"] == 5
+    entry = _finish("https://f", "skipped")
+    assert entry["failures"] == 0 and entry["next_at"] == now[0] + 100 and not entry["running"]
+
+    now[0] += 100
+    jobs._tick()
+    assert submitted == [["https://f"], ["https://f"]]
+    with open(jobs.FEED_REGISTRY_PATH, encoding="utf-8") as f:
+        assert json.load(f)["https://f"]["running"] is True
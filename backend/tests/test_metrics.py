@@ -0,0 +1,49 @@
+# backend/tests/test_metrics.py
+import asyncio
+import re
+
+import pytest
+
+from app.services.metrics import Counter, Histogram, render, span
+from benchmarks.asgi import request
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("t_seconds", "test.", buckets=(0.1, 1.0))
+    for s in (0.05, 0.5, 0.5, 3.0):
+        h.observe(s, route="/x")
+    lines = h.render()
+    assert 't_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 't_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 't_seconds_count{route="/x"} 4' in lines and 't_seconds_sum{route="/x"} 4.050000' in lines
+
+    c = Counter("t_total", "test.")
+    c.inc(route='a"b')
+    assert c.render()[-1] == 't_total{route="a\\"b"} 1'
+
+
+def test_spans_count_errors():
+    with pytest.raises(ValueError):
+        with span("test.failing", stage="x"):
+            raise ValueError("boom")
+    text = render()
+    assert 'span_errors_total{span="test.failing",stage="x"} 1' in text
+    assert 'span_duration_seconds_count{span="test.failing",stage="x"} 1' in text
+
+
+def test_metrics_endpoint_labels_routes_by_template():
+    from app.main import app
+
+    asyncio.run(request(app, "GET", "/api/ingest/jobs/nope-123"))
+    asyncio.run(request(app, "GET", "/api/search", {"q": "metrics probe"}))
+    status, body = asyncio.run(request(app, "GET", "/api/metrics"))
+    text = body.decode()
+    assert status == 200
+    assert re.search(r'http_request_duration_seconds_count\{method="GET",route="/api/ingest/jobs/\{job_id\}",'
+                     r'status="404"\} \d+', text)
+    assert "nope-123" not in text
+    assert re.search(r'span_duration_seconds_count\{mode="vector",span="search.local"\} \d+', text)
+    assert "# TYPE ingest_generation gauge" in text and "# TYPE process_resident_memory_mb gauge" in text
+    for line in text.splitlines():
+        assert line.startswith("#") or re.fullmatch(r'[a-zA-Z_:][\w:]*(\{.*\})? -?[\d.e+-]+|.* [+-]?Inf', line), line
@@ -0,0 +1,98 @@
+# backend/tests/test_outbound.py
+import threading
+import time
+
+import pytest
+import requests
+
+from app.services.outbound import CoalescedTimeout, Outbound, RateLimited, TokenBucket
+
+
+def _counting(value="ok"):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return value
+
+    return fn, calls
+
+
+def test_query_text_is_normalized_but_other_params_are_not():
+    out = Outbound({}, ttl=60, max_entries=100)
+    fn, calls = _counting()
+    out.call("reddit", {"q": "Rust  Release"}, fn)
+    out.call("reddit", {"q": "rust release"}, fn)
+    assert len(calls) == 1
+
+    for url in ("https://example.com/Feed.xml", "https://example.com/feed.xml"):
+        out.call("rss", {"url": url}, fn)
+    for etag in ('"AbC"', '"abc"', '"abc" '):
+        out.call("rss", {"url": "https://example.com/feed.xml", "If-None-Match": etag}, fn)
+    assert len(calls) == 1 + 2 + 3
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    out = Outbound({}, ttl=60, max_entries=100)
+    started = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return ["item"]
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(out.call("youtube", {"q": "x"}, slow, cache=False)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(out.call("youtube", {"q": "x"}, slow, cache=False)))
+                 for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join()
+    assert results == [["item"]] * 5 and len(calls) == 1
+    assert out.metrics()["sources"]["youtube"]["coalesced"] == 4
+
+
+def test_follower_timeout_is_a_requests_timeout():
+    out = Outbound({}, ttl=60, max_entries=100)
+    started, release = threading.Event(), threading.Event()
+
+    def stuck():
+        started.set()
+        release.wait()
+        return []
+
+    leader = threading.Thread(target=lambda: out.call("reddit", {"q": "y"}, stuck, cache=False))
+    leader.start()
+    started.wait()
+    with pytest.raises(requests.Timeout) as info:
+        out.call("reddit", {"q": "y"}, stuck, timeout=0.05, cache=False)
+    assert isinstance(info.value, CoalescedTimeout)
+    release.set()
+    leader.join()
+
+
+def test_token_bucket_limits_and_penalizes():
+    bucket = TokenBucket(rate=1000, burst=2)
+    assert bucket.acquire(0) and bucket.acquire(0)
+    assert bucket.acquire(0.05)  # refills at 1000/s
+
+    slow = TokenBucket(rate=0.1, burst=1)
+    assert slow.acquire(0)
+    assert not slow.acquire(0.01)
+
+    out = Outbound({"reddit": slow}, ttl=60, max_entries=100)
+    fn, calls = _counting()
+    with pytest.raises(RateLimited):
+        out.call("reddit", {"q": "z"}, fn, timeout=0.01)
+    assert calls == [] and out.metrics()["sources"]["reddit"]["rate_limited"] == 1
+
+    fast = TokenBucket(rate=1000, burst=5)
+    fast.penalize(0.2)
+    t0 = time.monotonic()
+    assert fast.acquire(1.0)
+    assert time.monotonic() - t0 >= 0.15
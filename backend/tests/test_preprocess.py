@@ -0,0 +1,43 @@
+# backend/tests/test_preprocess.py
+from app.services.preprocess import SimHashIndex, simhash
+
+
+def test_non_latin_posts_are_not_near_duplicates():
+    index = SimHashIndex(max_distance=3)
+    posts = {"ja": "日本語のテキストです", "zh": "全く別の内容の投稿", "emoji": "🔥🔥🔥", "emoji2": "🎉🎉"}
+    for rid, text in posts.items():
+        assert index.check_and_add(rid, text) is None, rid
+
+
+def test_identical_non_latin_posts_still_dedupe():
+    index = SimHashIndex(max_distance=3)
+    assert index.check_and_add("a", "日本語のテキストです") is None
+    assert index.check_and_add("b", "日本語のテキストです") == "a"
+    assert index.check_and_add("c", "🔥🔥🔥") is None
+    assert index.check_and_add("d", " 🔥🔥🔥 ") == "c"
+
+
+def test_simhash_tokenizes_unicode_words():
+    assert simhash("café crème brûlée") != simhash("")
+    assert simhash("Ünïcödé words here") == simhash("ünïcödé WORDS here")
+
+
+def _reference_simhash(text, shingle=3):
+    import hashlib
+    import re
+
+    toks = [t.lower() for t in re.findall(r"\w+", text)]
+    grams = [" ".join(toks[i:i + shingle]) for i in range(max(1, len(toks) - shingle + 1))]
+    acc = [0] * 64
+    for g in grams:
+        h = int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            acc[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if acc[bit] > 0)
+
+
+def test_vectorized_simhash_matches_the_bitwise_definition():
+    texts = ["one", "two words", "the quick brown fox jumps over the lazy dog " * 40,
+             "Ünïcödé words here and there", "a b a b a b"]
+    for text in texts:
+        assert simhash(text) == _reference_simhash(text), text
@@ -0,0 +1,51 @@
+# backend/tests/test_query_embed.py
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.query_embed import QueryEncoder
+
+
+class _Model:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(t)), 0.0] for t in texts]
+
+
+def test_repeated_queries_are_served_from_the_cache():
+    model = _Model()
+    enc = QueryEncoder(model, window_ms=0, cache_size=2)
+    assert enc.encode("abc").tolist() == [3.0, 0.0]
+    enc.encode("abc")
+    assert [v.tolist() for v in enc.encode_many(["abc", "de", "de", "f"])] == [[3, 0], [2, 0], [2, 0], [1, 0]]
+    assert model.batches == [["abc"], ["de", "f"]]
+    assert enc.stats()["cache"]["hits"] == 2 and enc.stats()["cache"]["evictions"] == 1
+
+
+def test_concurrent_misses_share_one_model_call():
+    model = _Model()
+    enc = QueryEncoder(model, window_ms=200, max_batch=8)
+    out = {}
+    threads = [threading.Thread(target=lambda t=t: out.__setitem__(t, enc.encode(t))) for t in ("a", "bb", "ccc", "a")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(model.batches) == 1 and sorted(model.batches[0]) == ["a", "bb", "ccc"]
+    assert {t: v.tolist() for t, v in out.items()} == {"a": [1, 0], "bb": [2, 0], "ccc": [3, 0]}
+    assert enc.stats()["batches"] == 1 and enc.stats()["avg_batch"] == 4
+
+
+def test_a_failed_batch_fails_every_waiting_caller():
+    def boom(texts):
+        raise RuntimeError("model unavailable")
+
+    enc = QueryEncoder(boom, window_ms=1)
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        enc.encode("x")
+    assert enc.cache.get("x") is None
+    assert isinstance(QueryEncoder(_Model(), window_ms=1).encode("ok"), np.ndarray)
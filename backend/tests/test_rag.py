@@ -0,0 +1,68 @@
+# backend/tests/test_rag.py
+import random
+
+import pytest
+
+from app.services.rag import ReweightPolicy, TinyRAG, load_default_corpus, tokenize
+
+WORDS = "rust python release compiler model vector search feed video thread cache index".split()
+
+
+def _corpus(n: int = 400, seed: int = 0):
+    rnd = random.Random(seed)
+    return [{"id": f"d{i}", "text": " ".join(rnd.choices(WORDS, k=rnd.randint(1, 12)))} for i in range(n)]
+
+
+def _brute_force(rag: TinyRAG, query: str, k: int):
+    """The original full scan: cosine against every doc vector, ties broken by highest index."""
+    qv = rag._tfidf(tokenize(query))
+    scored = sorted(((rag._cos(qv, dv), i) for i, dv in enumerate(rag.doc_vecs)), reverse=True)
+    return [(rag.docs[i]["id"], round(s, 4)) for s, i in scored[:k]]
+
+
+@pytest.mark.parametrize("query", ["rust compiler", "video video cache", "search", "nothing in common", ""])
+@pytest.mark.parametrize("k", [1, 5, 50, 1000])
+def test_inverted_index_matches_the_full_scan(query, k):
+    rag = TinyRAG(_corpus())
+    assert [(d["id"], d["score"]) for d in rag.search(query, k=k)] == _brute_force(rag, query, k)
+
+
+def test_sample_corpus_ranks_the_rag_intro_first():
+    res = TinyRAG(load_default_corpus()).search("retrieval augmented generation", k=2)
+    assert res[0]["url"] == "https://example.com/rag-intro" and res[0]["score"] > res[1]["score"]
+
+
+def _ranked(rag, query, k=20):
+    return [(d["id"], d["score"]) for d in rag.search(query, k=k)]
+
+
+def test_incremental_updates_match_a_rebuild_after_reweight():
+    docs = _corpus(300)
+    rag = TinyRAG(docs[:200], policy=ReweightPolicy(drift_ratio=0))
+    rag.add(docs[200:])
+    rag.upsert([{"id": "d5", "text": "zebra crossing"}, {"id": "new", "text": "zebra rust"}])
+    assert rag.remove(["d7", "d8", "missing"]) == 2
+    with pytest.raises(ValueError):
+        rag.add([{"id": "d9", "text": "again"}])
+
+    assert sorted(d["id"] for d in rag.search("zebra", k=5, pad=False)) == ["d5", "new"]
+    assert all(d["id"] not in {"d7", "d8"} for d in rag.search("rust python", k=300))
+
+    rag.reweight()
+    live = [d for d in docs if d["id"] not in {"d5", "d7", "d8"}]
+    live += [{"id": "d5", "text": "zebra crossing"}, {"id": "new", "text": "zebra rust"}]
+    fresh = TinyRAG(live)
+    for q in ("rust compiler", "zebra", "cache index feed"):
+        assert _ranked(rag, q) == _ranked(fresh, q)
+    assert rag.stats()["docs"] == fresh.N == 299
+
+
+def test_drift_ratio_triggers_a_full_reweight():
+    docs = _corpus(110)
+    rag = TinyRAG(docs[:100], policy=ReweightPolicy(drift_ratio=0.1, background=False))
+    rag.add(docs[100:105])
+    assert rag.stats()["changes_since_reweight"] == 5
+    rag.add(docs[105:])
+    stats = rag.stats()
+    assert stats["changes_since_reweight"] == 0 and not stats["reweighting"]
+    assert _ranked(rag, "rust video") == _ranked(TinyRAG(docs), "rust video")
@@ -0,0 +1,111 @@
+# backend/tests/test_rag_compact.py
+import numpy as np
+import pytest
+
+from app.services import shared_index
+from app.services.rag import CompactTinyRAG, ReweightPolicy, TinyRAG
+
+SOURCES = ["rss", "reddit", "youtube", None]
+
+
+def _docs(n: int = 300):
+    out = []
+    for i in range(n):
+        d = {"id": f"d{i}", "text": f"python release notes {i % 7} topic{i % 11}", "lang": "en" if i % 2 else "de"}
+        if SOURCES[i % 4]:
+            d["source"] = SOURCES[i % 4]
+        if i % 5:
+            d["published_ts"] = 1000.0 + i
+        out.append(d)
+    return out
+
+
+WHERES = [
+    {"source": "reddit"},
+    {"source": {"$in": ["rss", "youtube"]}},
+    {"source": {"$ne": "rss"}},
+    {"source": {"$nin": ["rss", "nope"]}},
+    {"published_ts": {"$gte": 1100.0}},
+    {"$and": [{"source": "rss"}, {"published_ts": {"$lt": 1200.0}}]},
+    {"$or": [{"source": "youtube"}, {"published_ts": {"$lte": 1010}}]},
+    {"source": "never-stored"},
+    {"lang": "de"},  # not a column: falls back to decoding
+    {"$and": [{"source": "reddit"}, {"lang": "en"}]},
+]
+
+
+def _ranked(rag, query, k=25):
+    return [(d["id"], d["score"]) for d in rag.search(query, k=k)]
+
+
+def test_compact_layout_scores_like_the_dict_layout():
+    docs = _docs(400)
+    policy = ReweightPolicy(drift_ratio=0)
+    compact, plain = CompactTinyRAG(docs[:300], policy=policy), TinyRAG(docs[:300], policy=policy)
+    queries = ("python topic3", "release notes 5", "nothing here", "topic10 topic10 python")
+    for q in queries:
+        assert _ranked(compact, q) == _ranked(plain, q)
+    for rag in (compact, plain):
+        rag.add(docs[300:])  # into the delta until the next re-weight
+        rag.upsert([{"id": "d1", "text": "fresh zebra topic3", "source": "rss"}])
+        rag.remove(["d2", "d350"])
+    for q in queries + ("zebra",):
+        assert _ranked(compact, q) == _ranked(plain, q)
+    assert compact.stats()["delta_terms"] > 0
+
+    compact.reweight()
+    plain.reweight()
+    assert compact.stats()["delta_terms"] == 0 and compact.stats()["docs"] == plain.N == 398
+    for q in queries + ("zebra",):
+        assert _ranked(compact, q) == _ranked(plain, q)
+    assert compact.search("zebra", k=1) == plain.search("zebra", k=1)
+    assert compact.search("zebra", k=1)[0]["text"] == "fresh zebra topic3"
+    assert compact.memory()["total"] < plain.memory()["total"] / 3
+
+
+@pytest.mark.parametrize("where", WHERES)
+@pytest.mark.parametrize("pad", [True, False])
+def test_where_matches_the_per_doc_filter(where, pad):
+    docs = _docs()
+    compact, plain = CompactTinyRAG(docs), TinyRAG(docs)
+    for rag in (compact, plain):
+        rag.upsert([{"id": "new", "text": "python topic3 fresh", "source": "reddit", "published_ts": 5000.0}])
+        rag.remove(["d3", "d8"])
+    for q in ("python topic3", "unmatched words"):
+        got = [(d["id"], d["score"]) for d in compact.search(q, k=15, where=where, pad=pad)]
+        want = [(d["id"], d["score"]) for d in plain.search(q, k=15, where=where, pad=pad)]
+        assert got == want, (q, where)
+
+
+def test_column_filters_decode_only_the_returned_docs(monkeypatch):
+    rag = CompactTinyRAG(_docs(2000))
+    decoded = []
+    real = rag._doc
+    monkeypatch.setattr(rag, "_doc", lambda idx: decoded.append(idx) or real(idx))
+    res = rag.search("python", k=5, where={"$and": [{"source": "youtube"}, {"published_ts": {"$gte": 1500.0}}]})
+    assert len(res) == 5 and all(d["source"] == "youtube" and d["published_ts"] >= 1500 for d in res)
+    assert len(decoded) == 5
+
+
+def test_mapped_index_filters_on_stored_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_index, "SHARED_INDEX_DIR", str(tmp_path))
+    docs = _docs(500)
+    vecs = np.random.default_rng(0).standard_normal((len(docs), 8)).astype(np.float32)
+    page = ([d["id"] for d in docs], [d["text"] for d in docs],
+            [{k: v for k, v in d.items() if k not in {"id", "text"}} for d in docs], vecs)
+    manifest = shared_index.publish_pages([page], len(docs), "test")
+    lex = shared_index.MappedTinyRAG(str(tmp_path / manifest["version"]))
+    dense = shared_index.MappedDense(str(tmp_path / manifest["version"]), lex)
+    where = {"source": {"$in": ["reddit", "youtube"]}, "published_ts": {"$lt": 1300.0}}
+
+    want = [d["id"] for d in CompactTinyRAG(docs).search("python topic4", k=10, where=where)]
+    assert [d["id"] for d in lex.search("python topic4", k=10, where=where)] == want
+
+    decoded = []
+    real = lex._doc
+    monkeypatch.setattr(lex, "_doc", lambda idx: decoded.append(idx) or real(idx))
+    hits = dense.search([vecs[7]], 10, where)[0]
+    assert len(hits) == 10 and len(decoded) == 10
+    assert all(h["meta"]["source"] in {"reddit", "youtube"} and h["meta"]["published_ts"] < 1300 for h in hits)
+    ok = [i for i, d in enumerate(docs) if d.get("source") in {"reddit", "youtube"} and d.get("published_ts", 1e9) < 1300]
+    assert hits[0]["id"] == docs[max(ok, key=lambda i: float(vecs[i] @ vecs[7] / np.linalg.norm(vecs[i])))]["id"]
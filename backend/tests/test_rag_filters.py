@@ -0,0 +1,34 @@
+# backend/tests/test_rag_filters.py
+import pytest
+
+from app.services.rag import CompactTinyRAG, TinyRAG
+
+
+def _corpus(n: int = 200):
+    docs = [{"id": f"d{i}", "text": f"filler words number {i}", "source": "rss"} for i in range(n)]
+    docs += [{"id": "hit1", "text": "rust compiler release", "source": "reddit"},
+             {"id": "hit2", "text": "rust borrow checker", "source": "rss"}]
+    return docs
+
+
+@pytest.mark.parametrize("cls", [TinyRAG, CompactTinyRAG])
+def test_unpadded_filtered_search_only_checks_matching_docs(cls):
+    rag = cls(_corpus())
+    seen = []
+
+    def keep(d):
+        seen.append(d["id"])
+        return d["source"] == "reddit"
+
+    res = rag.search("rust", k=10, keep=keep, pad=False)
+    assert [d["id"] for d in res] == ["hit1"]
+    assert sorted(seen) == ["hit1", "hit2"]
+
+
+@pytest.mark.parametrize("cls", [TinyRAG, CompactTinyRAG])
+def test_padded_search_still_fills_k(cls):
+    rag = cls(_corpus())
+    res = rag.search("rust", k=5)
+    assert len(res) == 5
+    assert [d["score"] > 0 for d in res] == [True, True, False, False, False]
+    assert len(rag.search("nothing matches this", k=3, pad=False)) == 0
@@ -0,0 +1,54 @@
+# backend/tests/test_search_batch.py
+import asyncio
+import json
+
+import pytest
+
+from app.services import vectorstore
+from benchmarks.asgi import request
+
+
+@pytest.fixture(scope="module")
+def app():
+    from app.main import app
+
+    vectorstore.add_documents([
+        {"id": "batch-1", "text": "capybara grazing river bank", "source": "rss"},
+        {"id": "batch-2", "text": "tapir snout forest floor", "source": "reddit"},
+    ])
+    return app
+
+
+def _post(app, body):
+    status, payload = asyncio.run(request(app, "POST", "/api/search/batch", body=body))
+    return status, json.loads(payload)
+
+
+def test_batch_matches_single_searches_with_one_encode(app, monkeypatch):
+    encoder = vectorstore.get_query_encoder()
+    calls = []
+    real = encoder.fn
+    monkeypatch.setattr(encoder, "fn", lambda texts: calls.append(list(texts)) or real(texts))
+    queries = ["capybara river batchq", "tapir forest batchq", "capybara river batchq", "  "]
+
+    status, res = _post(app, {"queries": queries, "k": 2, "filters": {"source": "rss"}})
+    assert status == 200 and res["cached"] == 0
+    assert [r["query"] for r in res["results"]] == queries[:3]
+    assert calls == [["capybara river batchq", "tapir forest batchq"]]
+    for r in res["results"]:
+        assert all(d["meta"]["source"] == "rss" for d in r["rag"])
+        status, body = asyncio.run(request(app, "GET", "/api/search", {"q": r["query"], "k": 2, "source": "rss"}))
+        assert json.loads(body)["rag"] == r["rag"]
+
+    assert _post(app, {"queries": queries[:2], "k": 2, "filters": {"source": "rss"}})[1]["cached"] == 2
+
+
+@pytest.mark.parametrize("body", [
+    {"queries": ["a"], "k": "ten"},
+    {"queries": ["a"], "k": 0},
+    {"queries": ["a"], "filters": "rss"},
+    {"queries": ["a"], "filters": {"published_after": "not a date"}},
+    {"queries": ["q"] * 101},
+])
+def test_invalid_batches_are_rejected(app, body):
+    assert _post(app, body)[0] == 422
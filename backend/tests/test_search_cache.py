@@ -0,0 +1,52 @@
+# backend/tests/test_search_cache.py
+import asyncio
+import json
+
+from app.services import cache as cache_mod
+from app.services.cache import LRUTTLCache
+from benchmarks.asgi import request
+
+
+def test_ttl_lru_and_generations(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    c = LRUTTLCache(max_entries=2, ttl=10)
+    c.put("a", 1, generation=1)
+    c.put("b", 2, generation=1, ttl=30)
+    assert c.get("a", 1) == 1
+    assert c.get("a", 2) is None and c.get("a", 1) is None  # a newer generation drops the entry
+
+    c.put("a", 1, generation=1)
+    c.get("b", 1)
+    c.put("c", 3, generation=1)  # evicts a, the least recently used
+    assert c.get("a", 1) is None and c.evictions == 1
+
+    now[0] += 20
+    assert c.get("c", 1) is None  # cache-wide ttl
+    assert c.get("b", 1) == 2  # per-entry ttl
+    stats = c.stats()
+    assert stats["entries"] == 1 and stats["hits"] == 3 and stats["misses"] == 4
+
+
+def _get(app, path, params=None):
+    status, body = asyncio.run(request(app, "GET", path, params))
+    assert status == 200, body
+    return json.loads(body)
+
+
+def test_search_results_are_reused_until_the_next_ingest():
+    from app.main import app
+    from app.services.vectorstore import add_documents
+
+    add_documents([{"id": "cache-1", "text": "okapi giraffe relative forest", "source": "rss"}])
+    before = _get(app, "/api/search/cache")
+    first = _get(app, "/api/search", {"q": "okapi forest", "k": 3})
+    again = _get(app, "/api/search", {"q": "  OKAPI   forest ", "k": 3})
+    after = _get(app, "/api/search/cache")
+    assert again["rag"] == first["rag"]
+    assert after["hits"] == before["hits"] + 1 and after["generation"] == before["generation"]
+
+    add_documents([{"id": "cache-2", "text": "okapi forest okapi forest", "source": "rss"}])
+    fresh = _get(app, "/api/search", {"q": "okapi forest", "k": 3})
+    assert _get(app, "/api/search/cache")["generation"] > after["generation"]
+    assert "cache-2" in [d["id"] for d in fresh["rag"]]
@@ -0,0 +1,49 @@
+# backend/tests/test_search_filters.py
+import asyncio
+import json
+
+import pytest
+
+from app.services.vectorstore import add_documents, build_where, to_epoch
+from benchmarks.asgi import request
+
+DOCS = [
+    {"id": "flt-old-rss", "text": "lemur tail stripes", "source": "rss", "feed": "https://f/1",
+     "published": "Mon, 06 Jan 2020 10:00:00 GMT"},
+    {"id": "flt-new-rss", "text": "lemur jump branches", "source": "rss", "feed": "https://f/2",
+     "published": "2025-03-01T12:00:00Z"},
+    {"id": "flt-new-reddit", "text": "lemur lemur tail", "source": "reddit", "published": "2025-04-01"},
+]
+
+
+@pytest.fixture(scope="module")
+def app():
+    from app.main import app
+
+    add_documents(DOCS)
+    return app
+
+
+def _ids(app, **params):
+    status, body = asyncio.run(request(app, "GET", "/api/search", {"q": "lemur tail", "k": 10, **params}))
+    assert status == 200, body
+    return sorted(d["id"] for d in json.loads(body)["rag"] if d["id"].startswith("flt-"))
+
+
+def test_dates_and_where_clauses():
+    assert to_epoch("2025-03-01T12:00:00Z") == to_epoch("Sat, 01 Mar 2025 12:00:00 GMT") == 1740830400.0
+    assert to_epoch("1740830400") == 1740830400.0 and to_epoch("soon") is None
+    assert build_where() is None
+    assert build_where(sources=["rss"]) == {"source": "rss"}
+    assert build_where(sources=["rss", "reddit"], published_after=5) == {
+        "$and": [{"source": {"$in": ["rss", "reddit"]}}, {"published_ts": {"$gte": 5.0}}]}
+
+
+@pytest.mark.parametrize("mode", ["vector", "hybrid"])
+def test_filters_apply_before_ranking(app, mode):
+    assert _ids(app, mode=mode, source="rss") == ["flt-new-rss", "flt-old-rss"]
+    assert _ids(app, mode=mode, source="rss,reddit", published_after="2025-01-01") == ["flt-new-reddit", "flt-new-rss"]
+    assert _ids(app, mode=mode, feed="https://f/1") == ["flt-old-rss"]
+    assert _ids(app, mode=mode, published_before="2021-01-01") == ["flt-old-rss"]
+    status, _ = asyncio.run(request(app, "GET", "/api/search", {"q": "lemur", "mode": mode, "published_after": "soon"}))
+    assert status == 422
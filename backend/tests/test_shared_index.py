@@ -0,0 +1,68 @@
+# backend/tests/test_shared_index.py
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from app.services import shared_index, vectorstore
+from app.services.rag import CompactTinyRAG
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCS = [{"id": f"shared-{i}", "text": f"pelican pouch fish {i} shore", "source": "rss" if i % 2 else "reddit"}
+        for i in range(12)]
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_index, "SHARED_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(shared_index, "SHARED_INDEX_POLL_S", 0.0)
+    monkeypatch.setattr(shared_index, "SHARED_INDEX_KEEP", 2)
+    monkeypatch.setattr(shared_index, "_current", None)
+    monkeypatch.setattr(shared_index, "SHARED_INDEX", True)
+    monkeypatch.setattr(vectorstore, "SHARED_INDEX", True)
+    vectorstore.add_documents(DOCS)
+    return tmp_path
+
+
+def _chroma_rows():
+    return vectorstore.get_collection().get(include=["documents", "metadatas", "embeddings"])
+
+
+def test_published_version_serves_search_like_the_collection(shared):
+    manifest = shared_index.publish()
+    res = _chroma_rows()
+    assert manifest["rows"] == len(res["ids"]) and (shared / "CURRENT").read_text() == manifest["version"]
+
+    lex = shared_index.lexical()
+    built = CompactTinyRAG([{"id": i, "text": d, **(m or {})}
+                            for i, d, m in zip(res["ids"], res["documents"], res["metadatas"])])
+    for q, where in (("pelican shore", None), ("fish 3", {"source": "rss"})):
+        assert lex.search(q, k=5, where=where) == built.search(q, k=5, where=where)
+    with pytest.raises(RuntimeError, match="read-only"):
+        lex.upsert([{"id": "x", "text": "y"}])
+
+    emb = np.asarray(res["embeddings"], dtype=np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    q = vectorstore.get_query_encoder().encode("pelican pouch fish 4 shore")
+    hits = vectorstore.search("pelican pouch fish 4 shore", k=3)
+    assert [h["id"] for h in hits] == [res["ids"][i] for i in np.argsort(-(emb @ q))[:3]]
+    assert hits[0]["id"] == "shared-4"
+
+
+def test_workers_switch_versions_and_old_ones_are_pruned(shared):
+    first = shared_index.publish()
+    gen = vectorstore.generation()
+    assert shared_index.current().version == first["version"]
+    versions = [shared_index.publish()["version"] for _ in range(2)]
+    assert shared_index.current().version == versions[-1] and vectorstore.generation() > gen
+    assert sorted(d for d in os.listdir(shared) if d.startswith("v")) == versions
+
+    # another process maps the same files and gets the same answers
+    probe = ("import json, sys; from app.services.shared_index import MappedTinyRAG; "
+             "print(json.dumps(MappedTinyRAG(sys.argv[1]).search('pelican fish 7', k=3)))")
+    out = subprocess.run([sys.executable, "-c", probe, str(shared / versions[-1])], cwd=BACKEND,
+                         capture_output=True, text=True, timeout=120, check=True)
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == shared_index.lexical().search("pelican fish 7", k=3)
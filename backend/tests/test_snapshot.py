@@ -0,0 +1,74 @@
+# backend/tests/test_snapshot.py
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services import snapshot, vectorstore
+
+DOCS = [{"id": f"snap-{i}", "text": f"armadillo shell plates {i}", "source": "rss", "n": i} for i in range(7)]
+
+
+@pytest.fixture
+def exported(tmp_path):
+    vectorstore.add_documents(DOCS)
+    path = str(tmp_path / "c.snap")
+    return path, snapshot.export_snapshot(path, block_rows=3)
+
+
+@pytest.fixture
+def empty_collection(monkeypatch):
+    """An empty collection in the same client, swapped in as vectorstore's collection."""
+    vectorstore.get_collection()
+    name = f"restore-{uuid.uuid4().hex[:8]}"
+    col = vectorstore._client.get_or_create_collection(name=name, metadata={"hnsw:space": "cosine"})
+    yield lambda: monkeypatch.setattr(vectorstore, "_collection", col) or col
+    vectorstore._client.delete_collection(name)
+
+
+def _rows(col):
+    ids = sorted(d["id"] for d in DOCS)
+    res = col.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+    order = np.argsort(res["ids"])
+    return ([res["ids"][i] for i in order], np.asarray(res["embeddings"])[order],
+            [res["documents"][i] for i in order], [res["metadatas"][i] for i in order])
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_export_restore_round_trip_without_embedding(tmp_path, dtype, empty_collection, monkeypatch):
+    vectorstore.add_documents(DOCS)
+    before = _rows(vectorstore.get_collection())
+    path = str(tmp_path / "c.snap")
+    out = snapshot.export_snapshot(path, dtype=dtype, block_rows=3)
+    assert out["rows"] == vectorstore.get_collection().count()
+
+    col = empty_collection()
+    monkeypatch.setattr(vectorstore, "_ef", lambda texts: pytest.fail("restore must not embed"))
+    res = snapshot.restore_snapshot(path)
+    assert res["rows"] == res["expected"] == out["rows"] == col.count()
+    after = _rows(col)
+    assert after[0] == before[0] and after[2] == before[2] and after[3] == before[3]
+    assert np.allclose(after[1], before[1], atol=1e-3 if dtype == "float16" else 1e-7)
+
+
+def test_restore_refuses_another_model(exported, empty_collection, monkeypatch):
+    path, _ = exported
+    col = empty_collection()
+    monkeypatch.setattr(snapshot, "_model_key", lambda: "other-model@onnx-int8")
+    with pytest.raises(ValueError, match="pass force"):
+        snapshot.restore_snapshot(path)
+    assert col.count() == 0
+    assert snapshot.restore_snapshot(path, force=True)["rows"] == col.count() > 0
+
+
+def test_damaged_files_are_rejected(exported, tmp_path, empty_collection):
+    path, _ = exported
+    empty_collection()
+    with open(path, "rb") as f:
+        data = f.read()
+    (tmp_path / "cut.snap").write_bytes(data[:-20])
+    (tmp_path / "junk.snap").write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError, match="truncated"):
+        snapshot.restore_snapshot(str(tmp_path / "cut.snap"))
+    with pytest.raises(ValueError, match="not a snapshot"):
+        snapshot.restore_snapshot(str(tmp_path / "junk.snap"))
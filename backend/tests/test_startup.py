@@ -0,0 +1,32 @@
+# backend/tests/test_startup.py
+import json
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# a fresh interpreter, so modules imported by other tests don't count
+PROBE = """
+import asyncio, json, sys
+import app.main
+from benchmarks.asgi import request
+
+heavy = [m for m in ("chromadb", "sklearn", "feedparser", "numpy", "sentence_transformers", "onnxruntime")
+         if m in sys.modules]
+health = asyncio.run(request(app.main.app, "GET", "/api/health"))
+profile = asyncio.run(request(app.main.app, "GET", "/api/health/startup"))
+print(json.dumps({"heavy": heavy, "health": health[0], "profile": json.loads(profile[1])}))
+"""
+
+
+def test_app_import_defers_heavy_modules():
+    env = {**os.environ, "STARTUP_PROFILE": "1", "RAG_EAGER_INIT": "false", "SHARED_INDEX": "off"}
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND, env=env,
+                         capture_output=True, text=True, timeout=120, check=True)
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    assert res["heavy"] == []
+    assert res["health"] == 200
+    steps = [s["step"] for s in res["profile"]["steps"]]
+    assert steps[0] == "app.routes.health" and "app.routes.search" in steps
+    assert res["profile"]["total_ms"] > 0
@@ -0,0 +1,58 @@
+# backend/tests/test_streaming.py
+import asyncio
+import json
+
+from app.services import reddit
+from benchmarks.asgi import request
+
+RSS = ('<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+       '<item><title>ocelot spots at night</title><link>https://o/1</link></item></channel></rss>')
+
+
+def _ndjson(body):
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+def test_search_stream_sends_events_in_completion_order(stub_server, monkeypatch):
+    from app.main import app
+
+    stub_server.routes = {"/reddit": lambda q, h: (200, {"data": {"children": [
+        {"data": {"title": "ocelot thread", "permalink": "/r/x/1", "subreddit": "x"}}]}}, {})}
+    monkeypatch.setattr(reddit, "_BASE", stub_server.url + "/reddit")
+    status, body = asyncio.run(request(app, "GET", "/api/search/stream",
+                                       {"q": "ocelot stream", "mode": "hybrid", "sources": "reddit"}))
+    assert status == 200
+    events = _ndjson(body)
+    types = [e["type"] for e in events]
+    assert types[0] == "start" and types[-1] == "done"
+    assert sorted(e["name"] for e in events if e["type"] == "retriever") == ["lexical", "vector"]
+    assert types.index("rag") > max(i for i, t in enumerate(types) if t == "retriever")
+    source = next(e for e in events if e["type"] == "source")
+    assert source["name"] == "reddit" and source["status"] == "ok" and source["results"][0]["title"] == "ocelot thread"
+    assert events[-1]["source_timings"]["reddit"]["status"] == "ok"
+
+
+def test_sse_framing_on_request():
+    from app.main import app
+
+    _, body = asyncio.run(request(app, "GET", "/api/search/stream", {"q": "ocelot sse"},
+                                  headers={"accept": "text/event-stream"}))
+    frames = body.decode().strip().split("\n\n")
+    assert frames[0].startswith("event: start\ndata: {")
+    assert frames[-1].startswith("event: done\ndata: ")
+    _, plain = asyncio.run(request(app, "GET", "/api/search/stream", {"q": "ocelot sse", "format": "ndjson"},
+                                   headers={"accept": "text/event-stream"}))
+    assert _ndjson(plain)[0]["type"] == "start"
+
+
+def test_ingest_stream_reports_feed_batch_and_done(stub_server):
+    from app.main import app
+
+    stub_server.routes = {"/o.xml": lambda q, h: (200, RSS, {})}
+    feed = stub_server.url + "/o.xml"
+    status, body = asyncio.run(request(app, "POST", "/api/ingest/rss/stream", body={"feeds": [feed]}))
+    events = _ndjson(body)
+    assert status == 200
+    assert [e["type"] for e in events] == ["queued", "started", "feed", "batch", "done"]
+    assert events[2]["url"] == feed and events[3]["by_feed"] == {feed: 1}
+    assert events[-1]["status"] == "done" and events[-1]["id"] == events[0]["job_id"]
@@ -0,0 +1,95 @@
+# backend/tests/test_topics.py
+import asyncio
+import json
+import queue
+
+from app.services import topics
+from app.services.topics import TopicModel
+from benchmarks.asgi import request
+
+SPORTS = ["football match goal striker league", "tennis match serve league final", "basketball league dunk match"]
+TECH = ["python compiler release bytecode", "rust compiler borrow checker release", "gpu compiler kernel release"]
+
+
+def _docs(n):
+    texts = [(SPORTS + TECH)[i % 6] + f" item{i}" for i in range(n)]
+    return [f"t{i}" for i in range(n)], texts
+
+
+def test_model_warms_up_then_updates_incrementally():
+    model = TopicModel(n_clusters=2)
+    ids, texts = _docs(12)
+    assert model.update(ids[:1], texts[:1]) == 0 and not model.fitted  # fewer docs than clusters
+    assert model.update(ids[1:6], texts[1:6]) == 6 and model.fitted
+    assert model.update(ids[:6], texts[:6]) == 0  # re-sent unchanged docs are ignored
+    assert model.update(ids[6:], texts[6:]) == 6
+
+    snap = model.snapshot(n_keywords=3)
+    assert snap["docs"] == 12 and sum(t["count"] for t in snap["topics"]) == 12
+    keywords = {w for kw in snap["keywords"] for w in kw["keywords"]}
+    assert keywords & {"league", "match"} and keywords & {"compiler", "release"}
+
+
+def test_observe_merges_into_a_bounded_backlog_when_the_updater_is_behind(monkeypatch):
+    full = queue.Queue(maxsize=1)
+    full.put(([], []))
+    monkeypatch.setattr(topics, "_queue", full)
+    monkeypatch.setattr(topics, "start", lambda: None)
+    monkeypatch.setattr(topics, "_backlog_ids", [])
+    monkeypatch.setattr(topics, "_backlog_texts", [])
+    monkeypatch.setattr(topics, "_stats", {"merged": 0, "dropped": 0})
+    monkeypatch.setattr(topics, "TOPICS_MAX_BACKLOG", 5)
+
+    topics.observe(["a", "b", "c"], ["x", "y", "z"])  # never blocks on the full queue
+    topics.observe(["d", "e", "f"], ["x", "y", "z"])  # would exceed the backlog: dropped
+    stats = topics.stats()
+    assert stats["queued_batches"] == 1 and stats["backlog_docs"] == 3
+    assert stats["merged"] == 3 and stats["dropped"] == 3
+
+
+class _Collection:
+    """Just enough of a Chroma collection for paged col.get() calls."""
+
+    def __init__(self, vecs, docs):
+        self.vecs, self.docs, self.calls = vecs, docs, []
+
+    def get(self, include, limit, offset):
+        self.calls.append((tuple(include), offset))
+        rows = range(offset, min(offset + limit, len(self.docs)))
+        out = {"ids": [f"e{i}" for i in rows]}
+        if "embeddings" in include:
+            out["embeddings"] = [self.vecs[i] for i in rows]
+        if "documents" in include:
+            out["documents"] = [self.docs[i] for i in rows]
+        return out
+
+
+def test_cluster_embeddings_uses_stored_vectors_page_by_page(monkeypatch):
+    from app.services import vectorstore
+
+    # two well separated directions; the text only matters for the labels
+    vecs = [[10.0, 0.1 * (i % 3), 0.0] if i % 2 else [0.0, 0.1 * (i % 3), 10.0] for i in range(40)]
+    docs = [SPORTS[i % 3] if i % 2 else TECH[i % 3] for i in range(40)]
+    col = _Collection(vecs, docs)
+    monkeypatch.setattr(vectorstore, "get_collection", lambda: col)
+
+    snap = topics.cluster_embeddings(n_clusters=2, page=15)
+    assert [t["count"] for t in snap["topics"]] == [20, 20] and snap["docs"] == 40
+    labels = [set(kw["keywords"]) for kw in snap["keywords"]]
+    assert any("league" in kw for kw in labels) and any("compiler" in kw for kw in labels)
+    assert col.calls == [(("embeddings",), 0), (("embeddings",), 15), (("embeddings",), 30), (("embeddings",), 40),
+                         (("embeddings", "documents"), 0), (("embeddings", "documents"), 15),
+                         (("embeddings", "documents"), 30), (("embeddings", "documents"), 40)]
+
+
+def test_trends_falls_back_to_batch_clustering_while_warming_up(monkeypatch):
+    from app.main import app
+
+    empty = {"topics": [], "keywords": [], "docs": 0, "updated_at": None}
+    monkeypatch.setattr(topics, "embedding_snapshot", lambda: empty)
+    monkeypatch.setattr(topics, "cluster_batch", lambda k: {
+        "topics": [{"topic": 0, "count": 3}], "keywords": [{"topic": 0, "keywords": ["x"]}],
+        "docs": 3, "updated_at": 1.0})
+    status, body = asyncio.run(request(app, "GET", "/api/trends", {"mode": "embeddings", "k": 2}))
+    payload = json.loads(body)
+    assert status == 200 and payload["mode"] == "batch" and payload["docs_covered"] == 3
@@ -0,0 +1,52 @@
+# backend/tests/test_vectorstore_chunks.py
+import pytest
+
+from app.services import vectorstore
+from app.services.rag import get_rag
+
+
+def _stored(parent: str):
+    col = vectorstore.get_collection()
+    rows = col.get(ids=[parent], include=[])["ids"] + col.get(where={"parent_id": parent}, include=[])["ids"]
+    return sorted(rows)
+
+
+def _lexical_ids(query: str):
+    return {d.get("id") for d in get_rag().search(query, k=20)}
+
+
+def test_shrinking_parent_drops_old_chunks():
+    long_text = "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima"
+    vectorstore.add_documents([{"id": "p1", "text": long_text}])
+    assert _stored("p1") == sorted(f"p1#c{i}" for i in range(len(_stored("p1"))))
+    assert len(_stored("p1")) > 2
+
+    vectorstore.add_documents([{"id": "p1", "text": "alpha bravo charlie delta echo foxtrot golf"}])
+    assert _stored("p1") == ["p1#c0", "p1#c1"]
+
+    vectorstore.add_documents([{"id": "p1", "text": "alpha bravo"}])
+    assert _stored("p1") == ["p1"]
+    assert not {i for i in _lexical_ids("kilo lima juliet") if str(i).startswith("p1#")}
+
+
+def test_growing_parent_replaces_whole_row():
+    vectorstore.add_documents([{"id": "p2", "text": "mike november"}])
+    assert _stored("p2") == ["p2"]
+    vectorstore.add_documents([{"id": "p2", "text": "mike november oscar papa quebec romeo sierra tango"}])
+    assert "p2" not in _stored("p2")
+    assert _stored("p2")[0] == "p2#c0"
+
+
+def test_failed_embedding_keeps_the_old_chunks(monkeypatch):
+    long_text = "uniform victor whiskey xray yankee zulu amber basil cedar daisy ember fern"
+    vectorstore.add_documents([{"id": "p3", "text": long_text}])
+    before = _stored("p3")
+    assert len(before) > 2
+
+    def boom(docs):
+        raise RuntimeError("embedding backend down")
+
+    monkeypatch.setattr(vectorstore, "_ef", boom)
+    with pytest.raises(RuntimeError):
+        vectorstore.add_documents([{"id": "p3", "text": "uniform victor"}])
+    assert _stored("p3") == before